@@ -0,0 +1,119 @@
+"""
+Benchmarks of the Deezer client against the local stand-in server.
+
+    python -m benchmarks.run --output bench.json
+
+Every benchmark reports its figures in one JSON document, so results can be compared
+between releases.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import requests
+
+from deezerpy import Deezer
+from .server import FakeDeezerServer
+
+
+def timed(function, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summary(durations):
+    ordered = sorted(durations)
+    return {"mean": statistics.mean(ordered), "p50": ordered[len(ordered) // 2],
+            "p95": ordered[int(len(ordered) * 0.95)], "min": ordered[0]}
+
+
+def bench_single_calls(server, calls):
+    # Raw keep-alive requests give the floor the client overhead is measured against
+    url = f"{server.url}track/3135556"
+    with requests.Session() as session:
+        raw = timed(lambda: session.get(url).json(), calls)
+    with Deezer(base_url=server.url, rate_limiter=False, coalesce=False) as dz, \
+            Deezer(base_url=server.url, rate_limiter=False, coalesce=False, models=True) as with_models:
+        client = timed(lambda: dz.get_track("3135556"), calls)
+        models = timed(lambda: with_models.get_track("3135556"), calls)
+    return {"calls": calls, "requests_per_second": calls / sum(client), "raw": summary(raw), "client": summary(client),
+            "models": summary(models), "client_overhead": statistics.mean(client) - statistics.mean(raw)}
+
+
+def bench_bulk(server, count, workers):
+    with Deezer(base_url=server.url, rate_limiter=False, pool_maxsize=workers) as dz:
+        start = time.perf_counter()
+        tracks = dz.get_tracks(range(1, count + 1), max_workers=workers)
+        elapsed = time.perf_counter() - start
+    return {"items": len(tracks), "workers": workers, "seconds": elapsed, "requests_per_second": count / elapsed}
+
+
+def bench_pagination(server, size):
+    results = {}
+    with Deezer(base_url=server.url, rate_limiter=False) as dz:
+        for mode, options in (("serial", {"prefetch": False}), ("prefetch", {}), ("parallel", {"parallel": True})):
+            start = time.perf_counter()
+            items = sum(1 for _ in dz.paginate(dz.get_playlist(str(size), "tracks"), **options))
+            elapsed = time.perf_counter() - start
+            results[mode] = {"items": items, "seconds": elapsed, "items_per_second": items / elapsed}
+        start = time.perf_counter()
+        items = sum(1 for _ in dz.stream(f"playlist/{size}/tracks", limit=500))
+        elapsed = time.perf_counter() - start
+        results["stream"] = {"items": items, "seconds": elapsed, "items_per_second": items / elapsed}
+    return results
+
+
+def bench_memory(server, size):
+    results = {}
+    for mode in ("dicts", "models"):
+        with Deezer(base_url=server.url, rate_limiter=False, models=mode == "models") as dz:
+            response = dz.get_playlist(str(size), "tracks")
+            gc.collect()
+            tracemalloc.start()
+            tracks = list(dz.paginate(response, parallel=True))
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[mode] = {"items": len(tracks), "retained_bytes": current, "peak_bytes": peak,
+                             "bytes_per_item": current / len(tracks)}
+            del tracks
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Deezer client against a local stand-in server")
+    parser.add_argument("--output", help="file to write the results to, defaults to stdout")
+    parser.add_argument("--latency", type=float, default=0.02, help="latency of the server in seconds")
+    parser.add_argument("--jitter", type=float, default=0.005, help="maximum jitter of the server in seconds")
+    parser.add_argument("--calls", type=int, default=500, help="number of calls of the single call benchmark")
+    parser.add_argument("--bulk", type=int, default=1000, help="number of lookups of the bulk benchmark")
+    parser.add_argument("--workers", type=int, default=16, help="concurrency of the bulk benchmark")
+    parser.add_argument("--playlist", type=int, default=5000, help="number of tracks of the paged playlist")
+    args = parser.parse_args()
+
+    results = {"python": platform.python_version(), "platform": platform.platform(), "timestamp": time.time()}
+    with FakeDeezerServer() as server:
+        results["single_calls"] = bench_single_calls(server, args.calls)
+        results["memory"] = bench_memory(server, args.playlist)
+    with FakeDeezerServer(latency=args.latency, jitter=args.jitter) as server:
+        results["bulk"] = bench_bulk(server, args.bulk, args.workers)
+        results["pagination"] = bench_pagination(server, args.playlist)
+
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(document)
+    else:
+        sys.stdout.write(document + "\n")
+
+
+if __name__ == "__main__":
+    main()
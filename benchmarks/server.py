@@ -0,0 +1,178 @@
+"""
+Local stand-in for api.deezer.com serving generated fixtures, used by the benchmarks.
+
+    python -m benchmarks.server --port 8000 --latency 0.02 --jitter 0.01
+
+Catalog endpoints answer for any numeric ID; ID 0 answers with Deezer's 'no data' error.
+Collections are paged with index/limit and carry 'total' and 'next' like the real API.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+NO_DATA = {"error": {"type": "DataException", "message": "no data", "code": 800}}
+QUOTA = {"error": {"type": "Exception", "message": "Quota limit exceeded", "code": 4}}
+NOT_FOUND = {"error": {"type": "OAuthException", "message": "Invalid request", "code": 600}}
+
+
+def artist(id):
+    return {"id": id, "name": f"Artist {id}", "link": f"https://www.deezer.com/artist/{id}",
+            "picture": f"https://api.deezer.com/artist/{id}/image", "nb_album": 12, "nb_fan": id * 7 % 100000,
+            "radio": True, "tracklist": f"https://api.deezer.com/artist/{id}/top?limit=50", "type": "artist"}
+
+
+def album(id):
+    return {"id": id, "title": f"Album {id}", "upc": f"{id:013d}", "link": f"https://www.deezer.com/album/{id}",
+            "cover": f"https://api.deezer.com/album/{id}/image", "genre_id": 113, "label": "Label",
+            "nb_tracks": 12, "duration": 2700, "fans": 1500, "release_date": "2001-03-07", "record_type": "album",
+            "available": True, "explicit_lyrics": False, "artist": artist(id % 5000 + 1), "type": "album"}
+
+
+def track(id):
+    return {"id": id, "readable": True, "title": f"Track {id}", "title_short": f"Track {id}", "isrc": f"FR{id:010d}",
+            "link": f"https://www.deezer.com/track/{id}", "duration": 180 + id % 120, "track_position": id % 12 + 1,
+            "disk_number": 1, "rank": id * 31 % 1000000, "release_date": "2001-03-07", "explicit_lyrics": False,
+            "preview": f"https://cdns-preview.dzcdn.net/{id}.mp3", "bpm": 120.0, "gain": -9.1,
+            "artist": {"id": id % 5000 + 1, "name": f"Artist {id % 5000 + 1}", "type": "artist"},
+            "album": {"id": id % 20000 + 1, "title": f"Album {id % 20000 + 1}", "type": "album"}, "type": "track"}
+
+
+def playlist(id):
+    return {"id": id, "title": f"Playlist {id}", "description": "", "duration": 36000, "public": True,
+            "nb_tracks": id, "fans": 10, "link": f"https://www.deezer.com/playlist/{id}",
+            "creator": {"id": 5, "name": "Curator", "type": "user"}, "type": "playlist"}
+
+
+class FakeDeezerHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.server.latency or self.server.jitter:
+            time.sleep(self.server.latency + random.uniform(0, self.server.jitter))
+        parts = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        segments = parts.path.strip("/").split("/")
+        if self.server.quota_every and self.server.requests % self.server.quota_every == 0:
+            return self.reply(QUOTA)
+        return self.reply(self.route(segments, query, parts.path))
+
+    do_POST = do_GET
+    do_DELETE = do_GET
+
+    def route(self, segments, query, path):
+        kind = segments[0]
+        if kind == "search":
+            return self.page(path, query, self.server.search_size, track, query.get("q", ""))
+        if kind == "chart":
+            return self.page(path, query, 10, track)
+        if len(segments) < 2 or not segments[1].isdigit():
+            return NOT_FOUND
+        id = int(segments[1])
+        if id == 0:
+            return NO_DATA
+        method = segments[2] if len(segments) > 2 else ""
+        if self.command != "GET":
+            return True
+        if kind == "track" and not method:
+            return track(id)
+        if kind == "album" and not method:
+            return album(id)
+        if kind == "artist" and not method:
+            return artist(id)
+        if kind == "playlist" and not method:
+            return playlist(id)
+        if kind == "playlist" and method == "tracks":
+            return self.page(path, query, id, track)
+        if kind == "album" and method == "tracks":
+            return self.page(path, query, 12, track)
+        if kind == "artist" and method in ("albums", "related"):
+            return self.page(path, query, 40, album if method == "albums" else artist)
+        if kind == "artist" and method == "top":
+            return self.page(path, query, 50, track)
+        return NOT_FOUND
+
+    def page(self, path, query, total, factory, q=None):
+        index = int(query.get("index", 0))
+        limit = int(query.get("limit", 25))
+        body = {"data": [factory(position + 1) for position in range(index, min(index + limit, total))],
+                "total": total}
+        if index + limit < total:
+            extra = f"q={q}&" if q is not None else ""
+            body["next"] = f"{self.server.url}{path.strip('/')}?{extra}index={index + limit}&limit={limit}"
+        if index > 0:
+            body["prev"] = f"{self.server.url}{path.strip('/')}?index={max(0, index - limit)}&limit={limit}"
+        return body
+
+    def reply(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeDeezerServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering like the Deezer API. Use it as a context manager to run
+    it in a background thread:
+
+        with FakeDeezerServer(latency=0.02) as server:
+            dz = Deezer(base_url=server.url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, quota_every=0, search_size=300):
+        """
+        :param host: interface to listen on
+        :param port: port to listen on, 0 picks a free one
+        :param latency: seconds added to every response
+        :param jitter: maximum random seconds added on top of latency
+        :param quota_every: answer every n-th request with a quota error, 0 disables it
+        :param search_size: number of results of any search
+        """
+        super().__init__((host, port), FakeDeezerHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.quota_every = quota_every
+        self.search_size = search_size
+        self.requests = 0
+        self.url = f"http://{host}:{self.server_port}/"
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Deezer API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--quota-every", type=int, default=0)
+    args = parser.parse_args()
+    server = FakeDeezerServer(args.host, args.port, args.latency, args.jitter, args.quota_every)
+    print(f"Serving on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
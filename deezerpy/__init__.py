@@ -1 +1,44 @@
-from .deezerpy import Deezer, DeezerException
\ No newline at end of file
+import importlib
+
+# Public names and the modules defining them. Modules are imported on first access, so that
+# scripts and 'python -m deezerpy' only pay for the features they use.
+_EXPORTS = {
+    "ChunkResult": "deezerpy", "Deezer": "deezerpy", "DeezerException": "deezerpy",
+    "AsyncDeezer": "aio",
+    "ResponseCache": "cache", "SearchCache": "cache", "SQLiteCache": "cache",
+    "RateLimiter": "ratelimit", "SharedRateLimiter": "ratelimit",
+    "ProcessPool": "pool",
+    "Album": "models", "Artist": "models", "Episode": "models", "Page": "models", "Playlist": "models",
+    "Track": "models", "User": "models",
+    "MetricsAggregator": "metrics", "RequestEvent": "metrics",
+    "AsyncHTTPTransport": "transport", "CassetteTransport": "transport", "FakeTransport": "transport",
+    "HTTP2Transport": "transport", "HTTPTransport": "transport", "Transport": "transport",
+    "PlaylistSync": "sync", "plan_playlist_sync": "sync",
+    "LibraryExport": "export",
+    "CatalogCrawler": "crawler",
+    "SearchIndex": "index",
+    "IdResolver": "resolver", "ResolveError": "resolver",
+    "DeezerCredentials": "auth", "FileTokenStore": "auth", "SQLiteTokenStore": "auth",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        # Submodules, e.g. deezerpy.cache after a plain 'import deezerpy'
+        if not name.startswith("__"):
+            try:
+                return importlib.import_module(f".{name}", __name__)
+            except ModuleNotFoundError as error:
+                if error.name != f"{__name__}.{name}":
+                    raise
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
\ No newline at end of file
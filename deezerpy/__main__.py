@@ -0,0 +1,120 @@
+"""
+Fetch Deezer entities in bulk and stream them as NDJSON.
+
+    cat album_ids.txt | python -m deezerpy album tracks --all > tracks.ndjson
+    python -m deezerpy track -i links.txt --workers 16 --offset 25000
+
+Inputs are IDs or URLs, one per line, read from the given files or from stdin. Every input
+gives one line on stdout, in the order of the inputs:
+
+    {"line": 0, "input": "302127", "result": {...}}
+    {"line": 1, "input": "oops", "error": {"type": "ResolveError", "message": "...", "code": null}}
+
+'line' counts the inputs, blank lines and comments excluded: to resume an interrupted run,
+pass the last line written plus one to --offset.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from itertools import islice
+
+# Entities accepted on the command line, and whether their method takes a sub-method
+KINDS = {"track": False, "album": True, "artist": True, "playlist": True, "podcast": True, "episode": False,
+         "user": False}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m deezerpy", description="Fetch Deezer entities as NDJSON.")
+    parser.add_argument("kind", choices=KINDS, help="kind of the entities given as input")
+    parser.add_argument("method", nargs="?", default="",
+                        help="sub-method of album, artist, playlist or podcast, e.g. 'tracks' or 'related'")
+    parser.add_argument("-i", "--input", action="append", default=[], metavar="FILE",
+                        help="file of IDs or URLs, one per line. Repeatable. Defaults to stdin ('-')")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="number of concurrent requests (default: 8)")
+    parser.add_argument("--offset", type=int, default=0, help="skip this many inputs, to resume a run")
+    parser.add_argument("--all", action="store_true", help="follow the pagination of sub-methods")
+    parser.add_argument("--token", default=os.environ.get("DEEZER_ACCESS_TOKEN"),
+                        help="access token. Defaults to the DEEZER_ACCESS_TOKEN variable")
+    parser.add_argument("--base-url", default="https://api.deezer.com/", help="root of the API")
+    args = parser.parse_args(argv)
+    if args.method and not KINDS[args.kind]:
+        parser.error(f"'{args.kind}' has no sub-methods")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def read_inputs(paths):
+    for path in paths or ["-"]:
+        lines = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in lines:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+
+
+def fetch(dz, args, value):
+    # Failures of one input, network errors included, are written on its line and the run goes on
+    try:
+        resolved = dz.resolver.resolve(value, args.kind)
+        if isinstance(resolved, Exception):
+            return resolved
+        id = resolved[1]
+        getter = getattr(dz, f"get_{args.kind}")
+        result = getter(id, args.method) if args.method else getter(id)
+        if args.all and isinstance(result, dict) and isinstance(result.get("data"), list):
+            result = {"data": list(dz.paginate(result)), "total": result.get("total")}
+        return result
+    except Exception as error:
+        return error
+
+
+def render(line, value, result):
+    entry = {"line": line, "input": value}
+    if isinstance(result, Exception):
+        entry["error"] = {"type": getattr(result, "type", type(result).__name__),
+                          "message": getattr(result, "msg", str(result)), "code": getattr(result, "code", None)}
+    else:
+        entry["result"] = result
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+
+def write(line, value, future):
+    result = future.result()
+    sys.stdout.write(render(line, value, result) + "\n")
+    sys.stdout.flush()
+    return isinstance(result, Exception)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Imported once the arguments are valid, so that --help and usage errors answer at once
+    from concurrent.futures import ThreadPoolExecutor
+    from .deezerpy import Deezer
+
+    failed = 0
+    inputs = enumerate(islice(read_inputs(args.input), args.offset, None), args.offset)
+    with Deezer(auth=args.token, pool_maxsize=args.workers, base_url=args.base_url) as dz, \
+            ThreadPoolExecutor(max_workers=args.workers) as executor:
+        # A bounded window of calls keeps memory flat and the output in input order
+        window = deque()
+        for line, value in inputs:
+            window.append((line, value, executor.submit(fetch, dz, args, value)))
+            if len(window) >= args.workers * 2:
+                failed += write(*window.popleft())
+        while window:
+            failed += write(*window.popleft())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except (BrokenPipeError, KeyboardInterrupt):
+        sys.exit(1)
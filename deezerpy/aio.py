@@ -0,0 +1,350 @@
+import asyncio
+import inspect
+import time
+from collections import deque
+
+from .deezerpy import MAX_SONGS_LENGTH, ChunkResult, Deezer, DeezerException
+from .decoding import StreamingDecoder
+from .flight import AsyncSingleFlight
+from .metrics import RequestEvent, endpoint_template
+from .models import Model, parse
+from .query import search_url
+from .sync import plan_playlist_sync
+from .transport import AsyncHTTPTransport
+
+
+class AsyncDeezer(Deezer):
+    """
+    asyncio version of the Deezer client. It exposes the same methods as Deezer, but every
+    call returns an awaitable, and all requests share a single non-blocking connection pool.
+
+        async with AsyncDeezer() as dz:
+            album = await dz.get_album("72839592")
+
+    Requires the httpx package, unless another transport is given.
+    """
+
+    def __init__(self, auth=None, credentials_manager=None, pool_maxsize=100, client=None, transport=None, cache=None,
+                 rate_limiter=None, max_retries=3, backoff=1.0, max_backoff=30.0, coalesce=True,
+                 models=False, json_decoder=None, hooks=None, base_url="https://api.deezer.com/", search_cache=None):
+        """
+        :param auth: access token used for authenticated calls
+        :param credentials_manager: DeezerCredentials object handling the access token
+        :param pool_maxsize: maximum number of connections kept open to the API
+        :param client: optional httpx.AsyncClient to use instead of the client's own one
+        :param transport: Transport sending the requests, e.g. a FakeTransport or a CassetteTransport.
+                          Defaults to an AsyncHTTPTransport configured with the pool and client arguments
+        :param cache: optional ResponseCache or SQLiteCache used to serve repeated GET requests
+        :param rate_limiter: RateLimiter applied to every request. Defaults to Deezer's quota of
+                             50 requests every 5 seconds. Use False to disable it
+        :param max_retries: number of times a request is retried after a quota error
+        :param backoff: base delay in seconds of the exponential backoff between retries
+        :param max_backoff: maximum delay in seconds between retries
+        :param coalesce: share the response of a GET request with the identical requests issued
+                         while it is in flight, instead of sending them again. Those callers
+                         receive the same dictionary or model: copy it before modifying it
+        :param models: return typed entities (Track, Album, Artist...) instead of dictionaries.
+                       Stubs are not fetched on attribute access, await resolve() instead
+        :param json_decoder: function decoding the body of the responses. Defaults to orjson.loads
+                             when orjson is installed, json.loads otherwise
+        :param hooks: callables receiving a RequestEvent after every call, see add_hook
+        :param base_url: root of the API, e.g. to point the client to a local stand-in server
+        :param search_cache: optional SearchCache serving repeated and type-ahead searches
+        """
+        owns_transport = transport is None
+        if transport is None:
+            transport = AsyncHTTPTransport(pool_maxsize, client)
+        super().__init__(auth, credentials_manager, pool_maxsize=pool_maxsize, transport=transport, cache=cache,
+                         rate_limiter=rate_limiter,
+                         max_retries=max_retries, backoff=backoff, max_backoff=max_backoff, coalesce=coalesce,
+                         models=models, json_decoder=json_decoder, hooks=hooks,
+                         base_url=base_url, search_cache=search_cache)
+        self._owns_transport = owns_transport
+
+    def __enter__(self):
+        raise TypeError("AsyncDeezer must be used with 'async with', not 'with'")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def close(self):
+        """
+        Not available: the connections of the asynchronous client are closed with aclose()
+        """
+        raise TypeError("AsyncDeezer is closed with 'await dz.aclose()'")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Close the connection pool held by the client
+        """
+        if self._owns_transport:
+            await self.transport.aclose()
+
+    async def advanced_search(self, params):
+        result = super().advanced_search(params)
+        if result is not None:
+            return await result
+
+    async def next(self, response):
+        if response.get("next"):
+            return await self._get(response["next"])
+        else:
+            return None
+
+    async def paginate(self, response, max_items=None, prefetch=True, parallel=False, max_workers=8):
+        """
+        Asynchronous version of Deezer.paginate, to be used with 'async for'.
+        :param response: first page, or the awaitable returned by any of the client's methods
+        :param max_items: stop after yielding this many items
+        :param prefetch: fetch the next page in the background
+        :param parallel: request all the remaining pages concurrently by offset
+        :param max_workers: maximum number of pages in flight when parallel is set
+        """
+        if inspect.isawaitable(response):
+            response = await response
+        if parallel:
+            async for item in self._fan_out(response, max_items, max_workers):
+                yield item
+            return
+        following = None
+        count = 0
+        try:
+            while response is not None:
+                if isinstance(response, DeezerException):
+                    raise response
+                data = response.get("data", [])
+                last_page = max_items is not None and count + len(data) >= max_items
+                if prefetch and not last_page and response.get("next"):
+                    following = asyncio.ensure_future(self.next(response))
+                for item in data:
+                    if max_items is not None and count >= max_items:
+                        return
+                    yield item
+                    count += 1
+                if last_page:
+                    return
+                if following is not None:
+                    response, following = await following, None
+                else:
+                    response = await self.next(response)
+        finally:
+            if following is not None:
+                following.cancel()
+
+    async def stream(self, url, max_items=None, limit=None):
+        """
+        Asynchronous version of Deezer.stream, to be used with 'async for'.
+        :param url: path of the collection, or the 'next' link of a previous page
+        :param max_items: stop after yielding this many items
+        :param limit: number of items requested per page
+        """
+        count = 0
+        while url:
+            decoder = StreamingDecoder(decoder=self.json_decoder)
+            async for item in self._stream_page(url, limit, decoder):
+                if max_items is not None and count >= max_items:
+                    return
+                yield parse(item, self) if self.models else item
+                count += 1
+            error = self._parse_result(decoder.meta) if "error" in decoder.meta else None
+            if isinstance(error, DeezerException):
+                raise error
+            if max_items is not None and count >= max_items:
+                return
+            url = decoder.meta.get("next")
+
+    async def sync_playlist(self, playlist_id, tracks_ids, max_workers=1, dry_run=False):
+        """
+        Asynchronous version of Deezer.sync_playlist
+        """
+        plistid = self._get_id("playlist", playlist_id)
+        current = [track["id"] async for track in self.iter_playlist_tracks(plistid, parallel=True)]
+        plan = plan_playlist_sync(current, (self._get_id("track", str(track)) for track in tracks_ids),
+                                  MAX_SONGS_LENGTH)
+        if dry_run or not plan.changed:
+            return plan
+        if plan.remove:
+            plan.results += await self.remove_tracks_playlist(plistid, plan.remove, max_workers=max_workers)
+            # Appending moved tracks that are still in place would scramble the order
+            if not plan.ok:
+                return plan
+        if plan.add:
+            plan.results += await self.add_tracks_playlist(plistid, plan.add)
+        if plan.order and plan.ok:
+            result = await self._post(f"playlist/{plistid}/tracks", "order", ",".join(plan.order))
+            plan.results.append(ChunkResult(plan.order, result))
+        return plan
+
+    async def resolve(self, model):
+        """
+        Fetch the missing fields of an entity stub, such as the album of a track
+        :param model: entity to complete
+        """
+        result = await self._get(f"{model.kind}/{model.id}")
+        if isinstance(result, DeezerException):
+            raise result
+        model._fill(result.to_dict() if isinstance(result, Model) else result)
+        return model
+
+# --------------------- Private Methods -------------------------------
+
+    def _resolve_model(self, model):
+        raise TypeError(f"'{model.kind}' {model.id} is a stub, use 'await client.resolve(entity)' to fetch it")
+
+    async def _batch_songs(self, call_method, playlist_id, tracks_ids, chunk_size, max_workers):
+        plistid = self._get_id("playlist", playlist_id)
+        chunks = self._songs_chunks(tracks_ids, chunk_size)
+        if max_workers <= 1:
+            return [await self._send_songs(call_method, plistid, chunk) for chunk in chunks]
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def send(chunk):
+            async with semaphore:
+                return await self._send_songs(call_method, plistid, chunk)
+        return await asyncio.gather(*(send(chunk) for chunk in chunks))
+
+    async def _send_songs(self, call_method, plistid, chunk):
+        try:
+            result = await self._call(call_method, f"playlist/{plistid}/tracks", "songs", ",".join(chunk))
+        except Exception as error:
+            result = self._exception_result(error)
+        return ChunkResult(chunk, result)
+
+    async def _bulk(self, type, ids, max_workers):
+        results = {}
+        async for position, result in self._iter_bulk(type, ids, max_workers):
+            results[position] = result
+        return [results[position] for position in range(len(results))]
+
+    async def _iter_bulk(self, type, ids, max_workers):
+        pending = set()
+        try:
+            for position, item in enumerate(ids):
+                if len(pending) >= max_workers:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.ensure_future(self._bulk_lookup(type, position, item)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _bulk_lookup(self, type, position, item):
+        try:
+            return position, await getattr(self, f"get_{type}")(str(item))
+        except Exception as error:
+            return position, self._exception_result(error)
+
+    async def _fan_out(self, response, max_items, max_workers):
+        seen = set()
+        count = 0
+        async for page in self._fan_out_pages(response, max_items, max_workers):
+            for item in page.get("data", []):
+                key = self._item_key(item)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                if max_items is not None and count >= max_items:
+                    return
+                yield item
+                count += 1
+            if max_items is not None and count >= max_items:
+                return
+
+    async def _fan_out_pages(self, response, max_items, max_workers):
+        if isinstance(response, DeezerException):
+            raise response
+        yield response
+        last = response
+        window = deque()
+        try:
+            for url in self._page_urls(response, max_items):
+                if len(window) >= max_workers:
+                    last = self._checked_page(await window.popleft())
+                    yield last
+                window.append(asyncio.ensure_future(self._get(url)))
+            while window:
+                last = self._checked_page(await window.popleft())
+                yield last
+        finally:
+            for task in window:
+                task.cancel()
+        while last.get("next"):
+            last = self._checked_page(await self.next(last))
+            yield last
+
+    def _build_flight(self):
+        return AsyncSingleFlight()
+
+    async def _get(self, url):
+        if self._flight is None:
+            return await self._call("GET", url)
+        return await self._flight.do(self._flight_key(url), lambda: self._call("GET", url))
+
+    async def _stream_page(self, url, limit, decoder):
+        url, params = self._prepare_request(url)
+        if limit:
+            params = dict(params or {}, limit=limit)
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async()
+        async for chunk in self.transport.astream("GET", url, params=params):
+            for item in decoder.feed(chunk):
+                yield item
+        decoder.close()
+
+    async def _search(self, path, query):
+        url = search_url(path, query)
+        if self.search_cache is None:
+            return await self._get(url)
+        token = self._access_token()
+        result = self.search_cache.get(path, query, token)
+        if result is None:
+            result = await self._get(url)
+            if not isinstance(result, DeezerException):
+                self.search_cache.set(path, query, result, token)
+        return result
+
+    async def _call(self, call_method, url, param=None, id=None):
+        start = time.perf_counter()
+        url, params = self._prepare_request(url, param, id)
+        lookup = self._cache_lookup(call_method, url, params)
+        if lookup.result is not None:
+            if self.hooks:
+                self._emit(RequestEvent(endpoint_template(url), call_method, url, cache="hit",
+                                        total=time.perf_counter() - start))
+            return lookup.result
+        attempt = 0
+        throttle = 0.0
+        while True:
+            if self.rate_limiter:
+                throttle += await self.rate_limiter.acquire_async()
+            sent = time.perf_counter()
+            try:
+                response = await self.transport.arequest(call_method, url, params=params, headers=lookup.headers)
+            except Exception as error:
+                if self.hooks:
+                    self._emit(self._failure_event(call_method, url, lookup, error, start, throttle, attempt))
+                raise
+            received = time.perf_counter()
+            result = self._handle_content(call_method, url, params, lookup, response.status_code, response.headers,
+                                          response.content)
+            delay = self._retry_delay(result, attempt)
+            if delay is None:
+                if self.hooks:
+                    self._emit(self._request_event(call_method, url, lookup, result, response, start, sent, received,
+                                                   throttle, attempt))
+                return result
+            await asyncio.sleep(delay)
+            attempt += 1
+
@@ -2,11 +2,37 @@ import os
 import requests
 import webbrowser
 import datetime
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlencode
+
+try:
+    import fcntl
+except ImportError:  # Windows: the file store only locks between threads
+    fcntl = None
+
+AUTH_URL = "https://connect.deezer.com/oauth/auth.php"
+ACCESS_TOKEN_URL = "https://connect.deezer.com/oauth/access_token.php"
 
 
 class DeezerCredentials:
 
-    def __init__(self, client_id=None, client_secret=None, scope=None, redirect_url=None):
+    def __init__(self, client_id=None, client_secret=None, scope=None, redirect_url=None, store=None,
+                 refresh_margin=300, code_provider=None):
+        """
+        :param client_id: ID of the application. Defaults to the DEEZER_CLIENT_ID variable
+        :param client_secret: secret of the application. Defaults to the DEEZER_SECRET_ID variable
+        :param scope: permissions requested, e.g. 'basic_access,manage_library,offline_access'
+        :param redirect_url: URL Deezer redirects to with the code. Defaults to DEEZER_REDIRECT_URL
+        :param store: FileTokenStore or SQLiteTokenStore keeping the token between runs and
+                      sharing it between processes
+        :param refresh_margin: seconds before its expiry a token is replaced
+        :param code_provider: callable returning the authorization code when a new token is
+                              needed, e.g. read from a web callback. Without it, the user is
+                              sent to the authorization page and prompted for the redirect URL
+        """
 
         if not client_id:
             client_id = os.environ.get("DEEZER_CLIENT_ID")
@@ -25,19 +51,70 @@ class DeezerCredentials:
         self.token = None
         self.scope = scope
         self.redirect_url = redirect_url
-        self.token_expires = 0
+        # None once a token is known means it does not expire (offline_access permission)
+        self.token_expires = None
+        self.store = store
+        self.refresh_margin = refresh_margin
+        self.code_provider = code_provider
+        self._lock = threading.Lock()
 
     def get_access_token(self):
+        """
+        Return a valid access token, taken from memory, then from the store, and fetched only
+        when neither holds one. Concurrent callers, threads or processes sharing the store,
+        wait for a single fetch.
+        """
         if self.token and not self.is_token_expired():
             return self.token
 
-        new_token = self._retrieve_access_token()
-        self.token = new_token
-        return new_token
+        with self._lock:
+            if self.token and not self.is_token_expired():
+                return self.token
+            if self.store is None:
+                return self._set_token(*self._retrieve_access_token())
+            if self._load_token():
+                return self.token
+            with self.store.lock():
+                # Another process may have fetched a token while we were waiting for the lock
+                if self._load_token():
+                    return self.token
+                return self._set_token(*self._retrieve_access_token())
+
+    def authorize_url(self):
+        """
+        URL of the page where the user grants the permissions and gets the code
+        """
+        query = urlencode({"app_id": self.client_id, "redirect_uri": self.redirect_url, "perms": self.scope})
+        return f"{AUTH_URL}?{query}"
+
+    def exchange_code(self, code):
+        """
+        Exchange an authorization code for an access token, without any prompt, and save it
+        to the store
+        :param code: code received on the redirect URL, or the redirect URL itself
+        :return: the access token, or None if the code was refused
+        """
+        if code and "code=" in code:
+            code = self._parse_response_code(code)
+        with self._lock:
+            if self.store is None:
+                return self._set_token(*self._request_token(code))
+            with self.store.lock():
+                return self._set_token(*self._request_token(code))
+
+    def is_token_expired(self):
+        if not self.token:
+            return True
+        if self.token_expires is None:
+            return False
+        margin = datetime.timedelta(seconds=self.refresh_margin)
+        return datetime.datetime.now() + margin >= self.token_expires
 
     def _retrieve_access_token(self):
-        auth = f"https://connect.deezer.com/oauth/auth.php?app_id={self.client_id}&redirect_uri={self.redirect_url}" \
-               f"&perms={self.scope}"
+        if self.code_provider is not None:
+            return self._request_token(self.code_provider())
+
+        auth = self.authorize_url()
         try:
             webbrowser.open(auth)
         except:
@@ -45,40 +122,165 @@ class DeezerCredentials:
 
         response = input("Enter the URL you were redirected to: ")
         code = self._parse_response_code(response)
-        access = f"https://connect.deezer.com/oauth/access_token.php?app_id={self.client_id}&secret={self.client_secret}" \
-                 f"&code={code}"
-
-        res = requests.get(access)
-        token, expires = self._parse_response_token(res.text)
+        token, expires = self._request_token(code)
         print(f"Your access token is: {token}")
+        return token, expires
 
-        self.token_expires = expires
+    def _request_token(self, code):
+        res = requests.get(ACCESS_TOKEN_URL, params={"app_id": self.client_id, "secret": self.client_secret,
+                                                     "code": code})
+        return self._parse_response_token(res.text)
 
-        if token:
-            return token
-        else:
+    def _set_token(self, token, expires):
+        if not token:
             return None
+        self.token = token
+        self.token_expires = expires
+        if self.store is not None:
+            self.store.save(self.client_id, token, expires.timestamp() if expires else None)
+        return token
 
-    def is_token_expired(self):
-        now = datetime.datetime.now()
-        if now > self.token_expires:
-            return True
+    def _load_token(self):
+        stored = self.store.load(self.client_id)
+        if stored is None:
+            return False
+        token, expires = stored
+        self.token = token
+        self.token_expires = datetime.datetime.fromtimestamp(expires) if expires else None
+        if self.is_token_expired():
+            self.token = None
+            return False
+        return True
 
     def _parse_response_code(self, response):
         try:
-            return response.split("?code=")[1]
-        except IndexError:
+            return parse_qs(response.split("?", 1)[1])["code"][0]
+        except (IndexError, KeyError):
             return None
 
     def _parse_response_token(self, response):
         try:
-            token = response.split("access_token=")[1].split("&expires=")[0]
-            seconds = int(response.split("access_token=")[1].split("&expires=")[1])
-            expires = datetime.datetime.now() + datetime.timedelta(seconds=seconds)
-            return token, expires
-        except IndexError:
+            fields = parse_qs(response)
+            token = fields["access_token"][0]
+            seconds = int(fields.get("expires", ["0"])[0])
+        except (KeyError, ValueError):
+            return None, None
+        # Tokens granted with the offline_access permission never expire
+        expires = datetime.datetime.now() + datetime.timedelta(seconds=seconds) if seconds else None
+        return token, expires
+
+
+class FileTokenStore:
+    """
+    Keeps access tokens in a JSON file, keyed on the application ID, so they survive restarts
+    and are shared by the processes using the same file. A lock file serializes the token
+    fetches between processes.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: path of the JSON file. The lock file is the same path ending in '.lock'
+        """
+        self.path = path
+
+    def load(self, client_id):
+        """
+        Return the (token, expiry timestamp) of an application, or None
+        """
+        try:
+            with open(self.path, encoding="utf-8") as stored:
+                entry = json.load(stored).get(str(client_id))
+        except (OSError, ValueError):
+            return None
+        if not entry:
             return None
+        return entry["access_token"], entry["expires"]
 
+    def save(self, client_id, token, expires):
+        """
+        Store the token of an application
+        :param expires: timestamp of its expiry, or None if it does not expire
+        """
+        try:
+            with open(self.path, encoding="utf-8") as stored:
+                tokens = json.load(stored)
+        except (OSError, ValueError):
+            tokens = {}
+        tokens[str(client_id)] = {"access_token": token, "expires": expires}
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        # Created readable by the owner only, the token never being exposed to other users
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(descriptor, "w", encoding="utf-8") as stored:
+            json.dump(tokens, stored)
+        os.replace(temporary, self.path)
 
+    @contextmanager
+    def lock(self):
+        with open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
 
 
+class SQLiteTokenStore:
+    """
+    Keeps access tokens in a SQLite database, keyed on the application ID. Token fetches are
+    serialized between processes with a write transaction.
+    """
+
+    def __init__(self, path, timeout=60):
+        """
+        :param path: path of the database file
+        :param timeout: seconds to wait for another process fetching a token
+        """
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS tokens "
+                               "(client_id TEXT PRIMARY KEY, access_token TEXT NOT NULL, expires REAL)")
+
+    def load(self, client_id):
+        """
+        Return the (token, expiry timestamp) of an application, or None
+        """
+        row = self._connection().execute("SELECT access_token, expires FROM tokens WHERE client_id = ?",
+                                         (str(client_id),)).fetchone()
+        return tuple(row) if row else None
+
+    def save(self, client_id, token, expires):
+        """
+        Store the token of an application
+        :param expires: timestamp of its expiry, or None if it does not expire
+        """
+        connection = self._connection()
+        connection.execute("INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)", (str(client_id), token, expires))
+        if not getattr(self._local, "locked", False):
+            connection.commit()
+
+    @contextmanager
+    def lock(self):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        self._local.locked = True
+        try:
+            yield
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            self._local.locked = False
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        # Connections must not cross a fork, each process opens its own
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
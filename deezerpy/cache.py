@@ -0,0 +1,503 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from .index import tokenize
+from .models import Page
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+# Time to live, in seconds, of each family of endpoints. A TTL of 0 disables caching.
+DEFAULT_TTLS = {
+    "album": 6 * HOUR,
+    "artist": 6 * HOUR,
+    "track": 6 * HOUR,
+    "episode": 6 * HOUR,
+    "genre": 24 * HOUR,
+    "infos": HOUR,
+    "podcast": HOUR,
+    "user": HOUR,
+    "playlist": 10 * MINUTE,
+    "comment": 10 * MINUTE,
+    "search": 10 * MINUTE,
+    "chart": 5 * MINUTE,
+    "editorial": 5 * MINUTE,
+    "user/me": 0,
+    "options": 0,
+}
+
+
+def _token_identity(token):
+    # Entries are kept apart per access token, without storing the token itself
+    if not token:
+        return "anonymous"
+    return hashlib.sha1(token.encode()).hexdigest()[:16]
+
+
+class CacheLookup:
+    """
+    Outcome of looking a request up in the cache, as used by the client
+    """
+
+    __slots__ = ("key", "result", "stale", "headers")
+
+    def __init__(self, key=None, result=None, stale=None, headers=None):
+        self.key = key
+        self.result = result
+        self.stale = stale
+        self.headers = headers
+
+
+class BaseCache:
+    """
+    Key building, TTL policies and counters shared by the cache backends. Backends implement
+    get, get_stale, set, refresh, invalidate and clear.
+    """
+
+    def __init__(self, ttls=None, default_ttl=HOUR):
+        """
+        :param ttls: dictionary of endpoint family -> seconds, merged over DEFAULT_TTLS.
+                     Families are the first segment of the path ('album', 'chart'...), plus 'user/me'
+        :param default_ttl: seconds to keep responses of endpoints missing in ttls
+        """
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+
+    def key(self, url, params=None):
+        """
+        Build the cache key of a request
+        :param url: URL of the request
+        :param params: query parameters sent along the URL, including the access token if any
+        """
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query) + list((params or {}).items())
+        token = ""
+        for name, value in query:
+            if name == "access_token":
+                token = value
+        query = sorted((name, str(value)) for name, value in query if name != "access_token")
+        path = parts.path.strip("/")
+        if query:
+            path = f"{path}?{urlencode(query)}"
+        return f"{self._identity(token)}|{path}"
+
+    def ttl(self, key):
+        """
+        Seconds a response can be served from the cache
+        :param key: cache key of the request
+        """
+        path = key.split("|", 1)[1]
+        if path.startswith("user/me"):
+            return self.ttls.get("user/me", self.default_ttl)
+        family = path.split("/", 1)[0].split("?", 1)[0]
+        return self.ttls.get(family, self.default_ttl)
+
+    def stats(self):
+        """
+        Return the hit, miss, eviction and revalidation counters along with the current size
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "revalidations": self.revalidations, "size": len(self)}
+
+    def _identity(self, token):
+        return _token_identity(token)
+
+    def _matches(self, cached, identity, path):
+        cached_identity, cached_path = cached.split("|", 1)
+        return cached_identity == identity and (cached_path == path or cached_path.startswith((f"{path}/", f"{path}?")))
+
+
+class ResponseCache(BaseCache):
+    """
+    In-memory cache of GET responses with LRU eviction and per-endpoint TTLs.
+
+        dz = Deezer(cache=ResponseCache(max_entries=50000))
+
+    Entries are keyed on the normalized URL and the access token used for the call, so
+    authenticated and anonymous responses never mix.
+    """
+
+    def __init__(self, max_entries=10000, ttls=None, default_ttl=HOUR):
+        """
+        :param max_entries: maximum number of responses kept before evicting the least recently used
+        :param ttls: dictionary of endpoint family -> seconds, merged over DEFAULT_TTLS
+        :param default_ttl: seconds to keep responses of endpoints missing in ttls
+        """
+        super().__init__(ttls, default_ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Sent to the workers of a ProcessPool: each one gets a copy of the entries
+        with self._lock:
+            state = dict(self.__dict__, _entries=OrderedDict(self._entries))
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Return the cached content for the key, or None if it is missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, content, validators = entry
+            if expires < time.monotonic():
+                # Expired entries are kept while they can still be revalidated
+                if not validators:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return content
+
+    def get_stale(self, key):
+        """
+        Return the (content, validators) of an expired entry that can be revalidated, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry[2]:
+                return None
+            return entry[1], entry[2]
+
+    def set(self, key, content, validators=None):
+        """
+        Store the content of a response, unless its endpoint is not cacheable
+        :param key: cache key of the request
+        :param content: body of the response
+        :param validators: dictionary with the 'etag' and/or 'last_modified' of the response
+        """
+        ttl = self.ttl(key)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, content, validators)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def refresh(self, key):
+        """
+        Extend the life of an entry after the API confirmed it has not changed
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (time.monotonic() + self.ttl(key), entry[1], entry[2])
+                self._entries.move_to_end(key)
+                self.revalidations += 1
+
+    def invalidate(self, key):
+        """
+        Drop every entry of the same identity whose path starts with the path of the key
+        """
+        identity, path = key.split("|", 1)
+        with self._lock:
+            for cached in [cached for cached in self._entries if self._matches(cached, identity, path)]:
+                del self._entries[cached]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(BaseCache):
+    """
+    Disk-backed cache of GET responses stored in a SQLite database. Several processes can share
+    the same file; responses survive restarts, are stored compressed and, once expired, are
+    revalidated with conditional requests when the API sent an ETag or Last-Modified header.
+
+        dz = Deezer(cache=SQLiteCache("~/.cache/deezerpy.sqlite", max_size=512 * 1024 * 1024))
+    """
+
+    # Number of writes between two checks of the size of the database
+    EVICTION_INTERVAL = 100
+    # Seconds between two updates of the access time of the same entry
+    ACCESS_RESOLUTION = 60
+
+    def __init__(self, path, max_size=256 * 1024 * 1024, ttls=None, default_ttl=HOUR, compression_level=6):
+        """
+        :param path: location of the database file
+        :param max_size: maximum number of compressed bytes stored before evicting the least
+                         recently used responses
+        :param ttls: dictionary of endpoint family -> seconds, merged over DEFAULT_TTLS
+        :param default_ttl: seconds to keep responses of endpoints missing in ttls
+        :param compression_level: zlib compression level of the stored responses
+        """
+        super().__init__(ttls, default_ttl)
+        self.path = os.path.expanduser(path)
+        self.max_size = max_size
+        self.compression_level = compression_level
+        self._local = threading.local()
+        self._writes = 0
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, content BLOB, size INTEGER, "
+                "expires REAL, accessed REAL, etag TEXT, last_modified TEXT)")
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        """
+        Return the cached content for the key, or None if it is missing or expired
+        """
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute("SELECT content, expires, accessed FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < now:
+            self.misses += 1
+            return None
+        if row[2] < now - self.ACCESS_RESOLUTION:
+            with connection:
+                connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return zlib.decompress(row[0])
+
+    def get_stale(self, key):
+        """
+        Return the (content, validators) of an expired entry that can be revalidated, or None
+        """
+        row = self._connection().execute(
+            "SELECT content, etag, last_modified FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or not (row[1] or row[2]):
+            return None
+        validators = {name: value for name, value in (("etag", row[1]), ("last_modified", row[2])) if value}
+        return zlib.decompress(row[0]), validators
+
+    def set(self, key, content, validators=None):
+        """
+        Store the content of a response, unless its endpoint is not cacheable
+        :param key: cache key of the request
+        :param content: body of the response
+        :param validators: dictionary with the 'etag' and/or 'last_modified' of the response
+        """
+        ttl = self.ttl(key)
+        if ttl <= 0:
+            return
+        validators = validators or {}
+        now = time.time()
+        compressed = zlib.compress(content, self.compression_level)
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, compressed, len(compressed), now + ttl, now, validators.get("etag"),
+                 validators.get("last_modified")))
+        self._writes += 1
+        if self._writes % self.EVICTION_INTERVAL == 0:
+            self.evict()
+
+    def refresh(self, key):
+        """
+        Extend the life of an entry after the API confirmed it has not changed
+        """
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute("UPDATE responses SET expires = ?, accessed = ? WHERE key = ?",
+                               (now + self.ttl(key), now, key))
+        self.revalidations += 1
+
+    def invalidate(self, key):
+        """
+        Drop every entry of the same identity whose path starts with the path of the key
+        """
+        with self._connection() as connection:
+            connection.execute(
+                "DELETE FROM responses WHERE key = ? OR substr(key, 1, ?) = ? OR substr(key, 1, ?) = ?",
+                (key, len(key) + 1, f"{key}/", len(key) + 1, f"{key}?"))
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM responses")
+
+    def evict(self):
+        """
+        Remove expired responses that cannot be revalidated, then the least recently used
+        ones until the database fits in max_size
+        """
+        with self._connection() as connection:
+            connection.execute(
+                "DELETE FROM responses WHERE expires < ? AND etag IS NULL AND last_modified IS NULL", (time.time(),))
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_size:
+                return
+            victims = []
+            for key, size in connection.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                victims.append((key,))
+                total -= size
+                if total <= self.max_size:
+                    break
+            connection.executemany("DELETE FROM responses WHERE key = ?", victims)
+            self.evictions += len(victims)
+
+    def __getstate__(self):
+        # Sent to the workers of a ProcessPool: each one opens its own connection to the file
+        state = dict(self.__dict__)
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        # Connections must not cross a fork, each process opens its own
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+
+class SearchCache:
+    """
+    Cache of search results, keyed on the canonical query and the access token sending it.
+
+        dz = Deezer(search_cache=SearchCache(prefix_reuse=True))
+
+    With prefix_reuse, a search extending a cached one ('daft pu' after 'daft') is answered
+    by filtering the results of the broader search, provided they were complete, i.e. fit in
+    a single page. This is meant for type-ahead, where every keystroke sends a search.
+    """
+
+    # Fields of the results matched against the words of a narrowed query
+    TEXT_FIELDS = (("title",), ("name",), ("artist", "name"), ("album", "title"))
+
+    def __init__(self, max_entries=1024, ttl=10 * MINUTE, prefix_reuse=False, min_prefix=2):
+        """
+        :param max_entries: maximum number of searches kept before evicting the least recently used
+        :param ttl: seconds a search result can be served from the cache
+        :param prefix_reuse: answer searches extending a complete cached search without the API
+        :param min_prefix: shortest cached query reused to answer longer ones
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.prefix_reuse = prefix_reuse
+        self.min_prefix = min_prefix
+        self.hits = 0
+        self.narrowed = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Sent to the workers of a ProcessPool: each one gets a copy of the entries
+        with self._lock:
+            state = dict(self.__dict__, _entries=OrderedDict(self._entries))
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, path, query, token=None):
+        """
+        Return the results of a search, or None if it has to be sent
+        :param path: 'search' or 'search/<method>'
+        :param query: canonical query
+        :param token: access token of the client, searches of other users are not served
+        """
+        identity = _token_identity(token)
+        with self._lock:
+            result = self._get((identity, path, query))
+            if result is not None:
+                self.hits += 1
+                return result
+            # Advanced searches are not narrowed, the words of their fields cannot be told apart
+            if self.prefix_reuse and ":" not in query:
+                for end in range(len(query) - 1, self.min_prefix - 1, -1):
+                    broader = self._get((identity, path, query[:end].rstrip()))
+                    if broader is not None and not broader.get("next"):
+                        self.narrowed += 1
+                        return self._narrow(broader, query)
+            self.misses += 1
+            return None
+
+    def set(self, path, query, result, token=None):
+        """
+        Store the results of a search
+        """
+        key = (_token_identity(token), path, query)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return the hit, narrowed and miss counters along with the current size
+        """
+        return {"hits": self.hits, "narrowed": self.narrowed, "misses": self.misses, "size": len(self)}
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _narrow(self, result, query):
+        words = tokenize(query)
+        data = [item for item in result.get("data", []) if self._matches(item, words)]
+        if isinstance(result, Page):
+            page = Page({"data": []})
+            page.data, page.total = data, len(data)
+            return page
+        return {"data": data, "total": len(data)}
+
+    def _matches(self, item, words):
+        tokens = []
+        for path in self.TEXT_FIELDS:
+            value = item
+            for key in path:
+                value = value.get(key) if value is not None else None
+            if isinstance(value, str):
+                tokens += tokenize(value)
+        return all(any(token.startswith(word) for token in tokens) for word in words)
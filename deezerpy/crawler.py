@@ -0,0 +1,327 @@
+import json
+import os
+from array import array
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .models import Model
+
+# Kinds of entities met by the crawler. Their position is stored in the high bits of the
+# visited keys, and orders the frontier: albums are expanded before the artists of the
+# same depth, which keeps the frontier short.
+KINDS = ("album", "artist", "track")
+KIND_SHIFT = 60
+
+
+class IdSet:
+    """
+    Set of non-negative integers stored in a flat open-addressing table, using 8 bytes per
+    slot instead of the ~70 bytes of an int in a set
+    """
+
+    def __init__(self, capacity=1024):
+        size = 1
+        while size < capacity * 2:
+            size *= 2
+        self._slots = array("Q", bytes(8 * size))
+        self._count = 0
+
+    def add(self, value):
+        """
+        Add a value to the set
+        :return: True if the value was not in the set yet
+        """
+        if self._count * 10 >= len(self._slots) * 7:
+            self._grow()
+        index = self._find(value)
+        if self._slots[index]:
+            return False
+        self._slots[index] = value + 1
+        self._count += 1
+        return True
+
+    def __contains__(self, value):
+        return self._slots[self._find(value)] != 0
+
+    def __len__(self):
+        return self._count
+
+    def to_bytes(self):
+        return self._slots.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, count):
+        ids = cls(0)
+        ids._slots = array("Q")
+        ids._slots.frombytes(data)
+        ids._count = count
+        return ids
+
+    def _find(self, value):
+        mask = len(self._slots) - 1
+        stored = value + 1
+        index = (value * 0x9E3779B97F4A7C15 >> 16) & mask
+        while self._slots[index] and self._slots[index] != stored:
+            index = (index + 1) & mask
+        return index
+
+    def _grow(self):
+        values = [slot - 1 for slot in self._slots if slot]
+        self._slots = array("Q", bytes(16 * len(self._slots)))
+        for value in values:
+            self._slots[self._find(value)] = value + 1
+
+
+class Frontier:
+    """
+    Queue of the artists and albums waiting to be expanded, ordered by depth, then kind, then
+    arrival. IDs are kept in one array of 8-byte integers per (depth, kind), instead of a
+    heap of Python objects.
+    """
+
+    def __init__(self):
+        # (depth, kind index) -> [array of IDs, position of the first one not popped yet]
+        self._queues = {}
+        self._count = 0
+
+    def push(self, depth, kind, id):
+        queue = self._queues.get((depth, KINDS.index(kind)))
+        if queue is None:
+            queue = self._queues[depth, KINDS.index(kind)] = [array("Q"), 0]
+        queue[0].append(int(id))
+        self._count += 1
+
+    def pop(self):
+        """
+        :return: (depth, kind, id) of the next entry
+        """
+        depth, kind = key = min(self._queues)
+        queue = self._queues[key]
+        ids, head = queue
+        id = ids[head]
+        head += 1
+        if head == len(ids):
+            del self._queues[key]
+        elif head >= 4096 and head * 2 >= len(ids):
+            # Release the popped IDs once they make up half of the array
+            del ids[:head]
+            head = 0
+        queue[1] = head
+        self._count -= 1
+        return depth, KINDS[kind], id
+
+    def __len__(self):
+        return self._count
+
+    def layout(self):
+        """
+        :return: [depth, kind index, count] of every queue, in the order write stores them
+        """
+        return [[depth, kind, len(ids) - head] for (depth, kind), (ids, head) in sorted(self._queues.items())]
+
+    def write(self, file):
+        """
+        Write the IDs of every queue to a binary file, without copying them
+        """
+        for _, (ids, head) in sorted(self._queues.items()):
+            file.write(memoryview(ids)[head:])
+
+    @classmethod
+    def from_bytes(cls, layout, data):
+        frontier = cls()
+        ids = array("Q")
+        ids.frombytes(data)
+        start = 0
+        for depth, kind, count in layout:
+            queue = frontier._queues.setdefault((depth, kind), [array("Q"), 0])
+            queue[0].extend(ids[start:start + count])
+            start += count
+        frontier._count = start
+        return frontier
+
+
+class CatalogCrawler:
+    """
+    Walk the catalog from seed artists, through their related artists, albums and top
+    tracks, and the tracks of every album. Entities are yielded as (kind, item) as they are
+    discovered, each one once:
+
+        crawler = CatalogCrawler(dz, ["27", "13"], "crawl.checkpoint", max_depth=2)
+        for kind, item in crawler.run():
+            ...
+
+    Requests are sent by a pool of workers through the client, so they share its rate
+    limiter. Both the frontier and the visited entities take 8 bytes per entity, and are
+    written to the checkpoint file regularly; running a crawler with the same file resumes
+    the crawl where it stopped.
+    Requires the synchronous Deezer client.
+    """
+
+    def __init__(self, client, seeds, checkpoint=None, max_depth=None, max_entities=None, max_workers=None,
+                 checkpoint_every=500, pool=None):
+        """
+        :param client: Deezer client used to send the requests
+        :param seeds: IDs or URLs of the artists to start from
+        :param checkpoint: path of the checkpoint file. Without it, the crawl cannot be resumed
+        :param max_depth: number of 'related' hops followed from the seeds
+        :param max_entities: stop once this many entities have been yielded. The artist or album
+                             being expanded is completed, so a few more may be yielded
+        :param max_workers: number of artists or albums expanded concurrently. Defaults to 4
+        :param checkpoint_every: number of expanded artists or albums between two checkpoints
+        :param pool: ProcessPool expanding the artists and albums in its worker processes,
+                     instead of threads of this one. max_workers then defaults to its number
+                     of processes
+        """
+        self.client = client
+        self.checkpoint = checkpoint
+        self.max_depth = max_depth
+        self.max_entities = max_entities
+        self.max_workers = max_workers or (pool.max_workers if pool is not None else 4)
+        self.pool = pool
+        self.checkpoint_every = checkpoint_every
+        self.yielded = 0
+        self.expanded = 0
+        self.errors = 0
+        self._frontier = Frontier()
+        self._visited = IdSet()
+        if checkpoint and os.path.exists(checkpoint):
+            self._load()
+        else:
+            for seed in seeds:
+                self._push("artist", int(client._get_id("artist", str(seed))), 0)
+
+    def run(self):
+        """
+        Crawl until the frontier is empty or the budget is spent
+        :return: generator of (kind, item), where kind is 'artist', 'album' or 'track'
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers) if self.pool is None else None
+        running = {}
+        # Entry whose results are being yielded: if the consumer stops in the middle, it is
+        # expanded again on resume, the entities already yielded being skipped
+        current = None
+        try:
+            while (self._frontier or running) and not self._spent():
+                while self._frontier and len(running) < self.max_workers:
+                    entry = self._frontier.pop()
+                    if executor is None:
+                        future = self.pool.submit(expand_entry, entry, self.max_depth)
+                    else:
+                        future = executor.submit(expand_entry, self.client, entry, self.max_depth)
+                    running[future] = entry
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entry = running.pop(future)
+                    if self._spent():
+                        self._frontier.push(*entry)
+                        continue
+                    try:
+                        found = future.result()
+                    except Exception as error:
+                        self.errors += 1
+                        self.client._warn_message(f"Could not crawl {entry[1]} {entry[2]}: {error}. ")
+                        continue
+                    current = entry
+                    for kind, item, expand in found:
+                        if expand is not None and not self._visited.add(self._key(kind, item["id"])):
+                            continue
+                        if expand:
+                            self._push(kind, item["id"], entry[0] + (kind == "artist"), visited=True)
+                        self.yielded += 1
+                        yield kind, item
+                    current = None
+                    self.expanded += 1
+                    if self.checkpoint and self.expanded % self.checkpoint_every == 0:
+                        self.save(running.values())
+        finally:
+            for future in running:
+                future.cancel()
+            if executor is not None:
+                executor.shutdown(wait=True)
+            if self.checkpoint:
+                self.save(list(running.values()) + ([current] if current else []))
+
+    def stats(self):
+        """
+        Progress of the crawl
+        """
+        return {"yielded": self.yielded, "expanded": self.expanded, "errors": self.errors,
+                "frontier": len(self._frontier), "visited": len(self._visited)}
+
+    def save(self, running=()):
+        """
+        Write the frontier and the visited entities to the checkpoint file
+        :param running: entries being expanded, put back in the frontier
+        """
+        # Entries being expanded follow the queues, each as a queue of its own
+        running = list(running)
+        layout = self._frontier.layout() + [[depth, KINDS.index(kind), 1] for depth, kind, _ in running]
+        state = {"frontier": layout, "visited": len(self._visited), "yielded": self.yielded,
+                 "expanded": self.expanded, "errors": self.errors}
+        temporary = self.checkpoint + ".tmp"
+        # A JSON line, then the IDs of the frontier, then the table of the visited entities
+        with open(temporary, "wb") as checkpoint:
+            checkpoint.write(json.dumps(state, separators=(",", ":")).encode() + b"\n")
+            self._frontier.write(checkpoint)
+            checkpoint.write(array("Q", [id for _, _, id in running]).tobytes())
+            checkpoint.write(self._visited.to_bytes())
+        os.replace(temporary, self.checkpoint)
+
+    def _load(self):
+        with open(self.checkpoint, "rb") as checkpoint:
+            state = json.loads(checkpoint.readline())
+            ids = checkpoint.read(8 * sum(count for _, _, count in state["frontier"]))
+            self._frontier = Frontier.from_bytes(state["frontier"], ids)
+            self._visited = IdSet.from_bytes(checkpoint.read(), state["visited"])
+        self.yielded = state["yielded"]
+        self.expanded = state["expanded"]
+        self.errors = state["errors"]
+
+    def _push(self, kind, id, depth, visited=False):
+        if not visited:
+            self._visited.add(self._key(kind, id))
+        self._frontier.push(depth, kind, id)
+
+    def _spent(self):
+        return self.max_entities is not None and self.yielded >= self.max_entities
+
+    @staticmethod
+    def _key(kind, id):
+        return KINDS.index(kind) << KIND_SHIFT | int(id)
+
+
+def expand_entry(client, entry, max_depth):
+    """
+    Fetch what a frontier entry leads to: the tracks of an album, or the related artists,
+    albums and top tracks of an artist, plus the artist itself for the seeds
+    :param entry: (depth, kind, id) taken from the frontier
+    :return: list of (kind, item, expand), expand telling whether the item joins the frontier,
+             or None for an item yielded without deduplication
+    """
+    depth, kind, id = entry
+    id = str(id)
+    found = []
+    if kind == "album":
+        for track in _items(client, client.get_album(id, "tracks")):
+            found.append(("track", track, False))
+        return found
+    if depth == 0:
+        artist = client.get_artist(id)
+        if isinstance(artist, Exception):
+            raise artist
+        found.append(("artist", _as_dict(artist), None))
+    if max_depth is None or depth < max_depth:
+        for related in _items(client, client.get_artist(id, "related")):
+            found.append(("artist", related, True))
+    for album in _items(client, client.get_artist(id, "albums")):
+        found.append(("album", album, True))
+    for track in _items(client, client.get_artist(id, "top")):
+        found.append(("track", track, False))
+    return found
+
+
+def _items(client, response):
+    return [_as_dict(item) for item in client.paginate(response, prefetch=False)]
+
+
+def _as_dict(item):
+    return item.to_dict() if isinstance(item, Model) else item
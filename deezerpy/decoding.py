@@ -0,0 +1,166 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_STRUCTURE = re.compile(rb'["{}\[\]]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb"[,}\] \t\n\r]")
+
+_QUOTE, _BACKSLASH = ord('"'), ord("\\")
+_OPENERS = (ord("{"), ord("["))
+
+
+def default_decoder():
+    """
+    Return the fastest JSON decoder available: orjson when it is installed, json otherwise
+    """
+    if orjson is not None:
+        return orjson.loads
+    return json.loads
+
+
+class StreamingDecoder:
+    """
+    Incremental decoder yielding the items of one array of a JSON object, such as the 'data'
+    of a page, as the bytes of the response arrive. Only one item is held in memory at a
+    time; the other keys of the object (total, next...) are collected in meta.
+
+        decoder = StreamingDecoder()
+        for chunk in chunks:
+            for item in decoder.feed(chunk):
+                ...
+        decoder.close()
+    """
+
+    def __init__(self, key="data", decoder=None):
+        """
+        :param key: name of the array whose items are yielded
+        :param decoder: function decoding a JSON document, defaults to default_decoder()
+        """
+        self.key = key
+        self.decoder = decoder or default_decoder()
+        self.meta = {}
+        self._buffer = bytearray()
+        self._state = "start"
+
+    def feed(self, chunk):
+        """
+        Add the next bytes of the document and yield the items completed by them
+        """
+        self._buffer += chunk
+        buffer = self._buffer
+        pos = 0
+        try:
+            while True:
+                pos = _WHITESPACE.match(buffer, pos).end()
+                if pos >= len(buffer):
+                    return
+                char = buffer[pos]
+                if self._state == "start":
+                    if char != ord("{"):
+                        raise ValueError("Expecting a JSON object")
+                    pos += 1
+                    self._state = "key"
+                elif self._state == "key":
+                    if char == ord(","):
+                        pos += 1
+                    elif char == ord("}"):
+                        pos += 1
+                        self._state = "done"
+                    else:
+                        end = self._parse_member(buffer, pos)
+                        if end is None:
+                            return
+                        pos = end
+                elif self._state == "items":
+                    if char == ord(","):
+                        pos += 1
+                    elif char == ord("]"):
+                        pos += 1
+                        self._state = "key"
+                    else:
+                        end = _value_end(buffer, pos)
+                        if end < 0:
+                            return
+                        item = self.decoder(bytes(buffer[pos:end]))
+                        pos = end
+                        yield item
+                else:
+                    raise ValueError("Unexpected data after the end of the document")
+        finally:
+            del buffer[:pos]
+
+    def close(self):
+        """
+        Check the whole document was received
+        """
+        if self._state != "done":
+            raise ValueError("Incomplete JSON document")
+
+    def _parse_member(self, buffer, pos):
+        # Parse '"key": value' and return the position after it, or None if incomplete
+        key_end = _value_end(buffer, pos)
+        if key_end < 0:
+            return None
+        colon = _WHITESPACE.match(buffer, key_end).end()
+        if colon >= len(buffer):
+            return None
+        value = _WHITESPACE.match(buffer, colon + 1).end()
+        if value >= len(buffer):
+            return None
+        key = json.loads(bytes(buffer[pos:key_end]))
+        if key == self.key and buffer[value] == ord("["):
+            self._state = "items"
+            return value + 1
+        end = _value_end(buffer, value)
+        if end < 0:
+            return None
+        self.meta[key] = self.decoder(bytes(buffer[value:end]))
+        return end
+
+
+def _value_end(buffer, start):
+    # Position right after the JSON value starting at start, or -1 if it is incomplete
+    char = buffer[start]
+    if char == _QUOTE:
+        return _string_end(buffer, start)
+    if char in _OPENERS:
+        depth = 0
+        pos = start
+        while True:
+            match = _STRUCTURE.search(buffer, pos)
+            if match is None:
+                return -1
+            pos = match.start()
+            char = buffer[pos]
+            if char == _QUOTE:
+                pos = _string_end(buffer, pos)
+                if pos < 0:
+                    return -1
+                continue
+            if char in _OPENERS:
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            pos += 1
+    match = _SCALAR_END.search(buffer, start)
+    return match.start() if match else -1
+
+
+def _string_end(buffer, start):
+    pos = start + 1
+    while True:
+        match = _STRING_SPECIAL.search(buffer, pos)
+        if match is None:
+            return -1
+        if buffer[match.start()] == _BACKSLASH:
+            pos = match.start() + 2
+        else:
+            return match.start() + 1
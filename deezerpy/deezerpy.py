@@ -1,13 +1,102 @@
+import random
 import sys
-import requests
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from .cache import CacheLookup
+from .decoding import StreamingDecoder, default_decoder
+from .flight import SingleFlight
+from .metrics import RequestEvent, endpoint_template
+from .models import Model, parse
+from .query import advanced_query, canonical_query, search_url
+from .ratelimit import RateLimiter
+from .resolver import ALIASES, SHORT_LINK, IdResolver
+from .sync import plan_playlist_sync
+from .transport import HTTPTransport
+
+# Error code returned by the API when the application exceeded its request quota
+QUOTA_ERROR_CODE = 4
+# Longest value of the 'songs' parameter sent in one request, once URL-encoded
+MAX_SONGS_LENGTH = 6000
 
 
 class Deezer:
 
-    def __init__(self, auth=None, credentials_manager=None):
-        self.base_url = "https://api.deezer.com/"
+    def __init__(self, auth=None, credentials_manager=None, pool_connections=10, pool_maxsize=10, session=None,
+                 transport=None, cache=None, rate_limiter=None, max_retries=3, backoff=1.0, max_backoff=30.0, coalesce=True,
+                 models=False, json_decoder=None, hooks=None, base_url="https://api.deezer.com/", search_cache=None):
+        """
+        :param auth: access token used for authenticated calls
+        :param credentials_manager: DeezerCredentials object handling the access token
+        :param pool_connections: number of hosts to keep connection pools for
+        :param pool_maxsize: maximum number of keep-alive connections kept per host
+        :param session: optional requests.Session to use instead of the client's own one
+        :param transport: Transport sending the requests, e.g. a FakeTransport or a CassetteTransport.
+                          Defaults to an HTTPTransport configured with the pool and session arguments
+        :param cache: optional ResponseCache or SQLiteCache used to serve repeated GET requests
+        :param rate_limiter: RateLimiter applied to every request. Defaults to Deezer's quota of
+                             50 requests every 5 seconds. Use False to disable it
+        :param max_retries: number of times a request is retried after a quota error
+        :param backoff: base delay in seconds of the exponential backoff between retries
+        :param max_backoff: maximum delay in seconds between retries
+        :param coalesce: share the response of a GET request with the identical requests issued
+                         while it is in flight, instead of sending them again. Those callers
+                         receive the same dictionary or model: copy it before modifying it
+        :param models: return typed entities (Track, Album, Artist...) instead of dictionaries
+        :param json_decoder: function decoding the body of the responses. Defaults to orjson.loads
+                             when orjson is installed, json.loads otherwise
+        :param hooks: callables receiving a RequestEvent after every call, see add_hook
+        :param base_url: root of the API, e.g. to point the client to a local stand-in server
+        :param search_cache: optional SearchCache serving repeated searches, and with prefix
+                             reuse, narrowing cached results for type-ahead searches
+        """
+        self.base_url = base_url
+        self.search_cache = search_cache
+        self.resolver = IdResolver()
         self._auth = auth
         self.credentials_manager = credentials_manager
+        self.cache = cache
+        self.rate_limiter = RateLimiter() if rate_limiter is None else rate_limiter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._flight = self._build_flight() if coalesce else None
+        self.models = models
+        self.json_decoder = json_decoder or default_decoder()
+        self.hooks = list(hooks or [])
+        self.pool_maxsize = pool_maxsize
+        self._owns_transport = transport is None
+        self.transport = transport or self._build_transport(pool_connections, pool_maxsize, session)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the pooled connections held by the client. The client can still be used
+        afterwards, a new pool is opened on the next call.
+        """
+        if self._owns_transport:
+            self.transport.close()
+
+    def add_hook(self, hook):
+        """
+        Register a callable receiving a RequestEvent after every call made by the client, e.g.
+        a MetricsAggregator. Hooks run in the calling thread and should return quickly.
+        :param hook: callable taking the event as its only argument
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """
+        Unregister a hook added with add_hook
+        """
+        self.hooks.remove(hook)
 
 # ------------------- GET Methods ------------------------------------
 
@@ -212,7 +301,8 @@ class Deezer:
         """
         Information related to the given keyword. Using a method helps to narrow down the search
         and, therefore obtain more accurate results.
-        :param keyword: keyword for searching related content. Spaces are allowed.
+        :param keyword: keyword for searching related content. Spaces are allowed. Case and
+                        whitespace are normalized, so equivalent keywords share cache entries
         :param method: Search methods accepted:
                         'album': Search albums
                         'artist': Search artists
@@ -224,19 +314,19 @@ class Deezer:
                         'user': Search users
         """
         if method == "":
-            results = self._get(f"search?q={keyword}")
+            results = self._search("search", canonical_query(keyword))
         else:
-            results = self._get(f"search/{method}?q={keyword}")
+            results = self._search(f"search/{method}", canonical_query(keyword))
         return results
 
     def advanced_search(self, params):
         """
         Advanced search to find artists, albums or tracks
-        :param params: Search parameters. Must be a dictionary
+        :param params: Search parameters. Must be a dictionary, e.g. {"artist": "aloe blacc",
+                       "dur_min": 180}. Keys are sorted and values normalized
         """
         if isinstance(params, dict):
-            query = " ".join(f"{key}:'{value}'" for key, value in params.items())
-            result = self._get(f"search?q={query}")
+            result = self._search("search", advanced_query(params))
             return result
         else:
             self._warn_message("Please revise your search parameters. A dictionary must be used.")
@@ -251,6 +341,133 @@ class Deezer:
         else:
             return None
 
+# -------------- Pagination ---------------------------------------------------
+
+    def paginate(self, response, max_items=None, prefetch=True, parallel=False, max_workers=8):
+        """
+        Iterate over the items of a paged response, following its 'next' links. The next page
+        is fetched in the background while the items of the current one are being consumed.
+        A page that cannot be retrieved raises its DeezerException.
+        :param response: first page, as returned by any of the methods of the client
+        :param max_items: stop after yielding this many items
+        :param prefetch: fetch the next page in the background. If False, pages are fetched
+                         when the previous one has been consumed
+        :param parallel: use the 'total' of the first page to request all the remaining pages
+                         concurrently by offset. Items are still yielded in order, and items
+                         repeated because the collection changed in the meantime are skipped
+        :param max_workers: maximum number of pages in flight when parallel is set
+        """
+        if parallel:
+            yield from self._fan_out(response, max_items, max_workers)
+            return
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        following = None
+        count = 0
+        try:
+            while response is not None:
+                if isinstance(response, DeezerException):
+                    raise response
+                data = response.get("data", [])
+                last_page = max_items is not None and count + len(data) >= max_items
+                if executor and not last_page and response.get("next"):
+                    following = executor.submit(self.next, response)
+                for item in data:
+                    if max_items is not None and count >= max_items:
+                        return
+                    yield item
+                    count += 1
+                if last_page:
+                    return
+                if following is not None:
+                    response, following = following.result(), None
+                else:
+                    response = self.next(response)
+        finally:
+            if following is not None:
+                following.cancel()
+            if executor:
+                executor.shutdown(wait=False)
+
+    def iter_album_tracks(self, album_id, max_items=None, parallel=False):
+        """
+        Iterate over all the tracks of an album
+        :param album_id: ID or URL of the album
+        :param max_items: maximum number of tracks to yield
+        :param parallel: fetch the remaining pages concurrently, see paginate
+        """
+        return self.paginate(self.get_album(album_id, "tracks"), max_items, parallel=parallel)
+
+    def iter_artist_albums(self, artist_id, max_items=None, parallel=False):
+        """
+        Iterate over all the albums of an artist
+        :param artist_id: ID or URL of the artist
+        :param max_items: maximum number of albums to yield
+        :param parallel: fetch the remaining pages concurrently, see paginate
+        """
+        return self.paginate(self.get_artist(artist_id, "albums"), max_items, parallel=parallel)
+
+    def iter_playlist_tracks(self, playlist_id, max_items=None, parallel=False):
+        """
+        Iterate over all the tracks of a playlist
+        :param playlist_id: ID or URL of the playlist
+        :param max_items: maximum number of tracks to yield
+        :param parallel: fetch the remaining pages concurrently, see paginate
+        """
+        return self.paginate(self.get_playlist(playlist_id, "tracks"), max_items, parallel=parallel)
+
+    def iter_me(self, method, max_items=None, parallel=False):
+        """
+        Iterate over one of the current user's collections
+        :param method: any of the collections accepted by get_me, e.g. 'tracks' or 'playlists'
+        :param max_items: maximum number of items to yield
+        :param parallel: fetch the remaining pages concurrently, see paginate
+        """
+        return self.paginate(self.get_me(method), max_items, parallel=parallel)
+
+    def iter_search(self, keyword, method="", max_items=None, parallel=False):
+        """
+        Iterate over all the results of a search
+        :param keyword: keyword for searching related content
+        :param method: any of the search methods accepted by search
+        :param max_items: maximum number of results to yield
+        :param parallel: fetch the remaining pages concurrently, see paginate
+        """
+        return self.paginate(self.search(keyword, method), max_items, parallel=parallel)
+
+    def stream(self, url, max_items=None, limit=None):
+        """
+        Iterate over the items of a collection, decoding each page while it is downloaded
+        instead of loading it whole. Use it for very large pages of tracks, fans or search
+        results. Responses are not cached. A page that cannot be retrieved raises its
+        DeezerException.
+        :param url: path of the collection, e.g. 'playlist/908622995/tracks', or the 'next'
+                    link of a previous page
+        :param max_items: stop after yielding this many items
+        :param limit: number of items requested per page
+        """
+        count = 0
+        while url:
+            decoder = StreamingDecoder(decoder=self.json_decoder)
+            for item in self._stream_page(url, limit, decoder):
+                if max_items is not None and count >= max_items:
+                    return
+                yield parse(item, self) if self.models else item
+                count += 1
+            error = self._parse_result(decoder.meta) if "error" in decoder.meta else None
+            if isinstance(error, DeezerException):
+                raise error
+            if max_items is not None and count >= max_items:
+                return
+            url = decoder.meta.get("next")
+
+    def as_model(self, response):
+        """
+        Convert a response to typed entities. Pages of a collection become a Page whose data
+        holds the entities. Nested entities are fetched through the client when needed.
+        :param response: response returned by any of the methods of the client
+        """
+        return parse(response, self, complete=True)
+
 # -------------- Create/Edit Methods (POST) -----------------------------------
 
     def follow_playlist(self, user_id, playlist_id):
@@ -271,7 +488,7 @@ class Deezer:
         :param podcast_id:  ID or URL
         """
         userid = self._get_id("user", user_id)
-        pdcastid = self._get_id("show", podcast_id)
+        pdcastid = self._get_id("podcast", podcast_id)
         operation = self._post(f"user/{userid}/podcasts", "podcast_id", pdcastid)
         return operation
 
@@ -352,6 +569,50 @@ class Deezer:
         trackid = self._get_id("track", track_id)
         return self._post(f"playlist/{playlistid}/tracks", "songs", trackid)
 
+    def add_tracks_playlist(self, playlist_id, tracks_ids, chunk_size=500, max_workers=1):
+        """
+        Add many tracks to a playlist, sending them in as few requests as possible
+        :param playlist_id: ID or URL
+        :param tracks_ids: iterable of track IDs or URLs
+        :param chunk_size: maximum number of tracks sent per request. Requests are also kept
+                           short enough to fit in a URL
+        :param max_workers: number of requests sent concurrently. With more than one, the
+                            tracks of different chunks may not end up in the given order
+        :return: list of ChunkResult, one per request
+        """
+        return self._batch_songs("POST", playlist_id, tracks_ids, chunk_size, max_workers)
+
+    def sync_playlist(self, playlist_id, tracks_ids, max_workers=1, dry_run=False):
+        """
+        Make a playlist hold exactly the given tracks, in the given order, by sending only the
+        changes: removals and additions in batches, then one reorder request if needed. Long
+        playlists, whose order does not fit in a request, are put in order by removing and
+        appending again the tracks out of place. Stops at the first failed request: syncing
+        again carries on from the state left.
+        :param playlist_id: ID or URL
+        :param tracks_ids: iterable of track IDs or URLs wanted in the playlist, in order
+        :param max_workers: number of write requests sent concurrently
+        :param dry_run: only compute the changes, without sending them
+        :return: PlaylistSync describing the changes and the results of the requests
+        """
+        plistid = self._get_id("playlist", playlist_id)
+        current = [track["id"] for track in self.iter_playlist_tracks(plistid, parallel=True)]
+        plan = plan_playlist_sync(current, (self._get_id("track", str(track)) for track in tracks_ids),
+                                  MAX_SONGS_LENGTH)
+        if dry_run or not plan.changed:
+            return plan
+        if plan.remove:
+            plan.results += self.remove_tracks_playlist(plistid, plan.remove, max_workers=max_workers)
+            # Appending moved tracks that are still in place would scramble the order
+            if not plan.ok:
+                return plan
+        if plan.add:
+            plan.results += self.add_tracks_playlist(plistid, plan.add)
+        if plan.order and plan.ok:
+            result = self._post(f"playlist/{plistid}/tracks", "order", ",".join(plan.order))
+            plan.results.append(ChunkResult(plan.order, result))
+        return plan
+
 # <-------------------------- Delete Methods ----------------------------->
 
     def delete_playlist(self, playlist_id):
@@ -374,6 +635,18 @@ class Deezer:
             ids.append(self._get_id("track", track))
         return self._delete(f"playlist/{plistid}/tracks", "songs", ids)
 
+    def remove_tracks_playlist(self, playlist_id, tracks_ids, chunk_size=500, max_workers=1):
+        """
+        Remove many tracks from a playlist, sending them in as few requests as possible
+        :param playlist_id: ID or URL
+        :param tracks_ids: iterable of track IDs or URLs
+        :param chunk_size: maximum number of tracks sent per request. Requests are also kept
+                           short enough to fit in a URL
+        :param max_workers: number of requests sent concurrently
+        :return: list of ChunkResult, one per request
+        """
+        return self._batch_songs("DELETE", playlist_id, tracks_ids, chunk_size, max_workers)
+
     def delete_comment(self, comment_id):
         """
         Remove a comment
@@ -403,7 +676,7 @@ class Deezer:
         Unfollow an user
         :param user_id: ID or URL
         """
-        userid = self._get_id("profile", user_id)
+        userid = self._get_id("user", user_id)
         return self._delete(f"user/me/followings", "user_id", userid)
 
     def delete_podcast(self, podcast_id):
@@ -411,7 +684,7 @@ class Deezer:
         Remove a podcast from the user's favorite
         :param podcast_id: ID or URL
         """
-        podid = self._get_id("show", podcast_id)
+        podid = self._get_id("podcast", podcast_id)
         return self._delete(f"user/me/podcasts", "podcast_id", podid)
 
     def delete_favorite_track(self, track_id):
@@ -449,27 +722,257 @@ class Deezer:
         albid = self._get_id("album", album_id)
         return self._delete(f"folder/{fldid}/items", "album_id", albid)
 
+# -------------- Bulk Methods -------------------------------------------------
+
+    def get_tracks(self, track_ids, max_workers=8):
+        """
+        Information related to several tracks, fetched concurrently
+        :param track_ids: iterable of IDs or URLs
+        :param max_workers: maximum number of requests in flight
+        :return: list of tracks in the same order as track_ids. Lookups that failed are
+                 returned as DeezerException objects
+        """
+        return self._bulk("track", track_ids, max_workers)
+
+    def get_albums(self, album_ids, max_workers=8):
+        """
+        Information related to several albums, fetched concurrently
+        :param album_ids: iterable of IDs or URLs
+        :param max_workers: maximum number of requests in flight
+        :return: list of albums in the same order as album_ids. Lookups that failed are
+                 returned as DeezerException objects
+        """
+        return self._bulk("album", album_ids, max_workers)
+
+    def get_artists(self, artist_ids, max_workers=8):
+        """
+        Information related to several artists, fetched concurrently
+        :param artist_ids: iterable of IDs or URLs
+        :param max_workers: maximum number of requests in flight
+        :return: list of artists in the same order as artist_ids. Lookups that failed are
+                 returned as DeezerException objects
+        """
+        return self._bulk("artist", artist_ids, max_workers)
+
+    def iter_tracks(self, track_ids, max_workers=8):
+        """
+        Same as get_tracks, but yields (position, track) pairs as soon as each lookup completes
+        :param track_ids: iterable of IDs or URLs. It is consumed lazily
+        :param max_workers: maximum number of requests in flight
+        """
+        return self._iter_bulk("track", track_ids, max_workers)
+
+    def iter_albums(self, album_ids, max_workers=8):
+        """
+        Same as get_albums, but yields (position, album) pairs as soon as each lookup completes
+        :param album_ids: iterable of IDs or URLs. It is consumed lazily
+        :param max_workers: maximum number of requests in flight
+        """
+        return self._iter_bulk("album", album_ids, max_workers)
+
+    def iter_artists(self, artist_ids, max_workers=8):
+        """
+        Same as get_artists, but yields (position, artist) pairs as soon as each lookup completes
+        :param artist_ids: iterable of IDs or URLs. It is consumed lazily
+        :param max_workers: maximum number of requests in flight
+        """
+        return self._iter_bulk("artist", artist_ids, max_workers)
+
 # --------------------- Private Methods -------------------------------
 
     def _auth_headers(self):
         if self._auth:
             return {"access_token": self._auth}
-        elif self.credentials_manager:
-            return {"access_token": self.credentials_manager.token}
         else:
             token = self.credentials_manager.get_access_token()
             return {"access_token": token}
 
+    def _access_token(self):
+        if self._auth or self.credentials_manager:
+            return self._auth_headers()["access_token"]
+        return None
+
     def _get_id(self, type, id):
-        fields = id.split("/")
-        if len(fields) >= 3:
-            if type != fields[-2]:
-                self._warn_message(f"Expecting '{type}', found '{fields[-2]}' instead. ")
-            return fields[-1]
-        return id
+        # Parsing only: expanding short links blocks on the network, see resolver.resolve
+        result = self.resolver.parse(id)
+        if isinstance(result, Exception):
+            if SHORT_LINK.match(str(id).strip()):
+                self._warn_message(f"Short links are not expanded, resolve '{id}' with resolver.resolve first. ")
+                return str(id)
+            # Not a Deezer URL: keep the last segment of paths, and values like 'me' as they are
+            fields = str(id).split("/")
+            if len(fields) >= 3:
+                result = (fields[-2], fields[-1])
+            else:
+                return str(id)
+        kind, value = result
+        # The website names podcasts 'show' and users 'profile'
+        kind = ALIASES.get(kind, kind)
+        type = ALIASES.get(type, type)
+        if kind is not None and kind != type:
+            self._warn_message(f"Expecting '{type}', found '{kind}' instead. ")
+        return value
+
+    def _bulk(self, type, ids, max_workers):
+        results = {}
+        for position, result in self._iter_bulk(type, ids, max_workers):
+            results[position] = result
+        return [results[position] for position in range(len(results))]
+
+    def _iter_bulk(self, type, ids, max_workers):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            try:
+                for position, item in enumerate(ids):
+                    if len(pending) >= max_workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                    pending.add(executor.submit(self._bulk_lookup, type, position, item))
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _bulk_lookup(self, type, position, item):
+        try:
+            return position, getattr(self, f"get_{type}")(str(item))
+        except Exception as error:
+            return position, self._exception_result(error)
+
+    def _exception_result(self, error):
+        return DeezerException(type(error).__name__, str(error), None)
+
+    def _fan_out(self, response, max_items, max_workers):
+        seen = set()
+        count = 0
+        for page in self._fan_out_pages(response, max_items, max_workers):
+            for item in page.get("data", []):
+                key = self._item_key(item)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                if max_items is not None and count >= max_items:
+                    return
+                yield item
+                count += 1
+            if max_items is not None and count >= max_items:
+                return
+
+    def _fan_out_pages(self, response, max_items, max_workers):
+        if isinstance(response, DeezerException):
+            raise response
+        yield response
+        last = response
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            window = deque()
+            try:
+                for url in self._page_urls(response, max_items):
+                    if len(window) >= max_workers:
+                        last = self._checked_page(window.popleft().result())
+                        yield last
+                    window.append(executor.submit(self._get, url))
+                while window:
+                    last = self._checked_page(window.popleft().result())
+                    yield last
+            finally:
+                for future in window:
+                    future.cancel()
+        # Either there was no 'total' to plan with, or the collection grew in the meantime
+        while last.get("next"):
+            last = self._checked_page(self.next(last))
+            yield last
+
+    def _checked_page(self, page):
+        if isinstance(page, DeezerException):
+            raise page
+        return page
+
+    def _page_urls(self, response, max_items=None):
+        data = response.get("data", [])
+        if not response.get("next") or not data:
+            return []
+        parts = urlsplit(response["next"])
+        query = dict(parse_qsl(parts.query))
+        start = int(query.get("index", len(data)))
+        limit = int(query.get("limit", 0)) or len(data)
+        stop = response.get("total", 0)
+        if max_items is not None:
+            stop = min(stop, max_items)
+        urls = []
+        for index in range(start, stop, limit):
+            query.update(index=index, limit=limit)
+            urls.append(urlunsplit(parts._replace(query=urlencode(query))))
+        return urls
+
+    def _item_key(self, item):
+        if isinstance(item, Model):
+            return item.kind, item.id
+        if isinstance(item, dict) and "id" in item:
+            return item.get("type"), item["id"]
+        return None
+
+    def _build_flight(self):
+        return SingleFlight()
+
+    def _flight_key(self, url):
+        if not url.startswith("http"):
+            url = self.base_url + url
+        parts = urlsplit(url)
+        return parts.path.rstrip("/"), tuple(sorted(parse_qsl(parts.query)))
+
+    def _batch_songs(self, call_method, playlist_id, tracks_ids, chunk_size, max_workers):
+        plistid = self._get_id("playlist", playlist_id)
+        chunks = self._songs_chunks(tracks_ids, chunk_size)
+        if max_workers <= 1:
+            return [self._send_songs(call_method, plistid, chunk) for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda chunk: self._send_songs(call_method, plistid, chunk), chunks))
+
+    def _send_songs(self, call_method, plistid, chunk):
+        try:
+            result = self._call(call_method, f"playlist/{plistid}/tracks", "songs", ",".join(chunk))
+        except Exception as error:
+            result = self._exception_result(error)
+        return ChunkResult(chunk, result)
+
+    def _songs_chunks(self, tracks_ids, chunk_size):
+        chunks = []
+        chunk = []
+        length = 0
+        for track in tracks_ids:
+            trackid = self._get_id("track", str(track))
+            # Commas are sent URL-encoded, as '%2C'
+            size = len(trackid) + 3
+            if chunk and (len(chunk) >= chunk_size or length + size > MAX_SONGS_LENGTH):
+                chunks.append(chunk)
+                chunk = []
+                length = 0
+            chunk.append(trackid)
+            length += size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
 
     def _get(self, url):
-        result = self._call("GET", url)
+        if self._flight is None:
+            return self._call("GET", url)
+        return self._flight.do(self._flight_key(url), lambda: self._call("GET", url))
+
+    def _search(self, path, query):
+        url = search_url(path, query)
+        if self.search_cache is None:
+            return self._get(url)
+        token = self._access_token()
+        result = self.search_cache.get(path, query, token)
+        if result is None:
+            result = self._get(url)
+            if not isinstance(result, DeezerException):
+                self.search_cache.set(path, query, result, token)
         return result
 
     def _post(self, url, param, id):
@@ -480,22 +983,140 @@ class Deezer:
         result = self._call("DELETE", url, param, id)
         return result
 
+    def _build_transport(self, pool_connections, pool_maxsize, session):
+        return HTTPTransport(pool_connections, pool_maxsize, session)
+
     def _call(self, call_method, url, param=None, id=None):
+        start = time.perf_counter()
+        url, params = self._prepare_request(url, param, id)
+        lookup = self._cache_lookup(call_method, url, params)
+        if lookup.result is not None:
+            if self.hooks:
+                self._emit(RequestEvent(endpoint_template(url), call_method, url, cache="hit",
+                                        total=time.perf_counter() - start))
+            return lookup.result
+        attempt = 0
+        throttle = 0.0
+        while True:
+            if self.rate_limiter:
+                throttle += self.rate_limiter.acquire()
+            sent = time.perf_counter()
+            try:
+                response = self.transport.request(call_method, url, params=params, headers=lookup.headers)
+            except Exception as error:
+                if self.hooks:
+                    self._emit(self._failure_event(call_method, url, lookup, error, start, throttle, attempt))
+                raise
+            received = time.perf_counter()
+            result = self._handle_content(call_method, url, params, lookup, response.status_code, response.headers,
+                                          response.content)
+            delay = self._retry_delay(result, attempt)
+            if delay is None:
+                if self.hooks:
+                    self._emit(self._request_event(call_method, url, lookup, result, response, start, sent, received,
+                                                   throttle, attempt))
+                return result
+            time.sleep(delay)
+            attempt += 1
+
+    def _request_event(self, call_method, url, lookup, result, response, start, sent, received, throttle, attempt):
+        now = time.perf_counter()
+        if lookup.key is None:
+            cache = None
+        elif response.status_code == 304 and lookup.stale is not None:
+            cache = "revalidated"
+        else:
+            cache = "miss"
+        transfer = None
+        if response.wait is not None:
+            transfer = max(0.0, received - sent - response.wait - (response.connect or 0.0))
+        return RequestEvent(endpoint_template(url), call_method, url, status=response.status_code,
+                            error_code=result.code if isinstance(result, DeezerException) else None,
+                            throttle=throttle, connect=response.connect, wait=response.wait, transfer=transfer,
+                            decode=now - received,
+                            total=now - start, bytes=len(response.content), cache=cache, retries=attempt)
+
+    def _failure_event(self, call_method, url, lookup, error, start, throttle, attempt):
+        return RequestEvent(endpoint_template(url), call_method, url, throttle=throttle,
+                            total=time.perf_counter() - start, cache=None if lookup.key is None else "miss",
+                            retries=attempt, exception=type(error).__name__)
+
+    def _emit(self, event):
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as error:
+                self._warn_message(f"hook {hook!r} failed: {error!r}")
+
+    def _retry_delay(self, result, attempt):
+        if attempt >= self.max_retries or not isinstance(result, DeezerException) or result.code != QUOTA_ERROR_CODE:
+            return None
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if self.rate_limiter:
+            self.rate_limiter.penalize(delay)
+        return delay
+
+    def _stream_page(self, url, limit, decoder):
+        url, params = self._prepare_request(url)
+        if limit:
+            params = dict(params or {}, limit=limit)
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        for chunk in self.transport.stream("GET", url, params=params):
+            yield from decoder.feed(chunk)
+        decoder.close()
+
+    def _cache_lookup(self, call_method, url, params):
+        if self.cache is None or call_method != "GET":
+            return CacheLookup()
+        cache_key = self.cache.key(url, params)
+        content = self.cache.get(cache_key)
+        if content is not None:
+            return CacheLookup(cache_key, result=self._parse_result(self.json_decoder(content)))
+        stale = self.cache.get_stale(cache_key)
+        if stale is None:
+            return CacheLookup(cache_key)
+        content, validators = stale
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return CacheLookup(cache_key, stale=content, headers=headers)
+
+    def _handle_content(self, call_method, url, params, lookup, status, headers, content):
+        if status == 304 and lookup.stale is not None:
+            self.cache.refresh(lookup.key)
+            return self._parse_result(self.json_decoder(lookup.stale))
+        result = self._parse_result(self.json_decoder(content))
+        if self.cache is not None:
+            if lookup.key is not None:
+                if not isinstance(result, DeezerException):
+                    validators = {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}
+                    self.cache.set(lookup.key, content, {name: value for name, value in validators.items() if value})
+            else:
+                self._invalidate_cache(url, params)
+        return result
+
+    def _invalidate_cache(self, url, params):
+        token = {"access_token": params["access_token"]} if params and "access_token" in params else None
+        path = urlsplit(url).path.strip("/")
+        for target in {"/".join(path.split("/")[:2]), "user/me"}:
+            self.cache.invalidate(self.cache.key(target, token))
+
+    def _prepare_request(self, url, param=None, id=None):
         if not url.startswith("http"):
             url = self.base_url + url
 
         if self._auth or self.credentials_manager:
-            headers = self._auth_headers()
+            params = self._auth_headers()
             if param and id:
-                headers[f"{param}"] = id
-                result = requests.request(call_method, url, params=headers)
-            else:
-                result = requests.request(call_method, url, params=headers)
-        else:
-            result = requests.request(call_method, url)
-
-        result = result.json()
+                params[f"{param}"] = id
+            return url, params
+        return url, None
 
+    def _parse_result(self, result):
         try:
             if "error" in result:
                 ty = result["error"]["type"]
@@ -504,12 +1125,39 @@ class Deezer:
                 return DeezerException(ty, message, code)
         except:
             pass
+        if self.models:
+            return parse(result, self, complete=True)
         return result
 
+    def _resolve_model(self, model):
+        result = self._get(f"{model.kind}/{model.id}")
+        if isinstance(result, DeezerException):
+            raise result
+        model._fill(result.to_dict() if isinstance(result, Model) else result)
+
     def _warn_message(self, message):
         print(f"warning: {message}", file=sys.stderr)
 
 
+class ChunkResult:
+    """
+    Outcome of one of the requests sent by a batch write
+    """
+
+    __slots__ = ("tracks", "result")
+
+    def __init__(self, tracks, result):
+        self.tracks = tracks
+        self.result = result
+
+    @property
+    def ok(self):
+        return self.result is not False and not isinstance(self.result, DeezerException)
+
+    def __repr__(self):
+        return f"<ChunkResult {len(self.tracks)} tracks ok={self.ok}>"
+
+
 class DeezerException(Exception):
 
     def __init__(self, ty, message, code):
@@ -517,6 +1165,9 @@ class DeezerException(Exception):
         self.msg = message
         self.code = code
 
+    def __reduce__(self):
+        return type(self), (self.type, self.msg, self.code)
+
     def __str__(self):
         return f"An error has occurred:\n{self.type}\n{self.msg}\nCode: {self.code}"
 
@@ -0,0 +1,189 @@
+import csv
+import gzip
+import io
+import json
+import os
+
+from .models import Model
+
+COLLECTIONS = ("tracks", "albums", "artists", "playlists")
+PLAYLIST_TRACKS = "playlist_tracks"
+CHECKPOINT_NAME = "checkpoint.json"
+
+
+class LibraryExport:
+    """
+    Back up the library of the current user, one file per collection, in NDJSON or CSV.
+    Items are written while the pages are read, so memory stays flat whatever the size of
+    the library, and the export can be resumed after an interruption:
+
+        export = LibraryExport(dz, "backup", format="csv", compress=True)
+        export.run()
+
+    The progress of every collection is kept in a checkpoint file in the same directory.
+    Running the export again continues from the last checkpoint; delete the directory to
+    start over. Resuming relies on offsets, so items added to a collection in between may be
+    missed or repeated.
+    """
+
+    def __init__(self, client, directory, format="ndjson", compress=False, collections=COLLECTIONS,
+                 playlist_tracks=True, checkpoint_every=1000):
+        """
+        :param client: authenticated Deezer client
+        :param directory: directory receiving the files and the checkpoint
+        :param format: 'ndjson' or 'csv'. CSV files flatten nested objects into dotted
+                       columns ('artist.name'), taken from the first item of each collection
+        :param compress: gzip the files
+        :param collections: collections of get_me to export
+        :param playlist_tracks: also export the tracks of every playlist, to a single file
+                                with a 'playlist_id' column. Requires 'playlists' in collections
+        :param checkpoint_every: number of items written between two checkpoints
+        """
+        if format not in ("ndjson", "csv"):
+            raise ValueError(f"Unknown export format '{format}', expecting 'ndjson' or 'csv'")
+        self.client = client
+        self.directory = directory
+        self.format = format
+        self.compress = compress
+        self.collections = tuple(collections)
+        self.playlist_tracks = playlist_tracks and "playlists" in self.collections
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_path = os.path.join(directory, CHECKPOINT_NAME)
+        self.state = self._load_state()
+
+    def run(self):
+        """
+        Export every collection not done yet
+        :return: dictionary of collection -> number of items written
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        for name in self.collections:
+            self._export(name, [(f"user/me/{name}", None)])
+        if self.playlist_tracks:
+            playlists = self.state["playlists"].get("playlist_ids", [])
+            self._export(PLAYLIST_TRACKS, [(f"playlist/{plistid}/tracks", {"playlist_id": plistid})
+                                          for plistid in playlists])
+        return {name: state["count"] for name, state in self.state.items()}
+
+    def path(self, name):
+        """
+        Path of the file a collection is exported to
+        :param name: collection, or 'playlist_tracks'
+        """
+        extension = ".gz" if self.compress else ""
+        return os.path.join(self.directory, f"{name}.{self.format}{extension}")
+
+    def _export(self, name, sources):
+        state = self.state.setdefault(name, {"count": 0, "offset": 0, "source": 0, "index": 0,
+                                             "fields": None, "done": False})
+        if state["done"]:
+            return
+        writer = _Writer(self.path(name), self.format, self.compress, state["offset"], state["fields"])
+        try:
+            for source in range(state["source"], len(sources)):
+                if source != state["source"]:
+                    state.update(source=source, index=0)
+                url, extra = sources[source]
+                for item in self._items(url, state["index"]):
+                    item = item.to_dict() if isinstance(item, Model) else item
+                    if extra:
+                        item = dict(item, **extra)
+                    if name == "playlists":
+                        state.setdefault("playlist_ids", []).append(item["id"])
+                    writer.write(item)
+                    state["index"] += 1
+                    state["count"] += 1
+                    if state["count"] % self.checkpoint_every == 0:
+                        self._checkpoint(state, writer)
+            state["done"] = True
+        finally:
+            self._checkpoint(state, writer)
+            writer.close()
+
+    def _items(self, url, index):
+        if index:
+            url = f"{url}?index={index}"
+        return self.client.paginate(self.client._get(url))
+
+    def _checkpoint(self, state, writer):
+        state.update(offset=writer.sync(), fields=writer.fields)
+        temporary = self.checkpoint_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as checkpoint:
+            json.dump(self.state, checkpoint)
+        os.replace(temporary, self.checkpoint_path)
+
+    def _load_state(self):
+        if not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path, encoding="utf-8") as checkpoint:
+            return json.load(checkpoint)
+
+
+class _Writer:
+    """
+    Append-only file of rows. sync() returns an offset up to which the file is complete: on
+    resume, anything written after it is truncated. Compressed files are a series of gzip
+    members, one per checkpoint, which gzip readers concatenate.
+    """
+
+    def __init__(self, path, format, compress, offset=0, fields=None):
+        self.format = format
+        self.compress = compress
+        self.fields = fields
+        self._raw = open(path, "r+b" if offset else "wb")
+        self._raw.truncate(offset)
+        self._raw.seek(offset)
+        self._member = None
+        self._buffer = io.StringIO()
+        self._csv = None
+
+    def write(self, item):
+        if self.format == "ndjson":
+            line = json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n"
+        else:
+            line = self._csv_line(_flatten(item))
+        self._output().write(line.encode("utf-8"))
+
+    def sync(self):
+        if self._member is not None:
+            self._member.close()
+            self._member = None
+        self._raw.flush()
+        return self._raw.tell()
+
+    def close(self):
+        self.sync()
+        self._raw.close()
+
+    def _output(self):
+        if not self.compress:
+            return self._raw
+        if self._member is None:
+            self._member = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        return self._member
+
+    def _csv_line(self, row):
+        if self._csv is None:
+            header = self.fields is None
+            if header:
+                self.fields = list(row)
+            self._csv = csv.DictWriter(self._buffer, self.fields, extrasaction="ignore")
+            if header:
+                self._csv.writeheader()
+        self._csv.writerow(row)
+        line = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return line
+
+
+def _flatten(item, prefix=""):
+    row = {}
+    for key, value in item.items():
+        if isinstance(value, dict):
+            row.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, list):
+            row[prefix + key] = json.dumps(value, ensure_ascii=False)
+        else:
+            row[prefix + key] = value
+    return row
@@ -0,0 +1,88 @@
+import threading
+
+
+class _Call:
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Deduplicates identical calls running at the same time: while a call for a key is in
+    flight, other callers asking for the same key wait for it and share its result or error
+    instead of running it again. The result is not copied: every caller receives the same
+    object.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        """
+        Run function, unless a call for the same key is already running
+        :param key: hashable identifying the call
+        :param function: callable without arguments
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    """
+    asyncio version of SingleFlight. Callers share the task of the first caller; cancelling
+    one of the callers does not cancel the call for the others.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+
+    async def do(self, key, function):
+        """
+        Await function(), unless a call for the same key is already running
+        :param key: hashable identifying the call
+        :param function: callable without arguments returning an awaitable
+        """
+        # Imported here, the synchronous client not needing asyncio
+        import asyncio
+
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(function())
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
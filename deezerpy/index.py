@@ -0,0 +1,232 @@
+import gzip
+import json
+import re
+import unicodedata
+from bisect import bisect_left
+
+from .models import Model
+
+TOKEN = re.compile(r"\w+")
+
+# Fields of the advanced search, and where to find them in each kind of entity
+FIELDS = {
+    "track": {"track": ("title",), "artist": ("artist", "name"), "album": ("album", "title")},
+    "album": {"album": ("title",), "artist": ("artist", "name"), "label": ("label",)},
+    "artist": {"artist": ("name",)},
+}
+NUMBERS = {"bpm": ("bpm",), "dur": ("duration",)}
+
+# Score of a query token matching a token of an entity exactly, as a prefix, or with a typo
+EXACT, PREFIX, FUZZY = 3, 2, 1
+
+
+def normalize(text):
+    """
+    Lower-case text and strip its accents, so that 'Beyoncé' and 'BEYONCE' are the same
+    """
+    text = unicodedata.normalize("NFKD", str(text))
+    return "".join(char for char in text if not unicodedata.combining(char)).casefold()
+
+
+def tokenize(text):
+    return TOKEN.findall(normalize(text))
+
+
+class SearchIndex:
+    """
+    In-memory inverted index of tracks, albums and artists, to search the entities already
+    fetched without sending requests:
+
+        index = SearchIndex()
+        index.update(dz.iter_album_tracks("302127"))
+        index.search("harder better", artist="daft punk", dur_max=240)
+
+    Titles and names are split in words, lower-cased and stripped of their accents. Each word
+    of the query must match a word of the entity, exactly, as a prefix, or with one typo when
+    fuzzy is set.
+    """
+
+    def __init__(self):
+        self._items = []
+        self._numbers = []
+        self._positions = {}
+        self._postings = {field: {} for field in ("track", "album", "artist", "label")}
+        self._vocabulary = {}
+        self._deletions = {}
+
+    def __len__(self):
+        return len(self._positions)
+
+    def add(self, item, kind=None):
+        """
+        Add an entity to the index, replacing the one with the same kind and ID
+        :param item: track, album or artist, as a dictionary or a model
+        :param kind: 'track', 'album' or 'artist', for items without a 'type'
+        """
+        if isinstance(item, Model):
+            item = item.to_dict()
+        kind = item.get("type", kind)
+        if kind not in FIELDS:
+            raise ValueError(f"Cannot index '{kind}' entities, expecting a track, an album or an artist")
+        if "type" not in item:
+            item = dict(item, type=kind)
+        key = (kind, item["id"])
+        numbers = (kind, item.get("rank") or 0, {name: _lookup(item, path) for name, path in NUMBERS.items()})
+        position = self._positions.get(key)
+        if position is None:
+            position = self._positions[key] = len(self._items)
+            self._items.append(item)
+            self._numbers.append(numbers)
+        else:
+            self._remove(position)
+            self._items[position] = item
+            self._numbers[position] = numbers
+        for field, path in FIELDS[kind].items():
+            for token in tokenize(_lookup(item, path) or ""):
+                postings = self._postings[field].setdefault(token, set())
+                if not postings:
+                    self._vocabulary.pop(field, None)
+                    self._deletions.pop(field, None)
+                postings.add(position)
+
+    def update(self, items, kind=None):
+        """
+        Add many entities, e.g. a page or a paginate() iterator
+        :param items: iterable of entities, or a page with a 'data' list
+        :param kind: kind of the entities lacking a 'type'
+        """
+        if isinstance(items, dict):
+            items = items.get("data", [])
+        for item in items:
+            self.add(item, kind)
+
+    def search(self, query="", type=None, limit=25, prefix=True, fuzzy=False, **filters):
+        """
+        Search the index
+        :param query: words to look for in any field
+        :param type: only return entities of this kind: 'track', 'album' or 'artist'
+        :param limit: maximum number of entities returned
+        :param prefix: let the last word of the query and of each field filter match the
+                       beginning of words, for search-as-you-type
+        :param fuzzy: let words match with one typo
+        :param filters: keys of the advanced search: artist, album, track, label, bpm_min,
+                        bpm_max, dur_min and dur_max
+        :return: list of entities, best matches first
+        """
+        words = []
+        texts = [(None, query)] + [(field, filters.pop(field)) for field in list(filters) if field in self._postings]
+        for field, text in texts:
+            tokens = tokenize(text)
+            for position, token in enumerate(tokens):
+                groups = self._match(field, token, prefix and position == len(tokens) - 1, fuzzy)
+                if not groups:
+                    return []
+                words.append(groups)
+        bounds = self._bounds(filters)
+        if words:
+            # Intersect the documents matching each word, smallest first, before scoring them
+            matching = sorted((groups[0][1] if len(groups) == 1 else set().union(*(docs for _, docs in groups))
+                               for groups in words), key=len)
+            candidates = set(matching[0])
+            for docs in matching[1:]:
+                candidates &= docs
+        else:
+            candidates = self._positions.values()
+        results = []
+        for doc in candidates:
+            score = sum(max(score for score, docs in groups if doc in docs) for groups in words)
+            kind, rank, numbers = self._numbers[doc]
+            if type is not None and kind != type:
+                continue
+            if any(numbers[name] is None or not low <= numbers[name] <= high for name, (low, high) in bounds.items()):
+                continue
+            results.append((-score, -rank, doc))
+        results.sort()
+        return [self._items[doc] for _, _, doc in results[:limit]]
+
+    def save(self, path):
+        """
+        Write the indexed entities to a gzip-compressed JSON lines file
+        """
+        with gzip.open(path, "wt", encoding="utf-8") as saved:
+            for position in sorted(self._positions.values()):
+                saved.write(json.dumps(self._items[position], separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, path):
+        """
+        Rebuild an index from a file written by save()
+        """
+        index = cls()
+        with gzip.open(path, "rt", encoding="utf-8") as saved:
+            for line in saved:
+                index.add(json.loads(line))
+        return index
+
+    def _match(self, field, token, prefix, fuzzy):
+        groups = []
+        for name in (field,) if field else self._postings:
+            postings = self._postings[name]
+            found = {token: EXACT} if token in postings else {}
+            if prefix:
+                vocabulary = self._sorted(name)
+                start = bisect_left(vocabulary, token)
+                while start < len(vocabulary) and vocabulary[start].startswith(token):
+                    found.setdefault(vocabulary[start], PREFIX)
+                    start += 1
+            if fuzzy:
+                for word in self._similar(name, token):
+                    found.setdefault(word, FUZZY)
+            groups.extend((score, postings[word]) for word, score in found.items() if postings.get(word))
+        return groups
+
+    def _sorted(self, field):
+        if field not in self._vocabulary:
+            self._vocabulary[field] = sorted(token for token, docs in self._postings[field].items() if docs)
+        return self._vocabulary[field]
+
+    def _similar(self, field, token):
+        # Words at one edit from the token share one of their single-character deletions
+        if field not in self._deletions:
+            deletions = {}
+            for word in self._sorted(field):
+                for variant in _deletions(word):
+                    deletions.setdefault(variant, []).append(word)
+            self._deletions[field] = deletions
+        similar = set()
+        for variant in _deletions(token):
+            similar.update(self._deletions[field].get(variant, ()))
+        return similar
+
+    def _bounds(self, filters):
+        bounds = {}
+        for key, value in filters.items():
+            name, _, side = key.rpartition("_")
+            if name not in NUMBERS or side not in ("min", "max"):
+                raise ValueError(f"Unknown search filter '{key}'")
+            low, high = bounds.get(name, (float("-inf"), float("inf")))
+            bounds[name] = (float(value), high) if side == "min" else (low, float(value))
+        return bounds
+
+    def _remove(self, position):
+        kind = self._numbers[position][0]
+        for field, path in FIELDS[kind].items():
+            for token in tokenize(_lookup(self._items[position], path) or ""):
+                postings = self._postings[field].get(token)
+                if postings:
+                    postings.discard(position)
+                    if not postings:
+                        self._vocabulary.pop(field, None)
+                        self._deletions.pop(field, None)
+
+
+def _lookup(item, path):
+    for key in path:
+        if not isinstance(item, dict):
+            return None
+        item = item.get(key)
+    return item
+
+
+def _deletions(word):
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
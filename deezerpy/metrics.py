@@ -0,0 +1,167 @@
+import bisect
+import re
+import threading
+from urllib.parse import urlsplit
+
+# Entities whose IDs are templated. Numbers after other segments, like the genre of
+# 'chart/0/tracks', select a variant of the endpoint and are kept
+ENTITY_KINDS = ("album", "artist", "comment", "episode", "genre", "playlist", "podcast", "radio", "track", "user")
+_ID_SEGMENT = re.compile(rf"(/(?:{'|'.join(ENTITY_KINDS)})/)-?\d+(?=/|$)")
+
+
+def endpoint_template(url):
+    """
+    Return the endpoint of a URL with its entity IDs replaced, e.g. 'album/{id}/tracks'
+    """
+    path = urlsplit(url).path.strip("/")
+    return _ID_SEGMENT.sub(r"\1{id}", f"/{path}")[1:]
+
+
+class RequestEvent:
+    """
+    Report of one call made by the client, passed to every hook. Durations are in seconds;
+    the ones the transport cannot measure are None.
+
+    - endpoint: endpoint template, e.g. 'album/{id}/tracks'
+    - method: HTTP method
+    - status: HTTP status of the response, None when served from the cache or when no
+      response was received
+    - error_code: Deezer error code, if the API returned an error
+    - throttle: time spent waiting for the rate limiter
+    - connect: time spent opening a new connection
+    - wait: time from sending the request to receiving the response headers
+    - transfer: time spent receiving the body
+    - decode: time spent decoding the body
+    - total: time spent in the call, including retries
+    - bytes: size of the body
+    - cache: 'hit', 'miss', 'revalidated', or None when the call is not cacheable
+    - retries: number of retries after quota errors
+    - exception: name of the exception raised by the transport, e.g. 'ConnectionError', when
+      the request failed without a response
+    """
+
+    __slots__ = ("endpoint", "method", "url", "status", "error_code", "throttle", "connect", "wait", "transfer",
+                 "decode", "total", "bytes", "cache", "retries", "exception")
+
+    def __init__(self, endpoint, method, url, status=None, error_code=None, throttle=0.0, connect=None, wait=None,
+                 transfer=None, decode=None, total=None, bytes=0, cache=None, retries=0, exception=None):
+        self.endpoint = endpoint
+        self.method = method
+        self.url = url
+        self.status = status
+        self.error_code = error_code
+        self.throttle = throttle
+        self.connect = connect
+        self.wait = wait
+        self.transfer = transfer
+        self.decode = decode
+        self.total = total
+        self.bytes = bytes
+        self.cache = cache
+        self.retries = retries
+        self.exception = exception
+
+    def __repr__(self):
+        return f"<RequestEvent {self.method} {self.endpoint} {self.status} {self.total}>"
+
+
+class Histogram:
+    """
+    Latency histogram with logarithmic buckets from 0.1ms to about 2 minutes, each 10% wider
+    than the previous one. Percentiles are accurate to the width of a bucket.
+    """
+
+    BOUNDS = tuple(0.0001 * 1.1 ** exponent for exponent in range(148))
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.BOUNDS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, percent):
+        """
+        Return the upper bound of the bucket holding the given percentile, or None if empty
+        """
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.BOUNDS[min(bucket, len(self.BOUNDS) - 1)]
+        return self.BOUNDS[-1]
+
+
+class _EndpointMetrics:
+
+    __slots__ = ("latency", "count", "errors", "bytes", "cache_hits", "retries", "throttle")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.throttle = 0.0
+
+
+class MetricsAggregator:
+    """
+    Hook aggregating request events per endpoint and method: latency histograms, counters of
+    calls, errors, cache hits and retries, and bytes received. Recording an event costs a
+    lock and a binary search, so it can stay enabled in production.
+
+        metrics = MetricsAggregator()
+        dz = Deezer(hooks=[metrics])
+        ...
+        print(metrics.snapshot())
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        key = (event.method, event.endpoint)
+        with self._lock:
+            metrics = self._endpoints.get(key)
+            if metrics is None:
+                metrics = self._endpoints[key] = _EndpointMetrics()
+            metrics.count += 1
+            metrics.latency.record(event.total or 0.0)
+            metrics.bytes += event.bytes
+            metrics.retries += event.retries
+            metrics.throttle += event.throttle
+            if event.error_code is not None or event.exception is not None or (event.status or 0) >= 400:
+                metrics.errors += 1
+            if event.cache == "hit":
+                metrics.cache_hits += 1
+
+    def snapshot(self):
+        """
+        Return the current metrics as a dictionary keyed on 'METHOD endpoint'
+        """
+        with self._lock:
+            return {f"{method} {endpoint}": {
+                "count": metrics.count,
+                "errors": metrics.errors,
+                "cache_hits": metrics.cache_hits,
+                "retries": metrics.retries,
+                "bytes": metrics.bytes,
+                "throttle": metrics.throttle,
+                "mean": metrics.latency.sum / metrics.count,
+                "p50": metrics.latency.percentile(50),
+                "p95": metrics.latency.percentile(95),
+                "p99": metrics.latency.percentile(99),
+            } for (method, endpoint), metrics in self._endpoints.items()}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
@@ -0,0 +1,234 @@
+class Model:
+    """
+    Base class of the typed entities returned by the client when models are enabled.
+
+    Entities only store the fields they know about in slots, which takes a fraction of the
+    memory of the equivalent dictionaries. Entities nested in other responses, like the
+    album of a track, are stubs holding a few fields: reading a field they lack fetches the
+    full entity through the client. Dictionary access (entity["title"]) and to_dict()
+    remain available for code written against the raw responses.
+    """
+
+    __slots__ = ("_client", "_complete", "_extra")
+    kind = None
+    _fields = ()
+    _nested = {}
+    _nested_lists = {}
+
+    def __init__(self, data, client=None, complete=False):
+        """
+        :param data: dictionary returned by the API
+        :param client: Deezer client used to fetch the missing fields of the entity
+        :param complete: whether data is the full entity rather than a stub
+        """
+        self._client = client
+        self._complete = complete
+        self._extra = None
+        self._load(data)
+
+    def __getattr__(self, name):
+        if name not in self._fields:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        if not self._complete and self._client is not None:
+            self._client._resolve_model(self)
+            try:
+                return object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        return None
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        if key == "type":
+            return self.kind
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        # Answers from the loaded fields: only attribute access fetches a stub
+        if key in self._fields:
+            return self._loaded(key) is not None
+        if key == "type":
+            return True
+        return bool(self._extra) and self._extra.get(key) is not None
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.id == other.id
+
+    def __hash__(self):
+        return hash((self.kind, self.id))
+
+    def __repr__(self):
+        label = self._loaded("title") or self._loaded("name")
+        return f"<{type(self).__name__} {self._loaded('id')} {label!r}>"
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def to_dict(self):
+        """
+        Return the entity as the dictionary the API returned, without fetching missing fields
+        """
+        data = dict(self._extra or {})
+        data["type"] = self.kind
+        for name in self._fields:
+            value = self._loaded(name)
+            if value is None:
+                continue
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif name in self._nested_lists:
+                value = [item.to_dict() for item in value]
+            data[name] = value
+        return data
+
+    def _loaded(self, name):
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            return None
+
+    def _load(self, data):
+        extra = None
+        for key, value in data.items():
+            if key in self._nested and isinstance(value, dict):
+                value = self._nested[key](value, self._client)
+            elif key in self._nested_lists and isinstance(value, list):
+                model = self._nested_lists[key]
+                value = [model(item, self._client) for item in value]
+            elif key not in self._fields:
+                if key != "type":
+                    if extra is None:
+                        extra = {}
+                    extra[key] = value
+                continue
+            object.__setattr__(self, key, value)
+        if extra:
+            self._extra = extra
+
+    def _fill(self, data):
+        self._load(data)
+        self._complete = True
+
+
+class Artist(Model):
+    __slots__ = ("id", "name", "link", "share", "picture", "picture_small", "picture_medium", "picture_big",
+                 "picture_xl", "nb_album", "nb_fan", "radio", "tracklist", "role")
+    kind = "artist"
+    _fields = frozenset(__slots__)
+
+
+class User(Model):
+    __slots__ = ("id", "name", "lastname", "firstname", "email", "status", "birthday", "inscription_date",
+                 "gender", "link", "picture", "picture_small", "picture_medium", "picture_big", "picture_xl",
+                 "country", "lang", "is_kid", "explicit_content_level", "tracklist")
+    kind = "user"
+    _fields = frozenset(__slots__)
+
+
+class Album(Model):
+    __slots__ = ("id", "title", "upc", "link", "share", "cover", "cover_small", "cover_medium", "cover_big",
+                 "cover_xl", "md5_image", "genre_id", "label", "nb_tracks", "duration", "fans", "release_date",
+                 "record_type", "available", "tracklist", "explicit_lyrics", "artist", "contributors")
+    kind = "album"
+    _fields = frozenset(__slots__)
+    _nested = {"artist": Artist}
+    _nested_lists = {"contributors": Artist}
+
+
+class Track(Model):
+    __slots__ = ("id", "readable", "title", "title_short", "title_version", "isrc", "link", "share", "duration",
+                 "track_position", "disk_number", "rank", "release_date", "explicit_lyrics", "preview", "bpm",
+                 "gain", "md5_image", "time_add", "artist", "album", "contributors")
+    kind = "track"
+    _fields = frozenset(__slots__)
+    _nested = {"artist": Artist, "album": Album}
+    _nested_lists = {"contributors": Artist}
+
+
+class Playlist(Model):
+    __slots__ = ("id", "title", "description", "duration", "public", "is_loved_track", "collaborative",
+                 "nb_tracks", "fans", "link", "share", "picture", "picture_small", "picture_medium", "picture_big",
+                 "picture_xl", "checksum", "tracklist", "creation_date", "time_add", "time_mod", "creator")
+    kind = "playlist"
+    _fields = frozenset(__slots__)
+    _nested = {"creator": User}
+
+
+class Episode(Model):
+    __slots__ = ("id", "title", "description", "available", "release_date", "duration", "link", "share",
+                 "picture", "picture_small", "picture_medium", "picture_big", "picture_xl", "podcast")
+    kind = "episode"
+    _fields = frozenset(__slots__)
+
+
+class Page:
+    """
+    One page of a collection, with its items converted to models
+    """
+
+    __slots__ = ("data", "total", "next", "prev", "checksum")
+
+    def __init__(self, response, client=None):
+        self.data = [parse(item, client) for item in response["data"]]
+        self.total = response.get("total")
+        self.next = response.get("next")
+        self.prev = response.get("prev")
+        self.checksum = response.get("checksum")
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        # Answers from the loaded fields: only attribute access fetches a stub
+        if key in self._fields:
+            return self._loaded(key) is not None
+        if key == "type":
+            return True
+        return bool(self._extra) and self._extra.get(key) is not None
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def to_dict(self):
+        data = {"data": [item.to_dict() if isinstance(item, Model) else item for item in self.data]}
+        for key in ("total", "next", "prev", "checksum"):
+            if getattr(self, key) is not None:
+                data[key] = getattr(self, key)
+        return data
+
+
+MODELS = {model.kind: model for model in (Artist, User, Album, Track, Playlist, Episode)}
+
+
+def parse(response, client=None, complete=False):
+    """
+    Convert a response of the API to models. Entities of unknown types, and anything that is
+    not an entity or a page of entities, are returned unchanged.
+    :param response: response returned by the client
+    :param client: Deezer client used to resolve stubs
+    :param complete: whether an entity response is the full entity
+    """
+    if not isinstance(response, dict):
+        return response
+    if isinstance(response.get("data"), list):
+        return Page(response, client)
+    model = MODELS.get(response.get("type"))
+    if model is None:
+        return response
+    return model(response, client, complete)
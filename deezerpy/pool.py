@@ -0,0 +1,121 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .deezerpy import Deezer
+from .ratelimit import SharedRateLimiter
+
+# Client of the current worker process, built by _start_worker
+_client = None
+
+
+class ProcessPool:
+    """
+    Pool of processes each running its own client, to spread the decoding of responses, and
+    whatever is done with them, over several cores. All the workers share one request budget
+    through a SharedRateLimiter, so the quota of the application holds for the whole pool:
+
+        with ProcessPool(max_workers=4, client_options={"auth": token}) as pool:
+            for track in pool.iter_tracks(ids):
+                ...
+
+    Functions run in the workers must be defined at the top level of a module, and their
+    results must be picklable (dictionaries rather than models), so they can travel between
+    the processes. Results are sent back to the parent in the order of the inputs.
+    """
+
+    def __init__(self, max_workers=None, rate_limiter=None, client_options=None, mp_context=None):
+        """
+        :param max_workers: number of processes. Defaults to the number of CPUs
+        :param rate_limiter: SharedRateLimiter shared by the workers. Defaults to Deezer's quota
+                             of 50 requests every 5 seconds. Use False to disable it
+        :param client_options: keyword arguments of the Deezer client of every worker, e.g.
+                               auth, cache or base_url. They are pickled: every worker gets its
+                               own copy of a ResponseCache, while a SQLiteCache shares its file
+        :param mp_context: multiprocessing context used to start the processes
+        """
+        if rate_limiter is None:
+            rate_limiter = SharedRateLimiter(context=mp_context)
+        self.rate_limiter = rate_limiter
+        self._executor = ProcessPoolExecutor(max_workers, mp_context=mp_context, initializer=_start_worker,
+                                             initargs=(rate_limiter, client_options or {}))
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        self._executor.shutdown(wait=True)
+
+    def submit(self, function, *args):
+        """
+        Run function(client, *args) in a worker
+        :return: Future of the result
+        """
+        return self._executor.submit(_run, function, args)
+
+    def map(self, function, items, window=None):
+        """
+        Run function(client, item) in the workers for every item
+        :param function: top-level function taking the worker's client and an item
+        :param items: iterable of items, consumed as the results come back
+        :param window: maximum number of items in flight. Defaults to four per worker
+        :return: generator of the results, in the order of the items
+        """
+        window = window or self.max_workers * 4
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(self.submit(function, item))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def iter_tracks(self, track_ids):
+        """
+        Fetch tracks in the workers, see Deezer.get_tracks
+        :return: generator of the tracks, or of DeezerException for the failed lookups
+        """
+        return self.map(fetch_entity, (("track", str(id)) for id in track_ids))
+
+    def iter_albums(self, album_ids):
+        """
+        Fetch albums in the workers, see Deezer.get_albums
+        """
+        return self.map(fetch_entity, (("album", str(id)) for id in album_ids))
+
+    def iter_artists(self, artist_ids):
+        """
+        Fetch artists in the workers, see Deezer.get_artists
+        """
+        return self.map(fetch_entity, (("artist", str(id)) for id in artist_ids))
+
+
+def fetch_entity(client, entity):
+    """
+    Fetch a single (kind, id) entity with the worker's client
+    """
+    kind, id = entity
+    try:
+        return getattr(client, f"get_{kind}")(id)
+    except Exception as error:
+        return client._exception_result(error)
+
+
+def _start_worker(rate_limiter, client_options):
+    global _client
+    _client = Deezer(**dict(client_options, rate_limiter=rate_limiter))
+
+
+def _run(function, args):
+    return function(_client, *args)
@@ -0,0 +1,41 @@
+import re
+from urllib.parse import quote
+
+SPACES = re.compile(r"\s+")
+
+# Keys of the advanced search taking a number rather than a text
+NUMERIC_KEYS = ("bpm_min", "bpm_max", "dur_min", "dur_max")
+
+
+def canonical_query(keyword):
+    """
+    Normalize a search keyword, so that the same search always produces the same URL:
+    lower-cased, trimmed, and with runs of whitespace collapsed
+    """
+    return SPACES.sub(" ", str(keyword)).strip().casefold()
+
+
+def advanced_query(params):
+    """
+    Build the query of an advanced search, with sorted keys and normalized values:
+    {"track": "Snow ", "artist": "Red  Hot"} gives 'artist:"red hot" track:"snow"'
+    :param params: dictionary of advanced search keys (artist, album, track, label, bpm_min,
+                   bpm_max, dur_min, dur_max) to values
+    """
+    terms = []
+    for key in sorted(params):
+        value = canonical_query(params[key]).replace('"', "")
+        if key in NUMERIC_KEYS:
+            terms.append(f"{key}:{value}")
+        else:
+            terms.append(f'{key}:"{value}"')
+    return " ".join(terms)
+
+
+def search_url(path, query):
+    """
+    URL of a search, with the query percent-encoded
+    :param path: 'search' or 'search/<method>'
+    :param query: canonical query
+    """
+    return f"{path}?q={quote(query, safe='')}"
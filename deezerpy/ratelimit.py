@@ -0,0 +1,145 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket limiting the number of requests sent to the API. Deezer allows about 50
+    requests every 5 seconds per application, which is the default.
+
+    Callers reserve a token before each request and sleep for as long as the bucket needs
+    to refill it, so concurrent threads or tasks are spread evenly over the window.
+    """
+
+    def __init__(self, rate=50, period=5, burst=None):
+        """
+        :param rate: number of requests allowed per period
+        :param period: length of the period in seconds
+        :param burst: number of requests that can be sent back to back. Defaults to rate
+        """
+        self.rate = rate
+        self.period = period
+        self.capacity = burst or rate
+        self.fill_rate = rate / period
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.retries = 0
+        self.retry_wait_total = 0.0
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token from the bucket and return the seconds to wait before using it
+        """
+        with self._lock:
+            tokens = self._take(time.monotonic())
+            wait = -tokens / self.fill_rate if tokens < 0 else 0.0
+            self.acquired += 1
+            if wait > 0:
+                self.throttled += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+            return wait
+
+    def acquire(self):
+        """
+        Block until a request can be sent. Returns the seconds waited
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        """
+        Same as acquire, without blocking the event loop
+        """
+        import asyncio
+
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, delay):
+        """
+        Empty the bucket after the API reported the quota was exceeded, so that the other
+        callers slow down too, and record the retry
+        :param delay: seconds the caller will wait before retrying
+        """
+        with self._lock:
+            self._drain()
+            self.retries += 1
+            self.retry_wait_total += delay
+
+    def _take(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+        self._updated = now
+        self._tokens -= 1
+        return self._tokens
+
+    def _drain(self):
+        self._tokens = min(self._tokens, 0.0)
+
+    def stats(self):
+        """
+        Return the number of tokens handed out, how many of them required waiting and for
+        how long, and the retries caused by quota errors
+        """
+        return {"acquired": self.acquired, "throttled": self.throttled, "wait_total": self.wait_total,
+                "wait_max": self.wait_max, "retries": self.retries, "retry_wait_total": self.retry_wait_total}
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    RateLimiter whose bucket lives in shared memory, so that the processes started from the
+    one creating it draw from a single budget, e.g. the workers of a ProcessPool:
+
+        limiter = SharedRateLimiter()
+        with ProcessPool(rate_limiter=limiter) as pool:
+            ...
+
+    The limiter is handed to the processes when they start; the statistics are kept by each
+    process for its own requests.
+    """
+
+    def __init__(self, rate=50, period=5, burst=None, context=None):
+        """
+        :param rate: number of requests allowed per period, all processes included
+        :param period: length of the period in seconds
+        :param burst: number of requests that can be sent back to back. Defaults to rate
+        :param context: multiprocessing context the processes are started with
+        """
+        import multiprocessing
+
+        super().__init__(rate, period, burst)
+        context = context or multiprocessing.get_context()
+        # Tokens left and time of the last update, guarded by a lock shared by the processes
+        self._bucket = context.RawArray("d", [float(self.capacity), time.monotonic()])
+        self._bucket_lock = context.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _take(self, now):
+        with self._bucket_lock:
+            # Read the clock under the lock, so that the updates of the processes stay ordered
+            now = time.monotonic()
+            tokens, updated = self._bucket
+            tokens = min(self.capacity, tokens + (now - updated) * self.fill_rate) - 1
+            self._bucket[0], self._bucket[1] = tokens, now
+        return tokens
+
+    def _drain(self):
+        with self._bucket_lock:
+            self._bucket[0] = min(self._bucket[0], 0.0)
@@ -0,0 +1,163 @@
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+KINDS = ("album", "artist", "episode", "genre", "playlist", "podcast", "radio", "track", "user")
+# Names used by the website for kinds named differently by the API
+ALIASES = {"show": "podcast", "profile": "user"}
+
+URL = re.compile(r"""
+    ^(?:https?://)?(?:www\.|api\.)?deezer\.com/
+    (?:[a-z]{2}(?:-[a-z]{2})?/)?          # locale, e.g. 'fr' or 'pt-br'
+    (?P<kind>[a-z]+)/(?P<id>-?\d+)
+    (?:[/?#].*)?$
+""", re.IGNORECASE | re.VERBOSE)
+URI = re.compile(r"^deezer:(?P<kind>[a-z]+):(?P<id>-?\d+)$", re.IGNORECASE)
+ID = re.compile(r"^-?\d+$")
+SHORT_LINK = re.compile(r"^(?:https?://)?(?:deezer\.page\.link|link\.deezer\.com)/\S+$", re.IGNORECASE)
+MAX_REDIRECTS = 5
+
+
+class ResolveError(Exception):
+    """
+    Input that could not be resolved to an ID. Returned by IdResolver instead of a (kind, id)
+    pair, like the client returns the errors of the API.
+    """
+
+    def __init__(self, value, message):
+        self.value = value
+        self.msg = message
+
+    def __reduce__(self):
+        return type(self), (self.value, self.msg)
+
+    def __str__(self):
+        return f"Could not resolve '{self.value}': {self.msg}"
+
+    def __repr__(self):
+        return f"<ResolveError {self.value!r}: {self.msg}>"
+
+
+class IdResolver:
+    """
+    Turn IDs, URLs, URIs and short links into (kind, id) pairs:
+
+        resolver = IdResolver()
+        resolver.resolve_many(["https://www.deezer.com/fr/track/3135556?utm_source=x",
+                               "https://deezer.page.link/AbCd", "deezer:album:302127"])
+
+    Short links are expanded over HTTP, concurrently, and their targets are kept in an LRU
+    cache. Inputs that cannot be resolved give a ResolveError instead of a pair.
+    """
+
+    def __init__(self, max_workers=8, cache_size=10000, timeout=10, session=None):
+        """
+        :param max_workers: number of short links expanded concurrently
+        :param cache_size: number of expanded short links remembered
+        :param timeout: seconds to wait for the answer to a short link
+        :param session: optional requests.Session used to expand short links
+        """
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self._session = session
+        self._links = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, value, kind=None):
+        """
+        Resolve a single input
+        :param value: ID, URL, 'deezer:kind:id' URI or short link
+        :param kind: expected kind. Bare IDs are given this kind, other inputs of another kind
+                     are errors. Without it, bare IDs resolve to (None, id)
+        :return: (kind, id) pair, the ID being a string, or ResolveError
+        """
+        return self.resolve_many([value], kind)[0]
+
+    def resolve_many(self, values, kind=None):
+        """
+        Resolve a batch of inputs, expanding their short links concurrently
+        :param values: iterable of inputs, see resolve
+        :param kind: expected kind of every input
+        :return: list of (kind, id) pairs or ResolveError, in the order of the inputs
+        """
+        results = []
+        links = {}
+        for position, value in enumerate(values):
+            value = str(value).strip()
+            result = self._parse(value, kind)
+            if result is None and SHORT_LINK.match(value):
+                links.setdefault(value, []).append(position)
+            results.append(result if result is not None else ResolveError(value, "Not a Deezer ID or URL"))
+        if links:
+            for link, target in zip(links, self._expand_all(list(links))):
+                result = target if isinstance(target, ResolveError) else self._parse(target, kind)
+                if result is None:
+                    result = ResolveError(link, f"Short link leads to '{target}', not to a Deezer entity")
+                for position in links[link]:
+                    results[position] = result
+        return results
+
+    def parse(self, value, kind=None):
+        """
+        Resolve an input without network access: short links give a ResolveError
+        """
+        result = self._parse(str(value).strip(), kind)
+        return result if result is not None else ResolveError(value, "Not a Deezer ID or URL")
+
+    def _parse(self, value, kind):
+        if ID.match(value):
+            return kind, value
+        match = URL.match(value) or URI.match(value)
+        if match is None:
+            return None
+        found = match.group("kind").lower()
+        found = ALIASES.get(found, found)
+        if found not in KINDS:
+            return ResolveError(value, f"Unknown kind '{found}'")
+        if kind is not None and found != kind:
+            return ResolveError(value, f"Expecting '{kind}', found '{found}' instead")
+        return found, match.group("id")
+
+    def _expand_all(self, links):
+        targets = {}
+        with self._lock:
+            for link in links:
+                if link in self._links:
+                    self._links.move_to_end(link)
+                    targets[link] = self._links[link]
+        missing = [link for link in links if link not in targets]
+        if len(missing) == 1 or self.max_workers == 1:
+            targets.update(zip(missing, map(self._expand, missing)))
+        elif missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+                targets.update(zip(missing, executor.map(self._expand, missing)))
+        return [targets[link] for link in links]
+
+    def _expand(self, link):
+        url = link if "://" in link else f"https://{link}"
+        try:
+            for _ in range(MAX_REDIRECTS):
+                response = self._get_session().head(url, allow_redirects=False, timeout=self.timeout)
+                location = response.headers.get("Location")
+                if not location:
+                    return ResolveError(link, f"Short link could not be expanded (HTTP {response.status_code})")
+                url = requests.compat.urljoin(url, location)
+                if URL.match(url):
+                    break
+        except requests.RequestException as error:
+            return ResolveError(link, f"Short link could not be expanded: {error}")
+        with self._lock:
+            self._links[link] = url
+            self._links.move_to_end(link)
+            while len(self._links) > self.cache_size:
+                self._links.popitem(last=False)
+        return url
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
@@ -0,0 +1,75 @@
+class PlaylistSync:
+    """
+    Changes needed to turn the tracks of a playlist into a target list, and once applied,
+    the outcome of the requests sent
+
+    - remove: track IDs to remove from the playlist, the moved ones included
+    - add: track IDs to append, the moved ones included, in the order they are appended
+    - move: track IDs kept in the playlist but removed and appended again to reach the
+      target order, when the order is too long to be sent in one request
+    - order: full target order, or None if removing and appending is enough
+    - results: ChunkResult of every request sent, the reorder call included
+    """
+
+    __slots__ = ("remove", "add", "move", "order", "results")
+
+    def __init__(self, remove, add, order, move=()):
+        self.remove = remove
+        self.add = add
+        self.move = list(move)
+        self.order = order
+        self.results = []
+
+    @property
+    def changed(self):
+        return bool(self.remove or self.add or self.order)
+
+    @property
+    def ok(self):
+        return all(result.ok for result in self.results)
+
+    def __repr__(self):
+        return (f"<PlaylistSync remove={len(self.remove)} add={len(self.add)} move={len(self.move)} "
+                f"reorder={self.order is not None}>")
+
+
+def plan_playlist_sync(current, target, max_order_length=None):
+    """
+    Compute the smallest set of changes turning the current tracks of a playlist into the
+    target ones: the tracks to remove, the tracks to append, and the final order when the
+    appended tracks do not already land where the target wants them.
+
+    A reorder request carries the whole target order in its URL. When that order is longer
+    than max_order_length, the tracks are put in order by removing and appending again the
+    ones after the longest start of the target already in place, in batches.
+    :param current: track IDs currently in the playlist, in order
+    :param target: track IDs wanted, in order. Duplicates are ignored, as playlists cannot
+                   hold the same track twice
+    :param max_order_length: maximum URL-encoded length of the order sent in one request,
+                             None for no limit
+    """
+    target = list(dict.fromkeys(str(track) for track in target))
+    current = list(dict.fromkeys(str(track) for track in current))
+    wanted = set(target)
+    remove = [track for track in current if track not in wanted]
+    kept = [track for track in current if track in wanted]
+    positions = {track: position for position, track in enumerate(kept)}
+    add = [track for track in target if track not in positions]
+    if kept + add == target:
+        return PlaylistSync(remove, add, None)
+    # Measured like the batches of songs: commas are sent URL-encoded, as '%2C'
+    if max_order_length is None or sum(len(track) + 3 for track in target) <= max_order_length:
+        return PlaylistSync(remove, add, target)
+
+    # Appended tracks land at the end: only a start of the target found in the same order
+    # among the kept tracks can stay in place, everything after it is appended again
+    start = 0
+    last = -1
+    for track in target:
+        position = positions.get(track)
+        if position is None or position < last:
+            break
+        last = position
+        start += 1
+    move = [track for track in target[start:] if track in positions]
+    return PlaylistSync(remove + move, target[start:], None, move)
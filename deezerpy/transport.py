@@ -0,0 +1,532 @@
+import base64
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Response headers kept in cassettes, the others are dropped to keep them small
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+# Access tokens in the URLs of recorded bodies, such as the 'next' link of a page. The
+# first pattern takes the token with the '&' after it, the second one a token ending a URL
+_TOKEN_PARAMETER = re.compile(rb'([?&])access_token=[^&"\s]*&')
+_LAST_TOKEN_PARAMETER = re.compile(rb'[?&]access_token=[^&"\s]*')
+
+
+class Response:
+    """
+    Response returned by the transports
+
+    - status_code: HTTP status
+    - headers: response headers
+    - content: body of the response
+    - connect: seconds spent opening a new connection, None if unknown or reused
+    - wait: seconds from sending the request to receiving the headers, None if unknown
+    """
+
+    __slots__ = ("status_code", "headers", "content", "connect", "wait")
+
+    def __init__(self, status_code, headers, content, connect=None, wait=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.connect = connect
+        self.wait = wait
+
+
+class Transport:
+    """
+    Sends the requests of the client. Synchronous transports implement request and stream,
+    asynchronous ones arequest and astream; in-process transports implement both.
+    """
+
+    def request(self, method, url, params=None, headers=None):
+        """
+        Send a request and return its Response
+        :param method: HTTP method
+        :param url: full URL of the request
+        :param params: query parameters
+        :param headers: additional request headers
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot be used by the synchronous client")
+
+    def stream(self, method, url, params=None):
+        """
+        Send a request and yield the body of the response in chunks
+        """
+        yield self.request(method, url, params).content
+
+    async def arequest(self, method, url, params=None, headers=None):
+        raise NotImplementedError(f"{type(self).__name__} cannot be used by the asynchronous client")
+
+    async def astream(self, method, url, params=None):
+        yield (await self.arequest(method, url, params)).content
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        self.close()
+
+
+class HTTPTransport(Transport):
+    """
+    Sends requests over a pool of keep-alive connections with requests. The pool is created
+    on first use and can be shared by several threads.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, session=None):
+        """
+        :param pool_connections: number of hosts to keep connection pools for
+        :param pool_maxsize: maximum number of keep-alive connections kept per host
+        :param session: optional requests.Session to use instead of the transport's own one
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._session = session
+        self._owns_session = session is None
+        self._session_lock = threading.Lock()
+
+    def request(self, method, url, params=None, headers=None):
+        response = self._get_session().request(method, url, params=params, headers=headers)
+        # requests only measures the time to the headers, connecting included
+        elapsed = getattr(response, "elapsed", None)
+        wait = elapsed.total_seconds() if elapsed is not None else None
+        return Response(response.status_code, response.headers, response.content, wait=wait)
+
+    def stream(self, method, url, params=None):
+        response = self._get_session().request(method, url, params=params, stream=True)
+        try:
+            yield from response.iter_content(chunk_size=65536)
+        finally:
+            response.close()
+
+    def close(self):
+        """
+        Close the pooled connections. A new pool is opened on the next request.
+        """
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None and self._owns_session:
+            session.close()
+        self._owns_session = True
+
+    def _get_session(self):
+        session = self._session
+        if session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._build_session()
+                session = self._session
+        return session
+
+    def _build_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+        return session
+
+
+class AsyncHTTPTransport(Transport):
+    """
+    Sends requests of the asynchronous client over a non-blocking httpx connection pool
+    """
+
+    def __init__(self, pool_maxsize=100, client=None):
+        """
+        :param pool_maxsize: maximum number of connections kept open
+        :param client: optional httpx.AsyncClient to use instead of the transport's own one
+        """
+        self._httpx = _import_httpx("AsyncHTTPTransport", "httpx") if client is None else None
+        self.pool_maxsize = pool_maxsize
+        self._client = client
+        self._owns_client = client is None
+
+    async def arequest(self, method, url, params=None, headers=None):
+        trace = _Trace()
+        sent = time.perf_counter()
+        response = await self._get_client().request(method, url, params=params, headers=headers,
+                                                     extensions={"trace": trace})
+        wait = trace.headers - sent - (trace.connect or 0.0) if trace.headers else None
+        return Response(response.status_code, response.headers, response.content, connect=trace.connect, wait=wait)
+
+    async def astream(self, method, url, params=None):
+        async with self._get_client().stream(method, url, params=params) as response:
+            async for chunk in response.aiter_bytes():
+                yield chunk
+
+    async def aclose(self):
+        client, self._client = self._client, None
+        if client is not None and self._owns_client:
+            await client.aclose()
+        self._owns_client = True
+
+    def _get_client(self):
+        if self._client is None:
+            httpx = self._httpx or _import_httpx("AsyncHTTPTransport", "httpx")
+            limits = httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize)
+            self._client = httpx.AsyncClient(limits=limits, headers={"Accept-Encoding": "gzip, deflate"})
+        return self._client
+
+
+class HTTP2Transport(Transport):
+    """
+    Sends requests over HTTP/2 with httpx, multiplexing the concurrent requests of the client
+    as streams of one or a few connections instead of opening a socket for each of them.
+    Usable by both Deezer and AsyncDeezer:
+
+        dz = Deezer(transport=HTTP2Transport())
+        dz.get_tracks(track_ids, max_workers=50)
+
+    Connections are checked before being reused: httpx drops the ones closed by the server or
+    left idle longer than keepalive_expiry. A GET failing on a connection that broke in the
+    meantime (e.g. after a GOAWAY from the server) is sent again on a fresh one.
+    Requires the httpx and h2 packages: pip install httpx[http2]
+    """
+
+    def __init__(self, max_connections=2, keepalive_expiry=30.0, timeout=10.0, retries=1, http1=True,
+                 client=None, async_client=None):
+        """
+        :param max_connections: maximum number of connections to the API. Each carries up to
+                                the number of concurrent streams allowed by the server
+        :param keepalive_expiry: seconds an idle connection is kept before being closed
+        :param timeout: seconds to wait for the connection and for the response
+        :param retries: number of times a GET is sent again after its connection broke
+        :param http1: fall back to HTTP/1.1 for servers without HTTP/2. False requires HTTP/2,
+                      and speaks it even without TLS, e.g. to a local proxy
+        :param client: optional httpx.Client used by the synchronous client
+        :param async_client: optional httpx.AsyncClient used by the asynchronous client
+        """
+        # Both packages are only needed to build the transport's own clients
+        own = client is None or async_client is None
+        self._httpx = _import_httpx("HTTP2Transport", "httpx[http2]", http2=own)
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.retries = retries
+        self.http1 = http1
+        # Number of requests sent again after their connection broke
+        self.reconnects = 0
+        self._client = client
+        self._async_client = async_client
+        self._owns_client = client is None
+        self._owns_async_client = async_client is None
+        self._client_lock = threading.Lock()
+
+    def request(self, method, url, params=None, headers=None):
+        client = self._get_client()
+        attempt = 0
+        while True:
+            trace = _Trace()
+            sent = time.perf_counter()
+            try:
+                response = client.request(method, url, params=params, headers=headers,
+                                          extensions={"trace": trace.record})
+                break
+            except self._broken_connection():
+                if not self._retry(method, attempt):
+                    raise
+                attempt += 1
+        return self._response(response, trace, sent)
+
+    def stream(self, method, url, params=None):
+        with self._get_client().stream(method, url, params=params) as response:
+            yield from response.iter_bytes()
+
+    async def arequest(self, method, url, params=None, headers=None):
+        client = self._get_async_client()
+        attempt = 0
+        while True:
+            trace = _Trace()
+            sent = time.perf_counter()
+            try:
+                response = await client.request(method, url, params=params, headers=headers,
+                                                extensions={"trace": trace})
+                break
+            except self._broken_connection():
+                if not self._retry(method, attempt):
+                    raise
+                attempt += 1
+        return self._response(response, trace, sent)
+
+    async def astream(self, method, url, params=None):
+        async with self._get_async_client().stream(method, url, params=params) as response:
+            async for chunk in response.aiter_bytes():
+                yield chunk
+
+    def close(self):
+        """
+        Close the connections of the synchronous client. New ones are opened on the next request.
+        """
+        with self._client_lock:
+            client, self._client = self._client, None
+        if client is not None and self._owns_client:
+            client.close()
+        self._owns_client = True
+
+    async def aclose(self):
+        """
+        Close the connections of both the asynchronous and the synchronous clients
+        """
+        client, self._async_client = self._async_client, None
+        if client is not None and self._owns_async_client:
+            await client.aclose()
+        self._owns_async_client = True
+        self.close()
+
+    def _broken_connection(self):
+        httpx = self._httpx
+        return httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError
+
+    def _retry(self, method, attempt):
+        # Only requests without side effects can be sent twice
+        if method not in ("GET", "HEAD") or attempt >= self.retries:
+            return False
+        self.reconnects += 1
+        return True
+
+    def _response(self, response, trace, sent):
+        wait = trace.headers - sent - (trace.connect or 0.0) if trace.headers else None
+        return Response(response.status_code, response.headers, response.content, connect=trace.connect, wait=wait)
+
+    def _options(self):
+        httpx = self._httpx
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections,
+                              keepalive_expiry=self.keepalive_expiry)
+        return dict(http1=self.http1, http2=True, limits=limits, timeout=self.timeout,
+                    headers={"Accept-Encoding": "gzip, deflate"})
+
+    def _get_client(self):
+        client = self._client
+        if client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._httpx.Client(**self._options())
+                client = self._client
+        return client
+
+    def _get_async_client(self):
+        if self._async_client is None:
+            self._async_client = self._httpx.AsyncClient(**self._options())
+        return self._async_client
+
+
+def _import_httpx(transport, package, http2=False):
+    # Imported by the transports using it only, so that the synchronous client starts fast
+    try:
+        import httpx
+        if http2:
+            import h2
+    except ImportError:
+        raise ImportError(f"{transport} requires the {package} package: pip install {package}") from None
+    return httpx
+
+
+class _Trace:
+    # Collects connection timings through the trace extension of httpcore
+
+    __slots__ = ("connect_started", "connect", "headers")
+
+    def __init__(self):
+        self.connect_started = None
+        self.connect = None
+        self.headers = None
+
+    async def __call__(self, name, info):
+        self.record(name, info)
+
+    def record(self, name, info):
+        # Synchronous variant, for the trace extension of the synchronous httpx client
+        if name == "connection.connect_tcp.started":
+            self.connect_started = time.perf_counter()
+        elif name in ("connection.connect_tcp.complete", "connection.start_tls.complete") and self.connect_started:
+            self.connect = time.perf_counter() - self.connect_started
+        elif name.endswith("receive_response_headers.complete"):
+            self.headers = time.perf_counter()
+
+
+class FakeTransport(Transport):
+    """
+    In-process transport answering from a dictionary of routes, without any network. Usable
+    by both Deezer and AsyncDeezer.
+
+        transport = FakeTransport({"album/302127": {"id": 302127, "title": "Discovery"}})
+        dz = Deezer(transport=transport)
+
+    Routes are paths relative to the root of the API, without surrounding slashes. A path
+    with a query string ('search?q=daft') only matches that query. Values are either the
+    payload to answer with, or a callable taking (method, path, params) and returning it.
+    Requests without a route answer with Deezer's 'no data' error.
+    """
+
+    NOT_FOUND = {"error": {"type": "DataException", "message": "no data", "code": 800}}
+
+    def __init__(self, routes=None):
+        """
+        :param routes: dictionary of path -> payload or callable
+        """
+        self.routes = {self._route_key(path): route for path, route in (routes or {}).items()}
+        self.requests = []
+
+    def add_route(self, path, route):
+        self.routes[self._route_key(path)] = route
+
+    def request(self, method, url, params=None, headers=None):
+        parts = urlsplit(url)
+        path = parts.path.strip("/")
+        query = dict(parse_qsl(parts.query))
+        query.update({name: value for name, value in (params or {}).items() if name != "access_token"})
+        self.requests.append((method, path, query))
+        route = self.routes.get(f"{path}?{urlencode(sorted(query.items()))}") if query else None
+        if route is None:
+            route = self.routes.get(path, self.NOT_FOUND)
+        payload = route(method, path, query) if callable(route) else route
+        return Response(200, {"Content-Type": "application/json"}, json.dumps(payload).encode())
+
+    async def arequest(self, method, url, params=None, headers=None):
+        return self.request(method, url, params, headers)
+
+    def _route_key(self, path):
+        path, _, query = path.strip("/").partition("?")
+        if not query:
+            return path
+        return f"{path}?{urlencode(sorted(parse_qsl(query)))}"
+
+
+class CassetteTransport(Transport):
+    """
+    Records the responses of another transport to a cassette file and replays them without
+    any network, so pipelines and tests can run offline, deterministically and at full speed.
+
+        with CassetteTransport("tests/cassettes/albums.jsonl.gz", mode="once") as transport:
+            dz = Deezer(transport=transport)
+
+    Cassettes are gzip-compressed JSON lines. Access tokens are never written to them,
+    neither from the requests nor from the links inside the recorded bodies.
+    Identical requests are replayed in the order they were recorded.
+    """
+
+    def __init__(self, path, mode="replay", transport=None):
+        """
+        :param path: location of the cassette
+        :param mode: 'replay' serves only recorded responses, 'record' sends every request and
+                     records it, 'once' replays what was recorded and records the rest
+        :param transport: transport used to record, defaults to HTTPTransport
+        """
+        if mode not in ("replay", "record", "once"):
+            raise ValueError(f"Unknown cassette mode '{mode}'")
+        self.path = path
+        self.mode = mode
+        self.transport = transport
+        self._episodes = {}
+        self._positions = {}
+        self._recorded = []
+        self._lock = threading.Lock()
+        if mode != "record" and os.path.exists(path):
+            self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def request(self, method, url, params=None, headers=None):
+        key = self._key(method, url, params)
+        response = self._replay(key)
+        if response is None:
+            response = self._inner().request(method, url, params, headers)
+            self._record(key, response)
+        return response
+
+    async def arequest(self, method, url, params=None, headers=None):
+        key = self._key(method, url, params)
+        response = self._replay(key)
+        if response is None:
+            response = await self._inner(asynchronous=True).arequest(method, url, params, headers)
+            self._record(key, response)
+        return response
+
+    def close(self):
+        """
+        Write the recorded responses to the cassette
+        """
+        self.save()
+        if self.transport is not None:
+            self.transport.close()
+
+    async def aclose(self):
+        self.save()
+        if self.transport is not None:
+            await self.transport.aclose()
+
+    def save(self):
+        with self._lock:
+            if not self._recorded:
+                return
+            episodes = [(key, response) for key, responses in self._episodes.items() for response in responses]
+            self._recorded = []
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as cassette:
+            for key, response in episodes:
+                cassette.write(json.dumps(self._dump(key, response), separators=(",", ":")) + "\n")
+
+    def _inner(self, asynchronous=False):
+        if self.mode == "replay":
+            raise LookupError(f"No recorded response in {self.path}")
+        if self.transport is None:
+            self.transport = AsyncHTTPTransport() if asynchronous else HTTPTransport()
+        return self.transport
+
+    def _replay(self, key):
+        if self.mode == "record":
+            return None
+        with self._lock:
+            responses = self._episodes.get(key)
+            if not responses:
+                if self.mode == "replay":
+                    raise LookupError(f"No recorded response for {key[0]} {key[1]} in {self.path}")
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return responses[min(position, len(responses) - 1)]
+
+    def _record(self, key, response):
+        headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        content = response.content
+        if b"access_token=" in content:
+            content = _LAST_TOKEN_PARAMETER.sub(b"", _TOKEN_PARAMETER.sub(rb"\1", content))
+        response = Response(response.status_code, headers, content)
+        with self._lock:
+            self._episodes.setdefault(key, []).append(response)
+            self._recorded.append(key)
+
+    def _key(self, method, url, params):
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query) + list((params or {}).items())
+        query = sorted((name, str(value)) for name, value in query if name != "access_token")
+        return method, f"{parts.path.strip('/')}?{urlencode(query)}" if query else parts.path.strip("/")
+
+    def _dump(self, key, response):
+        try:
+            body = {"body": response.content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"body64": base64.b64encode(response.content).decode()}
+        return dict(method=key[0], url=key[1], status=response.status_code, headers=dict(response.headers), **body)
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as cassette:
+            for line in cassette:
+                episode = json.loads(line)
+                content = episode["body"].encode() if "body" in episode else base64.b64decode(episode["body64"])
+                response = Response(episode["status"], episode["headers"], content)
+                self._episodes.setdefault((episode["method"], episode["url"]), []).append(response)
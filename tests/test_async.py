@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+
+import httpx
+
+from deezerpy import AsyncDeezer, DeezerException
+
+
+def handler(request):
+    path = request.url.path.rstrip("/")
+    if path == "/album/302127":
+        return httpx.Response(200, json={"id": 302127, "title": "Discovery"})
+    if path == "/artist/27/top" and request.url.params.get("index") == "5":
+        return httpx.Response(200, json={"data": [{"id": 6}]})
+    if path == "/artist/27/top":
+        return httpx.Response(200, json={"data": [{"id": 1}], "next": "https://api.deezer.com/artist/27/top?index=5"})
+    return httpx.Response(200, json={"error": {"type": "DataException", "message": "no data", "code": 800}})
+
+
+class TestAsyncDeezer(unittest.TestCase):
+
+    def run_client(self, coro_factory):
+        async def main():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            async with AsyncDeezer(client=client) as dz:
+                return await coro_factory(dz)
+        return asyncio.run(main())
+
+    def test_get_album_url(self):
+        album = self.run_client(lambda dz: dz.get_album("https://www.deezer.com/en/album/302127"))
+        self.assertEqual(album["title"], "Discovery")
+
+    def test_error_mapping(self):
+        error = self.run_client(lambda dz: dz.get_track("1"))
+        self.assertIsInstance(error, DeezerException)
+        self.assertEqual(error.code, 800)
+
+    def test_next(self):
+        async def walk(dz):
+            top = await dz.get_artist("27", "top")
+            return await dz.next(top)
+        self.assertEqual(self.run_client(walk)["data"][0]["id"], 6)
+
+    def test_concurrent_calls(self):
+        async def many(dz):
+            return await asyncio.gather(*(dz.get_album("302127") for _ in range(20)))
+        self.assertEqual(len(self.run_client(many)), 20)
+
+    def test_sync_context_manager_is_refused(self):
+        dz = AsyncDeezer(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        with self.assertRaises(TypeError):
+            with dz:
+                pass
+        with self.assertRaises(TypeError):
+            dz.close()
+        asyncio.run(dz.aclose())
@@ -0,0 +1,94 @@
+import datetime
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from deezerpy import Deezer, DeezerCredentials, FakeTransport, FileTokenStore, SQLiteTokenStore
+
+
+class FakeTokenEndpoint:
+
+    def __init__(self, expires=3600):
+        self.expires = expires
+        self.calls = []
+
+    def __call__(self, url, params=None):
+        self.calls.append(params["code"])
+        time.sleep(0.05)
+        text = f"access_token=token-{len(self.calls)}&expires={self.expires}" if params["code"] else "wrong code"
+        return mock.Mock(text=text)
+
+
+class TestDeezerCredentials(unittest.TestCase):
+
+    def setUp(self):
+        self.endpoint = FakeTokenEndpoint()
+        patcher = mock.patch("deezerpy.auth.requests.get", self.endpoint)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def credentials(self, store=None, **kwargs):
+        return DeezerCredentials("123", "secret", "basic_access", "https://example.com/callback", store=store,
+                                 code_provider=lambda: "code", **kwargs)
+
+    def test_exchange_code(self):
+        credentials = self.credentials()
+        self.assertEqual(credentials.exchange_code("https://example.com/callback?code=abc"), "token-1")
+        self.assertEqual(self.endpoint.calls, ["abc"])
+        self.assertFalse(credentials.is_token_expired())
+        self.assertIsNone(credentials.exchange_code(""))
+        self.assertIn("app_id=123", credentials.authorize_url())
+
+    def test_expiry(self):
+        credentials = self.credentials(refresh_margin=60)
+        self.assertTrue(credentials.is_token_expired())
+        credentials.get_access_token()
+        credentials.token_expires = datetime.datetime.now() + datetime.timedelta(seconds=30)
+        self.assertEqual(credentials.get_access_token(), "token-2")
+        self.endpoint.expires = 0
+        credentials.token = None
+        credentials.get_access_token()
+        self.assertIsNone(credentials.token_expires)
+        self.assertFalse(credentials.is_token_expired())
+
+    def test_single_fetch(self):
+        credentials = self.credentials()
+        tokens = []
+        threads = [threading.Thread(target=lambda: tokens.append(credentials.get_access_token())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(tokens, ["token-1"] * 8)
+
+    def test_stores_share_tokens(self):
+        for store in (FileTokenStore(os.path.join(self.directory, "tokens.json")),
+                      SQLiteTokenStore(os.path.join(self.directory, "tokens.sqlite"))):
+            self.endpoint.calls.clear()
+            first = self.credentials(store)
+            token = first.get_access_token()
+            self.assertEqual(self.credentials(store).get_access_token(), token)
+            self.assertEqual(len(self.endpoint.calls), 1)
+
+    @unittest.skipIf(os.name != "posix", "file modes are POSIX")
+    def test_file_store_is_private(self):
+        modes = []
+
+        def dump(tokens, stored):
+            # Checked while the token is written: it is never readable by others
+            modes.append(os.fstat(stored.fileno()).st_mode & 0o777)
+        with mock.patch("deezerpy.auth.json.dump", dump):
+            FileTokenStore(os.path.join(self.directory, "tokens.json")).save("123", "token", None)
+        self.assertEqual(modes, [0o600])
+
+    def test_client_uses_credentials(self):
+        transport = FakeTransport({"user/me": {"id": 5}})
+        dz = Deezer(credentials_manager=self.credentials(), transport=transport, rate_limiter=False)
+        self.assertEqual(dz.get_me(), {"id": 5})
+        self.assertEqual(self.endpoint.calls, ["code"])
@@ -0,0 +1,44 @@
+import asyncio
+import unittest
+
+from deezerpy import AsyncDeezer, Deezer, DeezerException, FakeTransport
+from deezerpy.deezerpy import MAX_SONGS_LENGTH
+
+
+def playlist_tracks(method, path, params):
+    if "13" in params["songs"].split(","):
+        return {"error": {"type": "DataException", "message": "no data", "code": 800}}
+    return True
+
+
+class TestBatchWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport({"playlist/908622995/tracks": playlist_tracks})
+        self.dz = Deezer(auth="token", transport=self.transport, rate_limiter=False)
+
+    def test_add_in_chunks(self):
+        results = self.dz.add_tracks_playlist("908622995", range(100, 1100), chunk_size=300)
+        self.assertEqual([len(result.tracks) for result in results], [300, 300, 300, 100])
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual([method for method, _, _ in self.transport.requests], ["POST"] * 4)
+        self.assertEqual(self.transport.requests[0][2]["songs"].split(",")[:2], ["100", "101"])
+
+    def test_chunks_fit_in_url(self):
+        ids = [str(10 ** 9 + i) for i in range(2000)]
+        for result in self.dz.remove_tracks_playlist("908622995", ids, chunk_size=2000, max_workers=4):
+            self.assertLessEqual(len(result.tracks) * 13, MAX_SONGS_LENGTH)
+        sent = [track for _, _, params in self.transport.requests for track in params["songs"].split(",")]
+        self.assertEqual(sorted(sent), ids)
+
+    def test_urls_and_failures(self):
+        results = self.dz.add_tracks_playlist("https://www.deezer.com/en/playlist/908622995",
+                                              ["https://www.deezer.com/en/track/12", "13", "14"], chunk_size=1)
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertIsInstance(results[1].result, DeezerException)
+
+    def test_async_batch(self):
+        async def main():
+            async with AsyncDeezer(auth="token", transport=self.transport) as dz:
+                return await dz.add_tracks_playlist("908622995", range(10), chunk_size=3, max_workers=2)
+        self.assertEqual(len(asyncio.run(main())), 4)
@@ -0,0 +1,55 @@
+import asyncio
+import random
+import time
+import unittest
+
+from deezerpy import Deezer, AsyncDeezer, DeezerException, FakeTransport
+
+
+def entity(method, path, params):
+    time.sleep(random.random() / 100)
+    kind, id = path.split("/")
+    if id == "-1":
+        raise ConnectionError("connection reset")
+    return {"id": int(id), "type": kind}
+
+
+# Every entity answers, except ID 0 which has no route and gets Deezer's 'no data' error
+ROUTES = {f"{kind}/{id}": entity for kind in ("track", "album", "artist") for id in range(-1, 60) if id != 0}
+
+
+class TestBulkLookups(unittest.TestCase):
+
+    def setUp(self):
+        self.dz = Deezer(transport=FakeTransport(ROUTES))
+
+    def test_results_in_input_order(self):
+        ids = [str(i) for i in range(1, 60)]
+        tracks = self.dz.get_tracks(ids, max_workers=4)
+        self.assertEqual([track["id"] for track in tracks], list(range(1, 60)))
+
+    def test_urls_are_parsed(self):
+        albums = self.dz.get_albums(["https://www.deezer.com/en/album/12", 13])
+        self.assertEqual([album["id"] for album in albums], [12, 13])
+
+    def test_failures_are_returned(self):
+        artists = self.dz.get_artists(["1", "0", "-1", "4"])
+        self.assertEqual(artists[0]["id"], 1)
+        self.assertIsInstance(artists[1], DeezerException)
+        self.assertEqual(artists[1].code, 800)
+        self.assertIsInstance(artists[2], DeezerException)
+        self.assertEqual(artists[2].type, "ConnectionError")
+        self.assertEqual(artists[3]["id"], 4)
+
+    def test_iter_yields_every_position(self):
+        positions = sorted(position for position, _ in self.dz.iter_tracks(iter(range(1, 30)), max_workers=3))
+        self.assertEqual(positions, list(range(29)))
+
+    def test_async_bulk(self):
+        async def main():
+            async with AsyncDeezer(transport=FakeTransport(ROUTES)) as dz:
+                return await dz.get_tracks(["3", "0", "1"], max_workers=2)
+        tracks = asyncio.run(main())
+        self.assertEqual(tracks[0]["id"], 3)
+        self.assertIsInstance(tracks[1], DeezerException)
+        self.assertEqual(tracks[2]["id"], 1)
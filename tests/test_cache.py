@@ -0,0 +1,129 @@
+import os
+import tempfile
+import time
+import unittest
+
+from deezerpy import Deezer, FakeTransport, ResponseCache, SQLiteCache
+from deezerpy.transport import Response
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_key_is_normalized(self):
+        cache = ResponseCache()
+        self.assertEqual(cache.key("https://api.deezer.com/album/1/"), cache.key("https://api.deezer.com/album/1"))
+        self.assertEqual(cache.key("https://api.deezer.com/search?q=a&index=25"),
+                         cache.key("https://api.deezer.com/search?index=25&q=a"))
+
+    def test_key_depends_on_token(self):
+        cache = ResponseCache()
+        anonymous = cache.key("https://api.deezer.com/user/me")
+        authenticated = cache.key("https://api.deezer.com/user/me", {"access_token": "abc"})
+        self.assertNotEqual(anonymous, authenticated)
+        self.assertNotIn("abc", authenticated)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        for i in range(3):
+            cache.set(cache.key(f"album/{i}"), b"{}")
+            cache.get(cache.key("album/0"))
+        self.assertIsNotNone(cache.get(cache.key("album/0")))
+        self.assertIsNone(cache.get(cache.key("album/1")))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl(self):
+        cache = ResponseCache(ttls={"chart": 0.01})
+        cache.set(cache.key("chart/0/tracks"), b"{}")
+        cache.set(cache.key("user/me/tracks"), b"{}")
+        time.sleep(0.02)
+        self.assertIsNone(cache.get(cache.key("chart/0/tracks")))
+        self.assertIsNone(cache.get(cache.key("user/me/tracks")))
+        self.assertEqual(len(cache), 0)
+
+
+class TestClientCache(unittest.TestCase):
+
+    def setUp(self):
+        numbered = lambda method, path, params: {"id": len(self.transport.requests)}
+        self.transport = FakeTransport({"album/12": numbered, "playlist/5/tracks": numbered})
+        self.cache = ResponseCache()
+        self.dz = Deezer(auth="token", transport=self.transport, cache=self.cache)
+
+    def test_repeated_get_is_served_from_cache(self):
+        first = self.dz.get_album("12")
+        second = self.dz.get_album("https://www.deezer.com/en/album/12")
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.transport.requests), 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_errors_are_not_cached(self):
+        self.dz.get_album("0")
+        self.dz.get_album("0")
+        self.assertEqual(len(self.transport.requests), 2)
+
+    def test_writes_invalidate_playlist(self):
+        self.cache.ttls["playlist"] = 60
+        self.dz.get_playlist("5", "tracks")
+        self.dz.add_track_playlist("5", "7")
+        self.dz.get_playlist("5", "tracks")
+        self.assertEqual([method for method, _, _ in self.transport.requests], ["GET", "POST", "GET"])
+
+
+class RevalidatingTransport(FakeTransport):
+
+    def request(self, method, url, params=None, headers=None):
+        self.requests.append((method, url, params))
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return Response(304, {}, b"")
+        return Response(200, {"ETag": '"v1"'}, b'{"id": 1, "title": "Discovery"}')
+
+
+class TestSQLiteCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_survives_restarts(self):
+        cache = SQLiteCache(self.path)
+        cache.set(cache.key("album/1"), b'{"id": 1}')
+        cache.close()
+        self.assertEqual(SQLiteCache(self.path).get(cache.key("album/1")), b'{"id": 1}')
+
+    def test_expired_entries_are_missed(self):
+        cache = SQLiteCache(self.path, ttls={"album": 0.01})
+        cache.set(cache.key("album/1"), b"{}")
+        time.sleep(0.02)
+        self.assertIsNone(cache.get(cache.key("album/1")))
+
+    def test_size_eviction(self):
+        cache = SQLiteCache(self.path, max_size=2000, compression_level=0)
+        for i in range(10):
+            cache.set(cache.key(f"album/{i}"), os.urandom(500))
+        cache.evict()
+        self.assertLess(len(cache), 10)
+        self.assertIsNotNone(cache.get(cache.key("album/9")))
+        self.assertGreater(cache.stats()["evictions"], 0)
+
+    def test_invalidate_prefix(self):
+        cache = SQLiteCache(self.path)
+        cache.set(cache.key("playlist/5"), b"{}")
+        cache.set(cache.key("playlist/5/tracks"), b"{}")
+        cache.set(cache.key("playlist/55"), b"{}")
+        cache.invalidate(cache.key("playlist/5"))
+        self.assertEqual(len(cache), 1)
+
+    def test_revalidation(self):
+        transport = RevalidatingTransport()
+        cache = SQLiteCache(self.path, ttls={"album": 0.01})
+        dz = Deezer(transport=transport, cache=cache)
+        self.assertEqual(dz.get_album("1")["title"], "Discovery")
+        time.sleep(0.02)
+        self.assertEqual(dz.get_album("1")["title"], "Discovery")
+        self.assertEqual(len(transport.requests), 2)
+        self.assertEqual(cache.stats()["revalidations"], 1)
+        self.assertEqual(dz.get_album("1")["title"], "Discovery")
+        self.assertEqual(len(transport.requests), 2)
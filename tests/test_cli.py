@@ -0,0 +1,79 @@
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from benchmarks.server import FakeDeezerServer
+from deezerpy.__main__ import main
+
+
+class TestCli(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeDeezerServer()
+        cls.server.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.__exit__(None, None, None)
+
+    def run_cli(self, argv, stdin=""):
+        output = io.StringIO()
+        with mock.patch.object(sys, "stdin", io.StringIO(stdin)), redirect_stdout(output):
+            status = main(argv + ["--base-url", self.server.url])
+        return status, [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_stdin_in_order(self):
+        ids = "\n".join(str(id) for id in range(1, 41))
+        status, lines = self.run_cli(["track", "--workers", "6"], ids + "\n\n# comment\n")
+        self.assertEqual(status, 0)
+        self.assertEqual([line["result"]["id"] for line in lines], list(range(1, 41)))
+        self.assertEqual([line["line"] for line in lines], list(range(40)))
+
+    def test_sub_method_files_and_errors(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "albums.txt")
+        with open(path, "w") as ids:
+            ids.write("https://www.deezer.com/fr/album/302127?utm_source=x\n0\nhttps://www.deezer.com/track/1\n")
+        status, lines = self.run_cli(["album", "tracks", "--all", "-i", path])
+        self.assertEqual(status, 1)
+        self.assertEqual(len(lines[0]["result"]["data"]), lines[0]["result"]["total"])
+        self.assertEqual(lines[1]["error"]["code"], 800)
+        self.assertEqual(lines[2]["error"]["type"], "ResolveError")
+
+    def test_network_errors_are_written(self):
+        output = io.StringIO()
+        with mock.patch.object(sys, "stdin", io.StringIO("1\n2\n")), redirect_stdout(output):
+            status = main(["track", "--base-url", "http://127.0.0.1:1/"])
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(status, 1)
+        self.assertEqual([line["error"]["type"] for line in lines], ["ConnectionError"] * 2)
+
+    def test_offset(self):
+        status, lines = self.run_cli(["artist", "--offset", "2"], "1\n2\n3\n4\n")
+        self.assertEqual([(line["line"], line["input"]) for line in lines], [(2, "3"), (3, "4")])
+
+    def test_synchronous_client_skips_async_packages(self):
+        code = "import sys; from deezerpy.deezerpy import Deezer; Deezer(); " \
+               "print(sorted({'asyncio', 'httpx', 'h2'} & set(sys.modules)))"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "[]")
+
+    def test_submodules_are_reachable_from_the_package(self):
+        code = "import deezerpy; print(deezerpy.deezerpy.Deezer.__name__, deezerpy.cache.SearchCache.__name__, " \
+               "hasattr(deezerpy, 'missing'))"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.split(), ["Deezer", "SearchCache", "False"])
+
+    def test_usage_errors(self):
+        with self.assertRaises(SystemExit), redirect_stdout(io.StringIO()), \
+                mock.patch.object(sys, "stderr", io.StringIO()):
+            main(["track", "top"])
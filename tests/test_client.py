@@ -1,9 +1,16 @@
+import os
 import unittest
-from deezerpy import deezerpy
+from deezerpy import deezerpy, CassetteTransport
+
+# Set DEEZER_CASSETTE to the path of a cassette to run the tests offline from recorded
+# responses, and DEEZER_CASSETTE_MODE=once to record the missing ones from the live API
+CASSETTE = os.environ.get("DEEZER_CASSETTE")
 
 
 class TestDeezerClient(unittest.TestCase):
 
+    transport = None
+
     # Data to test
 
     # ----------- Albums ------------------------
@@ -22,9 +29,19 @@ class TestDeezerClient(unittest.TestCase):
     iremember_track_url = "https://www.deezer.com/en/track/3582295"
     ghostsnstuff_track_id = "89844257"
 
+    @classmethod
+    def setUpClass(cls):
+        if CASSETTE:
+            cls.transport = CassetteTransport(CASSETTE, mode=os.environ.get("DEEZER_CASSETTE_MODE", "replay"))
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.transport:
+            cls.transport.close()
+
     def setUp(self):
-        self.dz = deezerpy.Deezer()
-        self.auth_dez = deezerpy.Deezer(auth="Your access token here")
+        self.dz = deezerpy.Deezer(transport=self.transport)
+        self.auth_dez = deezerpy.Deezer(auth="Your access token here", transport=self.transport)
 
     # ----------- Albums Tests -------------------
 
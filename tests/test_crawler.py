@@ -0,0 +1,108 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from deezerpy import CatalogCrawler, Deezer, FakeTransport
+from deezerpy.crawler import Frontier, IdSet
+
+ARTISTS = 40
+
+
+def catalog(method, path, params):
+    _, id, *rest = path.split("/")
+    id = int(id)
+    method = rest[0] if rest else ""
+    if path.startswith("album/"):
+        return {"data": [{"id": id * 10 + i, "title": f"track {id * 10 + i}"} for i in range(3)], "total": 3}
+    if method == "":
+        return {"id": id, "name": f"artist {id}"}
+    if method == "related":
+        return {"data": [{"id": i, "name": f"artist {i}"} for i in (id * 2 + 1, id * 2 + 2) if i < ARTISTS]}
+    if method == "albums":
+        return {"data": [{"id": 1000 + id, "title": f"album {id}"}], "total": 1}
+    # top tracks are also tracks of the first related album, to check deduplication
+    return {"data": [{"id": (1000 + id) * 10, "title": f"track {(1000 + id) * 10}"}, {"id": 7, "title": "hit"}]}
+
+
+class TestIdSet(unittest.TestCase):
+
+    def test_add_and_grow(self):
+        ids = IdSet(capacity=4)
+        self.assertTrue(all(ids.add(i * 7919) for i in range(1000)))
+        self.assertFalse(ids.add(7919))
+        self.assertIn(0, ids)
+        self.assertNotIn(1, ids)
+        copy = IdSet.from_bytes(ids.to_bytes(), len(ids))
+        self.assertIn(999 * 7919, copy)
+        self.assertEqual(len(copy), 1000)
+
+
+class TestFrontier(unittest.TestCase):
+
+    def test_order(self):
+        frontier = Frontier()
+        entries = [(1, "artist", 5), (0, "artist", 1), (1, "album", 9), (0, "artist", 2), (1, "artist", 6)]
+        for depth, kind, id in entries:
+            frontier.push(depth, kind, id)
+        self.assertEqual([frontier.pop() for _ in range(5)], [(0, "artist", 1), (0, "artist", 2), (1, "album", 9),
+                                                              (1, "artist", 5), (1, "artist", 6)])
+        self.assertEqual(len(frontier), 0)
+
+    def test_write_and_read(self):
+        frontier = Frontier()
+        for id in range(10000):
+            frontier.push(id % 3, "artist", id)
+        for _ in range(5000):
+            frontier.pop()
+        data = io.BytesIO()
+        frontier.write(data)
+        copy = Frontier.from_bytes(frontier.layout(), data.getvalue())
+        self.assertEqual(len(copy), 5000)
+        self.assertEqual([copy.pop() for _ in range(5000)], [frontier.pop() for _ in range(5000)])
+
+
+class TestCatalogCrawler(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport()
+        for path in ["artist/{id}", "artist/{id}/related", "artist/{id}/albums", "artist/{id}/top", "album/{id}/tracks"]:
+            for id in list(range(ARTISTS)) + list(range(1000, 1000 + ARTISTS)):
+                self.transport.add_route(path.format(id=id), catalog)
+        self.dz = Deezer(transport=self.transport, rate_limiter=False)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_full_crawl(self):
+        found = list(CatalogCrawler(self.dz, ["0"], max_workers=4).run())
+        self.assertEqual(len(found), len(set((kind, item["id"]) for kind, item in found)))
+        kinds = [kind for kind, _ in found]
+        self.assertEqual(kinds.count("artist"), ARTISTS)
+        self.assertEqual(kinds.count("album"), ARTISTS)
+        self.assertEqual(kinds.count("track"), ARTISTS * 3 + 1)
+        gets = [path for _, path, _ in self.transport.requests]
+        self.assertEqual(len(gets), len(set(gets)))
+
+    def test_depth_and_budget(self):
+        found = list(CatalogCrawler(self.dz, ["https://www.deezer.com/artist/0"], max_depth=1).run())
+        self.assertEqual(sorted(item["id"] for kind, item in found if kind == "artist"), [0, 1, 2])
+        crawler = CatalogCrawler(self.dz, ["0"], max_entities=10, max_workers=1)
+        self.assertLess(len(list(crawler.run())), 20)
+        self.assertGreater(crawler.stats()["frontier"], 0)
+
+    def test_visited_set_grows_with_the_crawl(self):
+        crawler = CatalogCrawler(self.dz, ["0"], max_entities=10 ** 8)
+        self.assertLessEqual(len(crawler._visited.to_bytes()), 8 * 2048)
+
+    def test_resume(self):
+        checkpoint = os.path.join(self.directory, "crawl")
+        crawler = CatalogCrawler(self.dz, ["0"], checkpoint, checkpoint_every=3)
+        first = []
+        for kind, item in crawler.run():
+            first.append((kind, item["id"]))
+            if len(first) == 50:
+                break
+        rest = [(kind, item["id"]) for kind, item in CatalogCrawler(self.dz, [], checkpoint).run()]
+        self.assertEqual(len(first) + len(rest), ARTISTS * 5 + 1)
+        self.assertEqual(set(first) & set(rest), set())
@@ -0,0 +1,68 @@
+import json
+import unittest
+
+from deezerpy import Deezer, DeezerException, FakeTransport
+from deezerpy.decoding import StreamingDecoder, default_decoder, orjson
+
+PAGES = {
+    "playlist/1/tracks": {"data": [{"id": i, "title": f"Track \"{i}\" [live]"} for i in range(30)], "total": 45,
+                          "next": "https://api.deezer.com/playlist/1/tracks?index=30"},
+    "playlist/1/tracks?index=30": {"data": [{"id": i, "title": f"Track {i}"} for i in range(30, 45)], "total": 45},
+    "playlist/2/tracks": {"error": {"type": "DataException", "message": "no data", "code": 800}},
+}
+
+
+class ChunkedTransport(FakeTransport):
+    """
+    Streams the bodies in chunks of 7 bytes, to cut tokens and strings
+    """
+
+    def stream(self, method, url, params=None):
+        content = self.request(method, url, params).content
+        for start in range(0, len(content), 7):
+            yield content[start:start + 7]
+
+
+def decode_in_chunks(document, size):
+    decoder = StreamingDecoder()
+    items = []
+    for start in range(0, len(document), size):
+        items.extend(decoder.feed(document[start:start + size]))
+    decoder.close()
+    return items, decoder.meta
+
+
+class TestStreamingDecoder(unittest.TestCase):
+
+    def test_items_and_meta(self):
+        page = {"total": 2, "data": [{"a": "}]\\"}, [1, 2], "x", 3.5, None], "next": None}
+        for size in (1, 3, 1000):
+            items, meta = decode_in_chunks(json.dumps(page).encode(), size)
+            self.assertEqual(items, page["data"])
+            self.assertEqual(meta, {"total": 2, "next": None})
+
+    def test_incomplete_document(self):
+        decoder = StreamingDecoder()
+        list(decoder.feed(b'{"data": [{"id": 1}'))
+        with self.assertRaises(ValueError):
+            decoder.close()
+
+    def test_default_decoder(self):
+        self.assertIs(default_decoder(), orjson.loads if orjson else json.loads)
+
+
+class TestClientStream(unittest.TestCase):
+
+    def setUp(self):
+        self.dz = Deezer(transport=ChunkedTransport(PAGES), rate_limiter=False)
+
+    def test_stream_follows_pages(self):
+        ids = [track["id"] for track in self.dz.stream("playlist/1/tracks")]
+        self.assertEqual(ids, list(range(45)))
+
+    def test_stream_max_items(self):
+        self.assertEqual(len(list(self.dz.stream("playlist/1/tracks", max_items=10))), 10)
+
+    def test_stream_error(self):
+        with self.assertRaises(DeezerException):
+            list(self.dz.stream("playlist/2/tracks"))
@@ -0,0 +1,81 @@
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from deezerpy import Deezer, DeezerException, FakeTransport, LibraryExport
+
+
+class FakeLibrary:
+
+    def __init__(self, sizes, page_size=10):
+        self.sizes = sizes
+        self.page_size = page_size
+        self.failing = None
+
+    def __call__(self, method, path, params):
+        index = int(params.get("index", 0))
+        if self.failing is not None and index >= self.failing:
+            return {"error": {"type": "Exception", "message": "Quota limit exceeded", "code": 800}}
+        total = self.sizes[path]
+        kind = "track" if path.endswith("tracks") else path.split("/")[-1][:-1]
+        data = [{"id": i, "title": f"{kind} {i}", "artist": {"id": i % 3, "name": f"artist {i % 3}"}}
+                for i in range(index, min(index + self.page_size, total))]
+        page = {"data": data, "total": total}
+        if index + self.page_size < total:
+            page["next"] = f"https://api.deezer.com/{path}?index={index + self.page_size}"
+        return page
+
+
+class TestLibraryExport(unittest.TestCase):
+
+    def setUp(self):
+        self.library = FakeLibrary({"user/me/tracks": 35, "user/me/albums": 5, "user/me/artists": 0,
+                                    "user/me/playlists": 2, "playlist/0/tracks": 12, "playlist/1/tracks": 3})
+        self.transport = FakeTransport({path: self.library for path in self.library.sizes})
+        self.dz = Deezer(auth="token", transport=self.transport, rate_limiter=False)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def read(self, export, name):
+        opener = gzip.open if export.compress else open
+        with opener(export.path(name), "rt", encoding="utf-8", newline="") as exported:
+            return exported.read()
+
+    def test_ndjson(self):
+        export = LibraryExport(self.dz, self.directory, checkpoint_every=7)
+        counts = export.run()
+        self.assertEqual(counts, {"tracks": 35, "albums": 5, "artists": 0, "playlists": 2, "playlist_tracks": 15})
+        rows = [json.loads(line) for line in self.read(export, "playlist_tracks").splitlines()]
+        self.assertEqual([row["playlist_id"] for row in rows], [0] * 12 + [1] * 3)
+        self.assertEqual(rows[0]["artist"]["name"], "artist 0")
+
+    def test_csv_gzip(self):
+        export = LibraryExport(self.dz, self.directory, format="csv", compress=True, checkpoint_every=4)
+        export.run()
+        rows = list(csv.DictReader(io.StringIO(self.read(export, "tracks"))))
+        self.assertEqual(len(rows), 35)
+        self.assertEqual(rows[34]["artist.name"], "artist 1")
+
+    def test_resume(self):
+        self.library.failing = 20
+        export = LibraryExport(self.dz, self.directory, format="csv", compress=True, checkpoint_every=4)
+        with self.assertRaises(DeezerException):
+            export.run()
+        self.library.failing = None
+        self.transport.requests.clear()
+        LibraryExport(self.dz, self.directory, format="csv", compress=True).run()
+        self.assertIn(("GET", "user/me/tracks", {"index": "20"}), self.transport.requests)
+        rows = list(csv.DictReader(io.StringIO(self.read(export, "tracks"))))
+        self.assertEqual([int(row["id"]) for row in rows], list(range(35)))
+
+    def test_done_is_not_exported_again(self):
+        LibraryExport(self.dz, self.directory, collections=["albums"]).run()
+        self.transport.requests.clear()
+        LibraryExport(self.dz, self.directory, collections=["albums"]).run()
+        self.assertEqual(self.transport.requests, [])
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "checkpoint.json")))
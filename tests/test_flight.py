@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import httpx
+
+from deezerpy import Deezer, AsyncDeezer, FakeTransport
+from deezerpy.flight import SingleFlight
+
+
+def slow_artist(method, path, params):
+    time.sleep(0.05)
+    return {"id": 27, "name": "Daft Punk"}
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def run_threads(self, target, count=10):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_identical_gets_are_coalesced(self):
+        transport = FakeTransport({"artist/27": slow_artist})
+        dz = Deezer(transport=transport)
+        results = self.run_threads(lambda: dz.get_artist("27"))
+        self.assertEqual(len(transport.requests), 1)
+        self.assertTrue(all(result["name"] == "Daft Punk" for result in results))
+
+    def test_coalescing_can_be_disabled(self):
+        transport = FakeTransport({"artist/27": slow_artist})
+        dz = Deezer(transport=transport, coalesce=False)
+        self.run_threads(lambda: dz.get_artist("27"), count=3)
+        self.assertEqual(len(transport.requests), 3)
+
+    def test_errors_are_shared(self):
+        flight = SingleFlight()
+        errors = []
+
+        def failing():
+            time.sleep(0.05)
+            raise ConnectionError("connection reset")
+
+        def call():
+            try:
+                flight.do("key", failing)
+            except ConnectionError as error:
+                errors.append(error)
+        self.run_threads(call, count=5)
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(len(set(map(id, errors))), 1)
+
+    def test_async_coalescing(self):
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"id": 27})
+
+        async def main():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            async with AsyncDeezer(client=client) as dz:
+                return await asyncio.gather(*(dz.get_artist("27") for _ in range(10)))
+        results = asyncio.run(main())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 10)
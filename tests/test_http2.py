@@ -0,0 +1,129 @@
+import asyncio
+import json
+import socket
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from deezerpy import AsyncDeezer, Deezer, HTTP2Transport
+
+try:
+    import httpx
+    import h2.config
+    import h2.connection
+    import h2.events
+except ImportError:
+    httpx = None
+
+
+class H2Server:
+    """
+    Cleartext HTTP/2 server answering {"id": ...} to 'GET /album/<id>', counting the
+    connections it accepts. Closes a connection with a GOAWAY after max_streams requests.
+    """
+
+    def __init__(self, max_streams=None):
+        self.max_streams = max_streams
+        self.connections = 0
+        self._socket = socket.create_server(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self._socket.getsockname()[1]}/"
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._socket.close()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        h2_connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        h2_connection.initiate_connection()
+        connection.sendall(h2_connection.data_to_send())
+        served = 0
+        with connection:
+            while True:
+                data = connection.recv(65536)
+                if not data:
+                    return
+                for event in h2_connection.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        path = dict(event.headers)[b":path"].decode().split("?")[0]
+                        body = json.dumps({"id": int(path.strip("/").rsplit("/", 1)[1])}).encode()
+                        h2_connection.send_headers(event.stream_id, [(":status", "200"),
+                                                                     ("content-type", "application/json"),
+                                                                     ("content-length", str(len(body)))])
+                        h2_connection.send_data(event.stream_id, body, end_stream=True)
+                        served += 1
+                connection.sendall(h2_connection.data_to_send())
+                if self.max_streams and served >= self.max_streams:
+                    h2_connection.close_connection()
+                    connection.sendall(h2_connection.data_to_send())
+                    return
+
+
+@unittest.skipIf(httpx is None, "requires httpx and h2")
+class TestHTTP2Transport(unittest.TestCase):
+
+    def test_concurrent_requests_share_one_connection(self):
+        with H2Server() as server:
+            transport = HTTP2Transport(max_connections=1, http1=False)
+            dz = Deezer(transport=transport, base_url=server.url, rate_limiter=False)
+            with ThreadPoolExecutor(max_workers=20) as executor:
+                albums = list(executor.map(dz.get_album, range(1, 101)))
+            transport.close()
+        self.assertEqual([album["id"] for album in albums], list(range(1, 101)))
+        self.assertEqual(server.connections, 1)
+
+    def test_async_client(self):
+        async def main(url):
+            async with AsyncDeezer(transport=HTTP2Transport(max_connections=1, http1=False), base_url=url,
+                                   rate_limiter=False) as dz:
+                return await asyncio.gather(*(dz.get_album(id) for id in range(1, 51)))
+
+        with H2Server() as server:
+            albums = asyncio.run(main(server.url))
+        self.assertEqual([album["id"] for album in albums], list(range(1, 51)))
+        self.assertEqual(server.connections, 1)
+
+    def test_closed_connection_is_replaced(self):
+        with H2Server(max_streams=3) as server:
+            transport = HTTP2Transport(max_connections=1, http1=False)
+            dz = Deezer(transport=transport, base_url=server.url, rate_limiter=False)
+            albums = [dz.get_album(id) for id in range(1, 11)]
+            transport.close()
+        self.assertEqual([album["id"] for album in albums], list(range(1, 11)))
+        self.assertGreaterEqual(server.connections, 4)
+
+    def test_get_sent_again_after_broken_connection(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            if len(calls) == 1:
+                raise httpx.RemoteProtocolError("Server disconnected without sending a response.")
+            return httpx.Response(200, json={"id": 302127})
+
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        transport = HTTP2Transport(client=client, async_client=httpx.AsyncClient())
+        dz = Deezer(transport=transport, rate_limiter=False)
+        self.assertEqual(dz.get_album("302127")["id"], 302127)
+        self.assertEqual(transport.reconnects, 1)
+
+        calls.clear()
+        with self.assertRaises(httpx.RemoteProtocolError):
+            transport.request("POST", "https://api.deezer.com/user/me/albums")
+        self.assertEqual(calls, ["POST"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from deezerpy import SearchIndex
+from deezerpy.models import parse
+
+TRACKS = [
+    {"id": 3135556, "type": "track", "title": "Harder, Better, Faster, Stronger", "duration": 224, "bpm": 123.4,
+     "rank": 900, "artist": {"id": 27, "name": "Daft Punk"}, "album": {"id": 302127, "title": "Discovery"}},
+    {"id": 3135553, "type": "track", "title": "One More Time", "duration": 320, "bpm": 122.7, "rank": 950,
+     "artist": {"id": 27, "name": "Daft Punk"}, "album": {"id": 302127, "title": "Discovery"}},
+    {"id": 1109731, "type": "track", "title": "Crazy in Love", "duration": 236, "bpm": 99.2, "rank": 800,
+     "artist": {"id": 145, "name": "Beyoncé"}, "album": {"id": 119606, "title": "Dangerously In Love"}},
+]
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.update({"data": TRACKS})
+        self.index.add({"id": 302127, "title": "Discovery", "label": "Parlophone", "duration": 3660,
+                        "artist": {"id": 27, "name": "Daft Punk"}}, kind="album")
+        self.index.add(parse({"id": 27, "type": "artist", "name": "Daft Punk"}))
+
+    def ids(self, *args, **kwargs):
+        return [(item["type"], item["id"]) for item in self.index.search(*args, **kwargs)]
+
+    def test_normalized_words(self):
+        self.assertEqual(self.ids("BEYONCE crazy"), [("track", 1109731)])
+        self.assertEqual(self.ids("love", type="track"), [("track", 1109731)])
+        self.assertEqual(self.ids("daft punk", type="artist"), [("artist", 27)])
+
+    def test_prefix_and_fuzzy(self):
+        self.assertEqual(self.ids("one mo"), [("track", 3135553)])
+        self.assertEqual(self.ids("one mo", prefix=False), [])
+        self.assertEqual(self.ids("harder betetr"), [])
+        self.assertEqual(self.ids("hrder beter", fuzzy=True), [("track", 3135556)])
+
+    def test_filters(self):
+        self.assertEqual(self.ids(artist="daft", type="track"), [("track", 3135553), ("track", 3135556)])
+        self.assertEqual(self.ids(artist="daft punk", dur_max=300), [("track", 3135556)])
+        self.assertEqual(self.ids(bpm_min=100, bpm_max=123), [("track", 3135553)])
+        self.assertEqual(self.ids(label="parlophone"), [("album", 302127)])
+        self.assertEqual(self.ids("discovery", album="discovery", track="time"), [("track", 3135553)])
+        with self.assertRaises(ValueError):
+            self.index.search(year_min=2000)
+
+    def test_replace(self):
+        self.index.add(dict(TRACKS[2], title="Halo"))
+        self.assertEqual(self.ids("crazy"), [])
+        self.assertEqual(self.ids("halo"), [("track", 1109731)])
+        self.assertEqual(len(self.index), 5)
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "index.jsonl.gz")
+        self.index.save(path)
+        loaded = SearchIndex.load(path)
+        self.assertEqual(len(loaded), 5)
+        self.assertEqual(loaded.search(label="parlo")[0]["title"], "Discovery")
+
+    def test_query_time(self):
+        for i in range(20000):
+            self.index.add({"id": i, "type": "track", "title": f"song number {i}", "duration": i % 400,
+                            "artist": {"id": i % 100, "name": f"artist {i % 100}"}})
+        self.index.search("song 1234")
+        start = time.perf_counter()
+        self.assertEqual(self.ids("number 12345"), [("track", 12345)])
+        self.assertLess(time.perf_counter() - start, 0.05)
@@ -0,0 +1,60 @@
+import unittest
+
+from deezerpy import Deezer, FakeTransport, MetricsAggregator, ResponseCache
+from deezerpy.metrics import Histogram, endpoint_template
+
+# album/0 has no route and answers with Deezer's 'no data' error
+ROUTES = {"album/1": {"id": 1}}
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_endpoint_template(self):
+        self.assertEqual(endpoint_template("https://api.deezer.com/album/302127/tracks?index=25"), "album/{id}/tracks")
+        self.assertEqual(endpoint_template("https://api.deezer.com/user/me/tracks"), "user/me/tracks")
+        self.assertEqual(endpoint_template("https://api.deezer.com/search/track?q=daft"), "search/track")
+        self.assertEqual(endpoint_template("https://api.deezer.com/chart/0/tracks"), "chart/0/tracks")
+        self.assertEqual(endpoint_template("https://api.deezer.com/user/5/flow"), "user/{id}/flow")
+
+    def test_histogram_percentiles(self):
+        histogram = Histogram()
+        for millisecond in range(1, 101):
+            histogram.record(millisecond / 1000)
+        self.assertAlmostEqual(histogram.percentile(50), 0.05, delta=0.005)
+        self.assertAlmostEqual(histogram.percentile(99), 0.099, delta=0.01)
+        self.assertIsNone(Histogram().percentile(50))
+
+    def test_aggregator(self):
+        metrics = MetricsAggregator()
+        events = []
+        dz = Deezer(transport=FakeTransport(ROUTES), cache=ResponseCache(), hooks=[metrics, events.append])
+        dz.get_album("1")
+        dz.get_album("1")
+        dz.get_album("0")
+        snapshot = metrics.snapshot()["GET album/{id}"]
+        self.assertEqual(snapshot["count"], 3)
+        self.assertEqual(snapshot["errors"], 1)
+        self.assertEqual(snapshot["cache_hits"], 1)
+        self.assertEqual([event.cache for event in events], ["miss", "hit", "miss"])
+        self.assertEqual(events[2].error_code, 800)
+        self.assertGreater(events[0].bytes, 0)
+
+    def test_transport_failures_are_reported(self):
+        def reset(method, path, params):
+            raise ConnectionError("connection reset")
+        metrics = MetricsAggregator()
+        events = []
+        dz = Deezer(transport=FakeTransport({"album/1": reset}), hooks=[metrics, events.append])
+        with self.assertRaises(ConnectionError):
+            dz.get_album("1")
+        self.assertEqual(len(events), 1)
+        self.assertIsNone(events[0].status)
+        self.assertEqual(events[0].exception, "ConnectionError")
+        self.assertEqual(metrics.snapshot()["GET album/{id}"]["errors"], 1)
+
+    def test_failing_hook_does_not_break_calls(self):
+        def hook(event):
+            raise RuntimeError("broken hook")
+        dz = Deezer(transport=FakeTransport(ROUTES), hooks=[hook])
+        dz._warn_message = lambda message: None
+        self.assertEqual(dz.get_album("1")["id"], 1)
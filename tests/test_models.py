@@ -0,0 +1,66 @@
+import unittest
+
+from deezerpy import Deezer, FakeTransport, Track, Album, Page
+
+TRACK = {
+    "id": 3135556, "title": "Harder, Better, Faster, Stronger", "duration": 224, "bpm": 123.4, "type": "track",
+    "artist": {"id": 27, "name": "Daft Punk", "type": "artist"},
+    "album": {"id": 302127, "title": "Discovery", "type": "album"},
+    "available_countries": ["FR"],
+}
+ALBUM = {"id": 302127, "title": "Discovery", "label": "Parlophone (France)", "type": "album",
+         "artist": {"id": 27, "name": "Daft Punk", "type": "artist"}}
+TRACKS = {"data": [{"id": 3135556, "title": "Harder, Better, Faster, Stronger", "type": "track",
+                    "album": {"id": 302127, "title": "Discovery", "type": "album"}}], "total": 1}
+
+
+ROUTES = {"track/3135556": TRACK, "album/302127": ALBUM, "playlist/1/tracks": TRACKS}
+
+
+class TestModels(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport(ROUTES)
+        self.dz = Deezer(transport=self.transport, models=True)
+
+    def test_typed_entity(self):
+        track = self.dz.get_track("3135556")
+        self.assertIsInstance(track, Track)
+        self.assertEqual(track.bpm, 123.4)
+        self.assertFalse(hasattr(track, "__dict__"))
+
+    def test_nested_stub_is_resolved_on_access(self):
+        track = self.dz.get_track("3135556")
+        self.assertIsInstance(track.album, Album)
+        self.assertEqual(track.album.title, "Discovery")
+        self.assertEqual(len(self.transport.requests), 1)
+        self.assertEqual(track.album.label, "Parlophone (France)")
+        self.assertEqual(len(self.transport.requests), 2)
+        self.assertEqual(track.album.artist.name, "Daft Punk")
+        self.assertEqual(len(self.transport.requests), 2)
+
+    def test_membership_does_not_fetch(self):
+        track = self.dz.get_track("3135556")
+        self.assertIn("title", track.album)
+        self.assertNotIn("label", track.album)
+        self.assertIn("available_countries", track)
+        self.assertEqual(len(self.transport.requests), 1)
+
+    def test_dict_compatibility(self):
+        track = self.dz.get_track("3135556")
+        self.assertEqual(track["album"]["title"], "Discovery")
+        self.assertEqual(track["available_countries"], ["FR"])
+        self.assertEqual(track.to_dict(), TRACK)
+
+    def test_pages(self):
+        page = self.dz.get_playlist("1", "tracks")
+        self.assertIsInstance(page, Page)
+        self.assertEqual(page["total"], 1)
+        tracks = list(self.dz.paginate(page))
+        self.assertEqual(tracks[0].album.title, "Discovery")
+
+    def test_as_model(self):
+        dz = Deezer(transport=self.transport)
+        track = dz.as_model(dz.get_track("3135556"))
+        self.assertIsInstance(track, Track)
+        self.assertEqual(track.duration, 224)
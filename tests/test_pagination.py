@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+
+from deezerpy import Deezer, AsyncDeezer, DeezerException, FakeTransport
+
+TOTAL = 95
+PAGE = 25
+
+
+def page(method="GET", path="playlist/1/tracks", params=None):
+    index = int((params or {}).get("index", 0))
+    limit = int((params or {}).get("limit", PAGE))
+    body = {"data": [{"id": i} for i in range(index, min(index + limit, TOTAL))], "total": TOTAL}
+    if index + PAGE < TOTAL:
+        body["next"] = f"https://api.deezer.com/playlist/1/tracks?index={index + PAGE}"
+    return body
+
+
+# Other playlists and albums have no route and answer with Deezer's 'no data' error
+ROUTES = {"playlist/1/tracks": page}
+
+
+class TestPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport(ROUTES)
+        self.dz = Deezer(transport=self.transport)
+
+    def test_walks_every_page(self):
+        ids = [track["id"] for track in self.dz.iter_playlist_tracks("1")]
+        self.assertEqual(ids, list(range(TOTAL)))
+        self.assertEqual(len(self.transport.requests), 4)
+
+    def test_without_prefetch(self):
+        response = self.dz.get_playlist("1", "tracks")
+        ids = [track["id"] for track in self.dz.paginate(response, prefetch=False)]
+        self.assertEqual(ids, list(range(TOTAL)))
+
+    def test_max_items_stops_fetching(self):
+        ids = [track["id"] for track in self.dz.iter_playlist_tracks("1", max_items=30)]
+        self.assertEqual(ids, list(range(30)))
+        self.assertEqual(len(self.transport.requests), 2)
+
+    def test_error_is_raised(self):
+        with self.assertRaises(DeezerException):
+            list(self.dz.iter_album_tracks("2"))
+
+    def test_async_paginate(self):
+        async def main():
+            async with AsyncDeezer(transport=FakeTransport(ROUTES)) as dz:
+                return [track["id"] async for track in dz.iter_playlist_tracks("1", max_items=60)]
+        self.assertEqual(asyncio.run(main()), list(range(60)))
+
+    def test_parallel_fan_out(self):
+        ids = [track["id"] for track in self.dz.iter_playlist_tracks("1", parallel=True)]
+        self.assertEqual(ids, list(range(TOTAL)))
+        self.assertEqual(len(self.transport.requests), 4)
+
+    def test_parallel_fan_out_skips_duplicates(self):
+        first = page()
+        # The first page was fetched before two tracks were inserted at the top, so the
+        # next offset starts two tracks earlier than expected
+        first["data"] = [{"id": i} for i in range(2, PAGE + 2)]
+        ids = [track["id"] for track in self.dz.paginate(first, parallel=True, max_workers=2)]
+        self.assertEqual(ids, list(range(2, TOTAL)))
+
+    def test_parallel_max_items(self):
+        ids = [track["id"] for track in self.dz.iter_playlist_tracks("1", max_items=50, parallel=True)]
+        self.assertEqual(ids, list(range(50)))
+        self.assertEqual(len(self.transport.requests), 2)
+
+    def test_async_parallel_fan_out(self):
+        async def main():
+            async with AsyncDeezer(transport=FakeTransport(ROUTES)) as dz:
+                return [track["id"] async for track in dz.iter_playlist_tracks("1", parallel=True)]
+        self.assertEqual(asyncio.run(main()), list(range(TOTAL)))
@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from benchmarks.server import FakeDeezerServer
+from deezerpy import (CatalogCrawler, Deezer, DeezerException, ProcessPool, ResponseCache, SharedRateLimiter,
+                      SQLiteCache)
+
+
+def acquire(client, item):
+    client.rate_limiter.acquire()
+    return time.monotonic()
+
+
+class TestProcessPool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeDeezerServer()
+        cls.server.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.__exit__(None, None, None)
+
+    def test_results_in_order(self):
+        with ProcessPool(max_workers=2, rate_limiter=False, client_options={"base_url": self.server.url}) as pool:
+            tracks = list(pool.iter_tracks(range(1, 30)))
+            albums = list(pool.iter_albums(["https://www.deezer.com/album/5", 0]))
+        self.assertEqual([track["id"] for track in tracks], list(range(1, 30)))
+        self.assertEqual(albums[0]["id"], 5)
+        self.assertIsInstance(albums[1], DeezerException)
+        self.assertEqual(albums[1].code, 800)
+
+    def test_transport_errors_are_returned(self):
+        with ProcessPool(max_workers=2, rate_limiter=False, client_options={"base_url": "http://127.0.0.1:1/"}) as pool:
+            tracks = list(pool.iter_tracks([1, 2, 3]))
+        self.assertEqual([track.type for track in tracks], ["ConnectionError"] * 3)
+
+    def test_caches_in_spawned_workers(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        context = multiprocessing.get_context("spawn")
+        for cache in (ResponseCache(), SQLiteCache(os.path.join(directory, "cache.sqlite"))):
+            options = {"base_url": self.server.url, "cache": cache}
+            with ProcessPool(max_workers=1, rate_limiter=False, client_options=options, mp_context=context) as pool:
+                tracks = list(pool.iter_tracks([1, 1]))
+            self.assertEqual([track["id"] for track in tracks], [1, 1])
+        self.assertEqual(len(cache), 1)
+
+    def test_shared_budget(self):
+        limiter = SharedRateLimiter(rate=20, period=1, burst=1)
+        with ProcessPool(max_workers=3, rate_limiter=limiter) as pool:
+            times = sorted(pool.map(acquire, range(13)))
+        # 13 requests at 20 per second across all the workers need at least 0.6 seconds
+        self.assertGreaterEqual(times[-1] - times[0], 0.55)
+
+    def test_crawl(self):
+        dz = Deezer(base_url=self.server.url, rate_limiter=False)
+        expected = sorted((kind, item["id"]) for kind, item in CatalogCrawler(dz, ["1"], max_depth=1).run())
+        with ProcessPool(max_workers=2, rate_limiter=False, client_options={"base_url": self.server.url}) as pool:
+            found = sorted((kind, item["id"]) for kind, item in CatalogCrawler(dz, ["1"], max_depth=1, pool=pool).run())
+        self.assertEqual(found, expected)
@@ -0,0 +1,50 @@
+import time
+import unittest
+
+from deezerpy import Deezer, DeezerException, FakeTransport, RateLimiter
+
+QUOTA_ERROR = {"error": {"type": "Exception", "message": "Quota limit exceeded", "code": 4}}
+
+
+def quota_transport(failures):
+    """
+    Transport answering the first requests with a quota error
+    """
+    transport = FakeTransport()
+    transport.add_route("track/1", lambda method, path, params:
+                        QUOTA_ERROR if len(transport.requests) <= failures else {"id": 1})
+    return transport
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_burst_then_throttle(self):
+        limiter = RateLimiter(rate=100, period=1, burst=5)
+        waits = [limiter.reserve() for _ in range(7)]
+        self.assertEqual(waits[:5], [0.0] * 5)
+        self.assertAlmostEqual(waits[5], 0.01, places=2)
+        self.assertAlmostEqual(waits[6], 0.02, places=2)
+        self.assertEqual(limiter.stats()["throttled"], 2)
+
+    def test_acquire_sleeps(self):
+        limiter = RateLimiter(rate=50, period=1, burst=1)
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    def test_quota_errors_are_retried(self):
+        transport = quota_transport(failures=2)
+        limiter = RateLimiter()
+        dz = Deezer(transport=transport, rate_limiter=limiter, backoff=0.01)
+        self.assertEqual(dz.get_track("1")["id"], 1)
+        self.assertEqual(len(transport.requests), 3)
+        self.assertEqual(limiter.stats()["retries"], 2)
+
+    def test_retries_are_bounded(self):
+        transport = quota_transport(failures=10)
+        dz = Deezer(transport=transport, rate_limiter=False, max_retries=2, backoff=0.01)
+        error = dz.get_track("1")
+        self.assertIsInstance(error, DeezerException)
+        self.assertEqual(error.code, 4)
+        self.assertEqual(len(transport.requests), 3)
@@ -0,0 +1,92 @@
+import unittest
+
+from deezerpy import Deezer, FakeTransport, IdResolver, ResolveError
+from deezerpy.transport import Response
+
+
+class RedirectSession:
+    """
+    Stands for the requests.Session expanding short links, answering HEAD requests from a
+    dictionary of redirects
+    """
+
+    def __init__(self, redirects):
+        self.redirects = redirects
+        self.requests = []
+
+    def head(self, url, allow_redirects=True, timeout=None):
+        self.requests.append(url)
+        location = self.redirects.get(url)
+        return Response(302, {"Location": location}, b"") if location else Response(404, {}, b"")
+
+
+class TestIdResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.session = RedirectSession({"https://deezer.page.link/AbCd": "https://www.deezer.com/track/3135556?utm=x",
+                                    "https://deezer.page.link/Hop": "https://deezer.page.link/AbCd",
+                                    "https://deezer.page.link/Out": "https://example.com/"})
+        self.resolver = IdResolver(session=self.session)
+
+    def test_urls(self):
+        values = ["https://www.deezer.com/fr/track/3135556?utm_source=deezer#top", "www.deezer.com/pt-br/album/302127/",
+                  "deezer.com/show/1234", "https://api.deezer.com/artist/27", "deezer:playlist:908622995",
+                  " 3135556 ", -42, "https://www.deezer.com/en/profile/5"]
+        self.assertEqual(self.resolver.resolve_many(values), [
+            ("track", "3135556"), ("album", "302127"), ("podcast", "1234"), ("artist", "27"),
+            ("playlist", "908622995"), (None, "3135556"), (None, "-42"), ("user", "5")])
+        self.assertEqual(self.resolver.resolve("3135556", "track"), ("track", "3135556"))
+
+    def test_errors(self):
+        wrong_kind, unknown, garbage = self.resolver.resolve_many(
+            ["https://www.deezer.com/album/302127", "https://www.deezer.com/concert/1", "daft punk"], "track")
+        self.assertIsInstance(wrong_kind, ResolveError)
+        self.assertIn("Expecting 'track'", wrong_kind.msg)
+        self.assertEqual(unknown.value, "https://www.deezer.com/concert/1")
+        self.assertEqual(garbage.value, "daft punk")
+
+    def test_short_links(self):
+        results = self.resolver.resolve_many(["https://deezer.page.link/AbCd", "deezer.page.link/Hop",
+                                              "https://deezer.page.link/Out", "https://deezer.page.link/Gone",
+                                              "https://deezer.page.link/AbCd"])
+        self.assertEqual(results[:2] + results[4:], [("track", "3135556")] * 3)
+        self.assertIsInstance(results[2], ResolveError)
+        self.assertIsInstance(results[3], ResolveError)
+        self.session.requests.clear()
+        self.assertEqual(self.resolver.resolve("https://deezer.page.link/AbCd"), ("track", "3135556"))
+        self.assertEqual(self.session.requests, [])
+
+    def test_cache_eviction(self):
+        resolver = IdResolver(cache_size=1, session=self.session)
+        resolver.resolve("https://deezer.page.link/AbCd")
+        resolver.resolve("https://deezer.page.link/Hop")
+        self.session.requests.clear()
+        resolver.resolve("https://deezer.page.link/AbCd")
+        self.assertEqual(self.session.requests, ["https://deezer.page.link/AbCd"])
+
+    def test_client_accepts_website_names(self):
+        warnings = []
+        dz = Deezer(auth="token", transport=FakeTransport({"user/me/podcasts": True, "user/me/followings": True}),
+                    rate_limiter=False)
+        dz._warn_message = warnings.append
+        dz.follow_podcast("me", "https://www.deezer.com/fr/show/1234")
+        dz.unfollow_user("https://www.deezer.com/en/profile/5")
+        self.assertEqual(warnings, [])
+        self.assertEqual(dz._get_id("show", "deezer:podcast:1234"), "1234")
+
+    def test_client_ids(self):
+        transport = FakeTransport({"track/3135556": {"id": 3135556}})
+        dz = Deezer(transport=transport, rate_limiter=False)
+        dz.resolver = self.resolver
+        for value in ("https://www.deezer.com/fr/track/3135556?utm_source=deezer",
+                      dz.resolver.resolve("https://deezer.page.link/AbCd", "track")[1]):
+            self.assertEqual(dz.get_track(value), {"id": 3135556})
+
+    def test_client_does_not_expand_short_links(self):
+        warnings = []
+        dz = Deezer(transport=FakeTransport({}), rate_limiter=False)
+        dz.resolver = self.resolver
+        dz._warn_message = warnings.append
+        self.assertEqual(dz._get_id("track", "https://deezer.page.link/AbCd"), "https://deezer.page.link/AbCd")
+        self.assertEqual(self.session.requests, [])
+        self.assertEqual(len(warnings), 1)
@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+
+from deezerpy import AsyncDeezer, Deezer, FakeTransport, SearchCache
+from deezerpy.query import advanced_query, canonical_query, search_url
+
+RESULTS = {"data": [{"id": 3135556, "title": "Harder, Better, Faster, Stronger", "artist": {"name": "Daft Punk"}},
+                    {"id": 3135553, "title": "One More Time", "artist": {"name": "Daft Punk"}},
+                    {"id": 66609426, "title": "Get Lucky", "artist": {"name": "Daft Punk"}}], "total": 3}
+
+
+class TestQuery(unittest.TestCase):
+
+    def test_canonical(self):
+        self.assertEqual(canonical_query("  Daft\tPUNK "), "daft punk")
+        self.assertEqual(search_url("search/track", "ac/dc & co"), "search/track?q=ac%2Fdc%20%26%20co")
+
+    def test_advanced(self):
+        self.assertEqual(advanced_query({"track": "Snow ", "artist": "Red  Hot", "dur_min": 180}),
+                         'artist:"red hot" dur_min:180 track:"snow"')
+        self.assertEqual(advanced_query({"artist": "a", "track": "b"}), advanced_query({"track": "B", "artist": "A"}))
+
+
+class TestSearchCache(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport({"search/track?q=daft": RESULTS, "search/track?q=da": dict(RESULTS, next="x"),
+                                        "search?q=artist:\"daft punk\" track:\"one\"": RESULTS})
+
+    def test_equivalent_searches_share_an_entry(self):
+        dz = Deezer(transport=self.transport, rate_limiter=False, search_cache=SearchCache())
+        dz.search("Daft", "track")
+        dz.search(" daft  ", "track")
+        dz.advanced_search({"track": "One", "artist": "Daft Punk"})
+        dz.advanced_search({"artist": "daft punk", "track": "one "})
+        self.assertEqual(len(self.transport.requests), 2)
+        self.assertEqual(dz.search_cache.stats()["hits"], 2)
+
+    def test_prefix_reuse(self):
+        cache = SearchCache(prefix_reuse=True)
+        dz = Deezer(transport=self.transport, rate_limiter=False, search_cache=cache)
+        dz.search("daft", "track")
+        self.assertEqual([item["id"] for item in dz.search("daft punk o", "track")["data"]], [3135553])
+        self.assertEqual(dz.search("Daft Punk Get", "track")["total"], 1)
+        self.assertEqual(len(self.transport.requests), 1)
+        self.assertEqual(cache.stats()["narrowed"], 2)
+        # Not reused: another method, or a broader search spanning several pages
+        dz.search("daft punk", "album")
+        dz.search("da", "track")
+        dz.search("dar", "track")
+        self.assertEqual(len(self.transport.requests), 4)
+
+    def test_entries_are_kept_apart_per_token(self):
+        cache = SearchCache(prefix_reuse=True)
+        for auth in ("first-token", "second-token", None):
+            dz = Deezer(auth=auth, transport=self.transport, rate_limiter=False, search_cache=cache)
+            dz.search("daft", "track")
+            dz.search("daft punk", "track")
+        self.assertEqual(len(self.transport.requests), 3)
+        self.assertEqual(cache.stats()["narrowed"], 3)
+
+    def test_async(self):
+        async def main():
+            async with AsyncDeezer(transport=self.transport, search_cache=SearchCache(prefix_reuse=True)) as dz:
+                await dz.search("daft", "track")
+                return await dz.search("daft punk harder", "track")
+        self.assertEqual(asyncio.run(main())["total"], 1)
+        self.assertEqual(len(self.transport.requests), 1)
@@ -0,0 +1,30 @@
+import threading
+import unittest
+from deezerpy import deezerpy
+
+
+class TestDeezerSession(unittest.TestCase):
+
+    def test_session_is_reused(self):
+        dz = deezerpy.Deezer()
+        self.assertIs(dz.transport._get_session(), dz.transport._get_session())
+
+    def test_session_shared_between_threads(self):
+        dz = deezerpy.Deezer()
+        sessions = []
+        threads = [threading.Thread(target=lambda: sessions.append(dz.transport._get_session())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(map(id, sessions))), 1)
+
+    def test_pool_size(self):
+        dz = deezerpy.Deezer(pool_maxsize=32)
+        adapter = dz.transport._get_session().get_adapter("https://api.deezer.com/")
+        self.assertEqual(adapter._pool_maxsize, 32)
+
+    def test_context_manager_closes_session(self):
+        with deezerpy.Deezer() as dz:
+            dz.transport._get_session()
+        self.assertIsNone(dz.transport._session)
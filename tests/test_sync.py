@@ -0,0 +1,134 @@
+import asyncio
+import unittest
+from urllib.parse import quote
+
+from deezerpy import AsyncDeezer, Deezer, FakeTransport, plan_playlist_sync
+from deezerpy.deezerpy import MAX_SONGS_LENGTH
+
+
+class TestPlan(unittest.TestCase):
+
+    def test_nothing_to_do(self):
+        plan = plan_playlist_sync([1, 2, 3], ["1", "2", "3"])
+        self.assertFalse(plan.changed)
+
+    def test_remove_and_append(self):
+        plan = plan_playlist_sync([1, 2, 3], [1, 3, 4, 5])
+        self.assertEqual(plan.remove, ["2"])
+        self.assertEqual(plan.add, ["4", "5"])
+        self.assertIsNone(plan.order)
+
+    def test_reorder_only_when_needed(self):
+        plan = plan_playlist_sync([1, 2, 3], [4, 1, 3, 3])
+        self.assertEqual(plan.add, ["4"])
+        self.assertEqual(plan.order, ["4", "1", "3"])
+        self.assertEqual(plan_playlist_sync([1, 2], [2, 1]).order, ["2", "1"])
+
+    def test_long_order_moves_tracks(self):
+        plan = plan_playlist_sync([1, 2, 3, 4, 5], [1, 2, 4, 3, 6, 5], max_order_length=5)
+        self.assertIsNone(plan.order)
+        self.assertEqual(plan.move, ["3", "5"])
+        self.assertEqual(plan.remove, ["3", "5"])
+        self.assertEqual(plan.add, ["3", "6", "5"])
+
+
+class TestSyncPlaylist(unittest.TestCase):
+
+    def setUp(self):
+        self.tracks = [{"id": i} for i in range(1, 31)]
+        self.failing = False
+        self.transport = FakeTransport({"playlist/77/tracks": self.playlist_tracks})
+
+    def playlist_tracks(self, method, path, params):
+        # Plays the playlist: removals, appends and reorders change its tracks
+        if method == "DELETE":
+            if self.failing:
+                return {"error": {"type": "Exception", "message": "An error occurred", "code": 100}}
+            songs = set(params["songs"].split(","))
+            self.tracks = [track for track in self.tracks if str(track["id"]) not in songs]
+            return True
+        if method == "POST" and "order" in params:
+            self.tracks = [{"id": int(id)} for id in params["order"].split(",")]
+            return True
+        if method == "POST":
+            self.tracks += [{"id": int(id)} for id in params["songs"].split(",")]
+            return True
+        index = int(params.get("index", 0))
+        page = {"data": self.tracks[index:index + 25], "total": len(self.tracks)}
+        if index + 25 < len(self.tracks):
+            page["next"] = f"https://api.deezer.com/playlist/77/tracks?index={index + 25}"
+        return page
+
+    def writes(self):
+        return [(method, params) for method, _, params in self.transport.requests if method != "GET"]
+
+    def test_minimal_calls(self):
+        dz = Deezer(auth="token", transport=self.transport, rate_limiter=False)
+        plan = dz.sync_playlist("77", list(range(2, 31)) + [40, 41])
+        self.assertTrue(plan.ok)
+        self.assertEqual(self.writes(), [("DELETE", {"songs": "1"}), ("POST", {"songs": "40,41"})])
+
+    def test_reorder(self):
+        dz = Deezer(auth="token", transport=self.transport, rate_limiter=False)
+        target = list(range(30, 0, -1))
+        dz.sync_playlist("https://www.deezer.com/fr/playlist/77", target)
+        self.assertEqual(self.writes(), [("POST", {"order": ",".join(map(str, target))})])
+
+    def test_large_playlist_moves_only_misplaced_tracks(self):
+        self.tracks = [{"id": 1000000 + i} for i in range(5000)]
+        target = [track["id"] for track in self.tracks]
+        target[4990], target[4995] = target[4995], target[4990]
+        dz = Deezer(auth="token", transport=self.transport, rate_limiter=False)
+        plan = dz.sync_playlist("77", target)
+        self.assertTrue(plan.ok)
+        self.assertEqual(len(plan.move), 9)
+        writes = self.writes()
+        self.assertEqual([method for method, _ in writes], ["DELETE", "POST"])
+        self.assertNotIn("order", writes[1][1])
+        self.assertEqual([track["id"] for track in self.tracks], target)
+
+    def test_long_reorder_is_chunked(self):
+        self.tracks = [{"id": 1000000 + i} for i in range(5000)]
+        target = [track["id"] for track in reversed(self.tracks)]
+        dz = Deezer(auth="token", transport=self.transport, rate_limiter=False)
+        self.assertTrue(dz.sync_playlist("77", target).ok)
+        self.assertTrue(all(len(params["songs"]) <= MAX_SONGS_LENGTH for _, params in self.writes()))
+        self.assertEqual([track["id"] for track in self.tracks], target)
+
+    def test_reorder_at_the_length_limit(self):
+        # 7-digit IDs take 10 bytes each once their comma is URL-encoded
+        self.tracks = [{"id": 1000000 + i} for i in range(MAX_SONGS_LENGTH // 10)]
+        target = [track["id"] for track in reversed(self.tracks)]
+        dz = Deezer(auth="token", transport=self.transport, rate_limiter=False)
+        dz.sync_playlist("77", target)
+        order = self.writes()[0][1]["order"]
+        self.assertLessEqual(len(quote(order, safe="")), MAX_SONGS_LENGTH)
+        self.assertEqual([track["id"] for track in self.tracks], target)
+
+        self.transport.requests.clear()
+        self.tracks.append({"id": 2000000})
+        target = [track["id"] for track in reversed(self.tracks)]
+        dz.sync_playlist("77", target)
+        self.assertTrue(all("order" not in params for _, params in self.writes()))
+        self.assertEqual([track["id"] for track in self.tracks], target)
+
+    def test_failed_removal_stops_the_sync(self):
+        self.failing = True
+        dz = Deezer(auth="token", transport=self.transport, rate_limiter=False)
+        dz._warn_message = lambda message: None
+        plan = dz.sync_playlist("77", [2, 1, 40])
+        self.assertFalse(plan.ok)
+        self.assertEqual([method for method, _ in self.writes()], ["DELETE"])
+
+    def test_dry_run(self):
+        dz = Deezer(auth="token", transport=self.transport, rate_limiter=False)
+        plan = dz.sync_playlist("77", [5], dry_run=True)
+        self.assertEqual(len(plan.remove), 29)
+        self.assertEqual(self.writes(), [])
+
+    def test_async(self):
+        async def main():
+            async with AsyncDeezer(auth="token", transport=self.transport, rate_limiter=False) as dz:
+                return await dz.sync_playlist("77", range(1, 32))
+        self.assertEqual(asyncio.run(main()).add, ["31"])
+        self.assertEqual(self.writes(), [("POST", {"songs": "31"})])
@@ -0,0 +1,80 @@
+import asyncio
+import gzip
+import os
+import tempfile
+import unittest
+
+from deezerpy import AsyncDeezer, CassetteTransport, Deezer, DeezerException, FakeTransport
+
+ROUTES = {
+    "album/302127": {"id": 302127, "title": "Discovery", "type": "album"},
+    "search?q=daft punk": {"data": [{"id": 3135556, "title": "Harder, Better, Faster, Stronger"}], "total": 1},
+    "artist/27/top": lambda method, path, params: {"data": [{"id": int(params.get("limit", 5))}]},
+}
+
+
+class TestFakeTransport(unittest.TestCase):
+
+    def test_routes(self):
+        transport = FakeTransport(ROUTES)
+        dz = Deezer(transport=transport, rate_limiter=False)
+        self.assertEqual(dz.get_album("https://www.deezer.com/en/album/302127")["title"], "Discovery")
+        self.assertEqual(dz.search("daft punk")["total"], 1)
+        self.assertEqual(dz._get("artist/27/top?limit=10")["data"][0]["id"], 10)
+        self.assertIsInstance(dz.get_track("1"), DeezerException)
+        self.assertEqual(len(transport.requests), 4)
+
+    def test_async_client(self):
+        async def main():
+            async with AsyncDeezer(transport=FakeTransport(ROUTES)) as dz:
+                return await dz.get_album("302127")
+        self.assertEqual(asyncio.run(main())["title"], "Discovery")
+
+
+class TestCassetteTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cassettes", "albums.jsonl.gz")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record_then_replay(self):
+        with CassetteTransport(self.path, mode="record", transport=FakeTransport(ROUTES)) as transport:
+            Deezer(auth="secret-token", transport=transport).get_album("302127")
+        with open(self.path, "rb") as cassette:
+            self.assertNotIn(b"secret-token", gzip.decompress(cassette.read()))
+
+        with CassetteTransport(self.path) as transport:
+            album = Deezer(auth="another-token", transport=transport).get_album("302127")
+        self.assertEqual(album["title"], "Discovery")
+
+    def test_tokens_are_removed_from_bodies(self):
+        page = {"data": [{"id": 1}], "total": 50,
+                "next": "https://api.deezer.com/user/me/tracks?access_token=secret-token&index=25",
+                "prev": "https://api.deezer.com/user/me/tracks?index=0&access_token=secret-token"}
+        inner = FakeTransport({"user/me/tracks": page})
+        with CassetteTransport(self.path, mode="record", transport=inner) as transport:
+            Deezer(auth="secret-token", transport=transport)._get("user/me/tracks")
+        with open(self.path, "rb") as cassette:
+            self.assertNotIn(b"secret-token", gzip.decompress(cassette.read()))
+
+        with CassetteTransport(self.path) as transport:
+            tracks = Deezer(auth="another-token", transport=transport)._get("user/me/tracks")
+        self.assertEqual(tracks["next"], "https://api.deezer.com/user/me/tracks?index=25")
+        self.assertEqual(tracks["prev"], "https://api.deezer.com/user/me/tracks?index=0")
+
+    def test_replay_missing_response(self):
+        with CassetteTransport(self.path) as transport:
+            with self.assertRaises(LookupError):
+                Deezer(transport=transport).get_album("302127")
+
+    def test_once_records_missing_responses(self):
+        inner = FakeTransport(ROUTES)
+        with CassetteTransport(self.path, mode="once", transport=inner) as transport:
+            Deezer(transport=transport).get_album("302127")
+        with CassetteTransport(self.path, mode="once", transport=inner) as transport:
+            Deezer(transport=transport).get_album("302127")
+            Deezer(transport=transport).search("daft punk")
+        self.assertEqual(len(inner.requests), 2)